@@ -0,0 +1,79 @@
+"""
+Pin contract volumes one by one versus in bulk
+
+PINNED_SHARE of the volumes of a solved instance are pinned to their
+optimal values, as contracts already in force. "loop" calls
+set_volume_constraint once per pin, adding a linear constraint each,
+"bulk" passes every pin to pin_volumes as index arrays, which fixes the
+variable domains. Both are solved and must reach the same objective.
+"""
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(10, 100, 5), (30, 1000, 5), (30, 5000, 5)]
+PINNED_SHARE = 0.5
+
+
+def pin_loop(scenario, pins):
+    for pin in zip(*pins):
+        scenario.set_volume_constraint(*pin)
+
+
+def pin_bulk(scenario, pins):
+    supplier, part, year, volume = pins
+    scenario.pin_volumes(volume, supplier, part, year)
+
+
+def main():
+    print(
+        "\n{:<16} {:<6} {:>8} {:>12} {:>10} {:>10} {:>16}".format(
+            "Size", "Pins", "Pinned", "Constraints", "Pin (s)", "Solve (s)", "Objective"
+        )
+    )
+    print("-" * 84)
+    rng = np.random.default_rng(1)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        price, demand, _, _, _, _, trust = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed=1,
+        )
+        solved = SupplierSelectionModel(price, demand, trust=trust)
+        solved.minimise_cost()
+        volume = solved.return_volume_array()
+        supplier, part, year = np.nonzero(rng.random(volume.shape) < PINNED_SHARE)
+        pins = (supplier, part, year, volume[supplier, part, year])
+
+        for name, pin in [("loop", pin_loop), ("bulk", pin_bulk)]:
+            scenario = SupplierSelectionModel(price, demand, trust=trust)
+            start = time.perf_counter()
+            pin(scenario, pins)
+            pin_time = time.perf_counter() - start
+            start = time.perf_counter()
+            scenario.minimise_cost()
+            solve_time = time.perf_counter() - start
+            print(
+                "{:<16} {:<6} {:>8} {:>12} {:>10.3f} {:>10.3f} {:>16,.0f}".format(
+                    "{}x{}x{}".format(*size),
+                    name,
+                    len(supplier),
+                    scenario.model_size()["constraints"],
+                    pin_time,
+                    solve_time,
+                    scenario.solver.ObjectiveValue(),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Model build versus restoring the model or solution from ModelCache
+"""
+import sys
+import tempfile
+import time
+
+sys.path.append("../src/")
+
+from cache import ModelCache
+from utils import generate_supplier_selector_variables
+
+SIZES = [(10, 50, 5), (30, 200, 5)]
+
+
+def main():
+    print(
+        "\n{:<12} {:>10} {:>12} {:>14} {:>16}".format(
+            "Size", "Build (s)", "Restore (s)", "Solution (s)", "Full solve (s)"
+        )
+    )
+    print("-" * 68)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            _,
+            _,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        kwargs = {
+            "capacity": capacity,
+            "share": share,
+            "trust": trust,
+            "share_formulation": "linear",
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ModelCache(directory)
+            start = time.perf_counter()
+            cache.get_model(price, demand, **kwargs)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cache.get_model(price, demand, **kwargs)
+            restore = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cache.minimise_cost(price, demand, **kwargs)
+            full_solve = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cache.minimise_cost(price, demand, **kwargs)
+            solution = time.perf_counter() - start
+        print(
+            "{:<12} {:>10.3f} {:>12.3f} {:>14.4f} {:>16.3f}".format(
+                "{}x{}x{}".format(*size), build, restore, solution, full_solve
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Marginal cost of every optional constraint family
+
+Builds and solves the generated problem with no optional families, then
+with each family enabled on its own, and reports the model size, build
+time and solve time it adds. SIZE can be raised to (30, 1000, 10) to match
+examples/decision_engine_large_problem.py.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZE = (10, 50, 5)
+
+
+def main():
+    n_suppliers, n_parts, n_years = SIZE
+    (
+        price,
+        demand,
+        capacity,
+        share,
+        supplier_transfer_limit,
+        minimum_units,
+        trust,
+    ) = generate_supplier_selector_variables(
+        n_suppliers=n_suppliers,
+        n_parts=n_parts,
+        n_years=n_years,
+        print_data=False,
+        seed_value=1,
+    )
+    families = [
+        ("none", {}),
+        ("capacity", {"capacity": capacity}),
+        (
+            "supplier_transfer_limit",
+            {"supplier_transfer_limit": supplier_transfer_limit},
+        ),
+        ("global_transfer_limit", {"global_transfer_limit": n_parts}),
+        ("share", {"share": share}),
+        ("share (linear)", {"share": share, "share_formulation": "linear"}),
+        ("minimum_units", {"minimum_units": minimum_units}),
+        ("trust", {"trust": trust}),
+    ]
+
+    print("{} suppliers x {} parts x {} years".format(*SIZE))
+    print(
+        "\n{:<26} {:>10} {:>12} {:>12} {:>10} {:>10} {:>12}".format(
+            "Family",
+            "Variables",
+            "Constraints",
+            "Enforcement",
+            "Build (s)",
+            "Solve (s)",
+            "Marginal (s)",
+        )
+    )
+    print("-" * 98)
+    baseline = None
+    for name, kwargs in families:
+        scenario = SupplierSelectionModel(price, demand, **kwargs)
+        start = time.perf_counter()
+        scenario.minimise_cost()
+        solve = time.perf_counter() - start
+        if baseline is None:
+            baseline = solve
+        breakdown = scenario.family_breakdown()
+        print(
+            "{:<26} {:>10} {:>12} {:>12} {:>10.3f} {:>10.3f} {:>+12.3f}".format(
+                name,
+                sum(row["variables"] for row in breakdown),
+                sum(row["constraints"] for row in breakdown),
+                sum(row["enforcement_literals"] for row in breakdown),
+                scenario.metrics.totals()["build"],
+                solve,
+                solve - baseline,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Monolithic solve versus solving independent sub-problems in parallel
+
+With only trust, share and minimum units active every part and year is an
+independent sub-problem. Both solves use the same core budget.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import available_cores, generate_supplier_selector_variables
+
+SIZES = [(10, 50, 5), (30, 200, 5)]
+
+
+def main():
+    total_cores = available_cores()
+    print("{} cores".format(total_cores))
+    print(
+        "\n{:<16} {:<14} {:>12} {:>10} {:>10} {:>18}".format(
+            "Size", "Solve", "Components", "Batches", "Time (s)", "Objective"
+        )
+    )
+    print("-" * 85)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        (
+            price,
+            demand,
+            _,
+            share,
+            _,
+            minimum_units,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        kwargs = {
+            "share": share,
+            "minimum_units": minimum_units,
+            "trust": trust,
+            "share_formulation": "linear",
+        }
+
+        monolithic = SupplierSelectionModel(price, demand, **kwargs)
+        start = time.perf_counter()
+        monolithic.minimise_cost()
+        monolithic_time = time.perf_counter() - start
+
+        decomposed = SupplierSelectionModel(price, demand, **kwargs)
+        start = time.perf_counter()
+        decomposed.minimise_cost_decomposed(total_cores=total_cores)
+        decomposed_time = time.perf_counter() - start
+
+        label = "{}x{}x{}".format(*size)
+        print(
+            "{:<16} {:<14} {:>12} {:>10} {:>10.3f} {:>18,.0f}".format(
+                label,
+                "monolithic",
+                1,
+                1,
+                monolithic_time,
+                monolithic.solver.ObjectiveValue(),
+            )
+        )
+        print(
+            "{:<16} {:<14} {:>12} {:>10} {:>10.3f} {:>18,.0f}".format(
+                label,
+                "decomposed",
+                decomposed.solve_stats["n_components"],
+                decomposed.solve_stats["n_batches"],
+                decomposed_time,
+                decomposed.solve_stats["objective"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Diagnose infeasible scenarios with assumptions versus rebuilding
+
+Infeasible variants of a generated instance are diagnosed three ways:
+
+- "solve": minimise_cost without validating the inputs, which only reports
+  that no solution was found
+- "rebuild": the manual process, a deletion filter that rebuilds and
+  solves the model with one input family dropped at a time
+- "diagnose": diagnose_infeasibility, pre-checks then a single model with
+  assumption literals, per family and per group (detailed)
+"""
+import sys
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from diagnosis import diagnose_infeasibility
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 25, 4), (10, 50, 4)]
+FAMILIES = (
+    "capacity",
+    "share",
+    "minimum_units",
+    "supplier_transfer_limit",
+    "global_transfer_limit",
+)
+
+
+def scenarios(n_suppliers, n_parts, n_years):
+    (
+        price,
+        demand,
+        capacity,
+        share,
+        _,
+        minimum_units,
+        trust,
+    ) = generate_supplier_selector_variables(
+        n_suppliers=n_suppliers,
+        n_parts=n_parts,
+        n_years=n_years,
+        print_data=False,
+        seed=1,
+    )
+    base = {
+        "price": price,
+        "demand": demand,
+        "capacity": capacity,
+        "share": np.full(share.shape, 100),
+        "trust": trust,
+    }
+    # every part held by its cheapest trusted supplier, which cannot all
+    # stay there within capacity, and nothing may be transferred
+    cheapest = np.argmin(np.where(trust == 1, price[:, :, 0], np.inf), axis=0)
+    previous_assigned = np.zeros(trust.shape, dtype=int)
+    previous_assigned[cheapest, np.arange(n_parts)] = 1
+    return [
+        ("capacity cut", dict(base, capacity=capacity // 10)),
+        (
+            "minimum units",
+            dict(base, share=share, minimum_units=minimum_units * 8),
+        ),
+        (
+            "locked in",
+            dict(
+                base,
+                capacity=np.minimum(capacity, n_parts // n_suppliers),
+                global_transfer_limit=0,
+                previous_assigned=previous_assigned,
+            ),
+        ),
+    ]
+
+
+def solve(inputs):
+    scenario = SupplierSelectionModel(validate=False, **inputs)
+    return scenario.minimise_cost()
+
+
+def rebuild_diagnosis(inputs):
+    """
+    Deletion filter over the input families, rebuilding the model each time
+    """
+    core = [name for name in FAMILIES if inputs.get(name) is not None]
+    n_solves = 0
+    for name in list(core):
+        reduced = {key: value for key, value in inputs.items() if key != name}
+        for other in FAMILIES:
+            if other not in core:
+                reduced.pop(other, None)
+        n_solves += 1
+        if solve(reduced) == cp_model.INFEASIBLE:
+            core.remove(name)
+    return core, n_solves
+
+
+def main():
+    print(
+        "\n{:<12} {:<14} {:<10} {:>10} {:>7} {:<50}".format(
+            "Size", "Scenario", "Method", "Time (s)", "Solves", "Cause"
+        )
+    )
+    print("-" * 108)
+    for size in SIZES:
+        for name, inputs in scenarios(*size):
+            rows = []
+            start = time.perf_counter()
+            status = solve(inputs)
+            status_name = cp_model.CpSolver().StatusName(status)
+            rows.append(("solve", time.perf_counter() - start, 1, status_name))
+
+            start = time.perf_counter()
+            core, n_solves = rebuild_diagnosis(inputs)
+            rows.append(
+                ("rebuild", time.perf_counter() - start, n_solves, ", ".join(core))
+            )
+
+            for method, detailed in [("diagnose", False), ("detailed", True)]:
+                result = diagnose_infeasibility(detailed=detailed, **inputs)
+                if result["checks"]:
+                    cause = "check: " + result["checks"][0]["message"]
+                else:
+                    cause = ", ".join(str(key) for key in result["core"][:3])
+                    if len(result["core"]) > 3:
+                        cause += " ... ({} groups)".format(len(result["core"]))
+                rows.append((method, result["wall_time"], result["n_solves"], cause))
+
+            for method, seconds, n_solves, cause in rows:
+                print(
+                    "{:<12} {:<14} {:<10} {:>10.3f} {:>7} {:<50}".format(
+                        "{}x{}x{}".format(*size),
+                        name,
+                        method,
+                        seconds,
+                        n_solves,
+                        cause[:80],
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Lower bound and greedy incumbent versus the CP-SAT optimum
+
+Reports the time taken by estimate_cost, the lower bound and greedy cost
+relative to the optimum, and the solve time with and without the estimate
+fed to minimise_cost.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(10, 50, 5), (30, 200, 5)]
+
+
+def main():
+    print(
+        "\n{:<12} {:>13} {:>12} {:>12} {:>12} {:>14} {:>14}".format(
+            "Size",
+            "Estimate (s)",
+            "Bound gap",
+            "Greedy gap",
+            "Solve (s)",
+            "With est. (s)",
+            "Optimum",
+        )
+    )
+    print("-" * 96)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            _,
+            minimum_units,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        kwargs = {
+            "capacity": capacity,
+            "share": share,
+            "minimum_units": minimum_units,
+            "trust": trust,
+            "share_formulation": "linear",
+        }
+
+        plain = SupplierSelectionModel(price, demand, **kwargs)
+        start = time.perf_counter()
+        plain.minimise_cost()
+        solve_time = time.perf_counter() - start
+        optimum = plain.solver.ObjectiveValue()
+
+        estimated = SupplierSelectionModel(price, demand, **kwargs)
+        start = time.perf_counter()
+        estimate = estimated.estimate_cost()
+        estimate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        estimated.minimise_cost(estimate)
+        estimated_time = time.perf_counter() - start
+
+        greedy_gap = "-"
+        if estimate["greedy_cost"] is not None:
+            greedy_gap = "{:.3%}".format((estimate["greedy_cost"] - optimum) / optimum)
+        print(
+            "{:<12} {:>13.4f} {:>12.3%} {:>12} {:>12.3f} {:>14.3f} {:>14,.0f}".format(
+                "{}x{}x{}".format(*size),
+                estimate_time,
+                (estimate["lower_bound"] - optimum) / optimum,
+                greedy_gap,
+                solve_time,
+                estimated_time,
+                optimum,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
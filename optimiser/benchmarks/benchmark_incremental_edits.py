@@ -0,0 +1,117 @@
+"""
+Edit and re-solve a built model versus rebuilding it
+
+An analyst session is replayed on a generated instance: a volume is
+pinned, the pin is changed, a capacity is lowered, a supplier is
+distrusted for a part, the last edit is undone and every edit is cleared.
+"edit" applies every step to one SupplierSelectionModel with pin_volume,
+override_capacity, override_trust, undo and clear_edits and re-solves it.
+"rebuild" builds a new model from the edited inputs and solves it. Both
+must reach the same objective.
+"""
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 25, 4), (10, 50, 4), (15, 100, 5)]
+
+
+def session(scenario, demand):
+    """
+    (step name, edit) pairs, an edit is applied to the edited model
+    """
+    supplier, part = map(int, np.argwhere(scenario.cell_index >= 0)[0])
+    pin = int(demand[part, 0]) // 2
+    capacity = int(scenario.solution["assigned"][supplier, :, 0].sum()) - 1
+    return [
+        ("pin volume", lambda s: s.pin_volume(supplier, part, 0, pin)),
+        ("change pin", lambda s: s.pin_volume(supplier, part, 0, 0)),
+        ("lower capacity", lambda s: s.override_capacity(supplier, 0, capacity)),
+        ("distrust", lambda s: s.override_trust(supplier, part, False)),
+        ("undo", lambda s: s.undo()),
+        ("clear edits", lambda s: s.clear_edits()),
+    ]
+
+
+def rebuild(inputs, edits):
+    """
+    Build a model from the inputs with the edits applied to the data
+    """
+    capacity = np.array(inputs["capacity"])
+    trust = np.array(inputs["trust"])
+    pins = []
+    for key, value in edits.items():
+        if key[0] == "capacity":
+            capacity[key[1], key[2]] = value
+        elif key[0] == "trust":
+            trust[key[1], key[2]] = value
+        else:
+            pins.append((key[1:], value))
+    scenario = SupplierSelectionModel(
+        inputs["price"], inputs["demand"], capacity=capacity, trust=trust
+    )
+    for (supplier, part, year), value in pins:
+        scenario.set_volume_constraint(supplier, part, year, value)
+    return scenario
+
+
+def main():
+    print(
+        "\n{:<16} {:<16} {:>10} {:>10} {:>12} {:>12} {:>8}".format(
+            "Size", "Step", "Edit (s)", "Solve (s)", "Rebuild (s)", "Speed-up", "Same"
+        )
+    )
+    print("-" * 90)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        price, demand, capacity, _, _, _, trust = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed=1,
+        )
+        inputs = {
+            "price": price,
+            "demand": demand,
+            "capacity": capacity,
+            "trust": trust,
+        }
+        edited = SupplierSelectionModel(price, demand, capacity=capacity, trust=trust)
+        edited.minimise_cost()
+        for name, edit in session(edited, demand):
+            start = time.perf_counter()
+            edit(edited)
+            edit_time = time.perf_counter() - start
+            start = time.perf_counter()
+            edited.minimise_cost()
+            solve_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rebuilt = rebuild(inputs, edited.edits)
+            rebuilt.minimise_cost()
+            rebuild_time = time.perf_counter() - start
+            print(
+                "{:<16} {:<16} {:>10.4f} {:>10.3f} {:>12.3f} {:>11.1f}x {:>8}".format(
+                    "{}x{}x{}".format(*size),
+                    name,
+                    edit_time,
+                    solve_time,
+                    rebuild_time,
+                    rebuild_time / (edit_time + solve_time),
+                    str(
+                        edited.solve_stats["objective"]
+                        == rebuilt.solve_stats["objective"]
+                    ),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
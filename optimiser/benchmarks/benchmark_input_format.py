@@ -0,0 +1,74 @@
+"""
+Memory held by nested-list inputs versus arrays saved with save_inputs
+
+Loads the inputs of a SIZE problem as nested lists (as the
+generator and examples pass them), from a compressed ".npz" file and from
+memory-mapped ".npy" files, and reports the load time and the memory
+allocated by each.
+"""
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append("../src/")
+
+from utils import load_inputs, save_inputs
+
+SIZE = (30, 1000, 10)
+
+
+def generate(n_suppliers, n_parts, n_years, seed=1):
+    rng = np.random.default_rng(seed)
+    return {
+        "price": rng.integers(1_000, 100_000, (n_suppliers, n_parts, n_years)),
+        "demand": rng.integers(50, 300, (n_parts, n_years)),
+        "capacity": rng.integers(n_parts // 2, n_parts, (n_suppliers, n_years)),
+        "share": rng.choice([30, 60, 100], (n_suppliers, n_parts)),
+        "minimum_units": rng.integers(5, 30, (n_suppliers, n_parts, n_years)),
+        "trust": rng.random((n_suppliers, n_parts)) < 0.8,
+    }
+
+
+def measure(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    inputs = load()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return inputs, elapsed, peak
+
+
+def main():
+    arrays = generate(*SIZE)
+    print("{} suppliers x {} parts x {} years".format(*SIZE))
+    print("\n{:<22} {:>10} {:>12}".format("Format", "Load (s)", "Memory (MB)"))
+    print("-" * 46)
+    with tempfile.TemporaryDirectory() as directory:
+        lists_path = directory + "/inputs.pickle"
+        with open(lists_path, "wb") as f:
+            pickle.dump({name: array.tolist() for name, array in arrays.items()}, f)
+        npz_path = directory + "/inputs.npz"
+        save_inputs(npz_path, **arrays)
+        npy_path = directory + "/inputs"
+        save_inputs(npy_path, **arrays)
+
+        def load_lists():
+            with open(lists_path, "rb") as f:
+                return pickle.load(f)
+
+        for name, load in [
+            ("nested lists", load_lists),
+            (".npz", lambda: load_inputs(npz_path)),
+            (".npy (memory-mapped)", lambda: load_inputs(npy_path)),
+        ]:
+            _, elapsed, peak = measure(load)
+            print("{:<22} {:>10.3f} {:>12.1f}".format(name, elapsed, peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
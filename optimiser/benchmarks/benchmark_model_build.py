@@ -0,0 +1,144 @@
+"""
+Compare SupplierSelectionModel build time against the nested-list builder
+
+The nested-list builder below reproduces the original triple-loop
+construction of the volume, assigned, link, demand, capacity, share and
+minimum units families, from nested lists. It is not the same model: its
+volumes have the domain [0, 500] rather than domains derived from the
+data, and it posts each demand constraint once per supplier.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 50, 4), (15, 200, 5), (30, 500, 10)]
+
+
+def build_nested_lists(price, demand, capacity, share, minimum_units):
+    model = cp_model.CpModel()
+    n_suppliers, n_parts, n_years = len(price), len(price[0]), len(price[0][0])
+
+    volume = []
+    assigned = []
+    for supplier in range(n_suppliers):
+        v_p, a_p = [], []
+        for part in range(n_parts):
+            v_y, a_y = [], []
+            for year in range(n_years):
+                v_y.append(
+                    model.NewIntVar(
+                        0, 500, "Volume S{}P{}Y{}".format(supplier, part, year)
+                    )
+                )
+                a_y.append(
+                    model.NewBoolVar("Assigned S{}P{}Y{}".format(supplier, part, year))
+                )
+            v_p.append(v_y)
+            a_p.append(a_y)
+        volume.append(v_p)
+        assigned.append(a_p)
+
+    for supplier in range(n_suppliers):
+        for part in range(n_parts):
+            for year in range(n_years):
+                model.Add(volume[supplier][part][year] > 0).OnlyEnforceIf(
+                    assigned[supplier][part][year]
+                )
+                model.Add(volume[supplier][part][year] == 0).OnlyEnforceIf(
+                    assigned[supplier][part][year].Not()
+                )
+
+    for supplier in range(n_suppliers):
+        for part in range(n_parts):
+            for year in range(n_years):
+                model.Add(
+                    sum(volume[s][part][year] for s in range(n_suppliers))
+                    == demand[part][year]
+                )
+
+    for supplier in range(n_suppliers):
+        for year in range(n_years):
+            model.Add(
+                sum(assigned[supplier][part][year] for part in range(n_parts))
+                <= capacity[supplier][year]
+            )
+
+    for supplier in range(n_suppliers):
+        for part in range(n_parts):
+            for year in range(n_years):
+                target = model.NewIntVar(0, 100, "volume/demand * 100")
+                model.AddDivisionEquality(
+                    target, volume[supplier][part][year] * 100, demand[part][year]
+                )
+                model.Add(target <= share[supplier][part])
+
+    for supplier in range(n_suppliers):
+        for part in range(n_parts):
+            for year in range(n_years):
+                model.Add(
+                    volume[supplier][part][year] >= minimum_units[supplier][part][year]
+                ).OnlyEnforceIf(assigned[supplier][part][year])
+    return model
+
+
+def main():
+    print(
+        "{:>24} {:>14} {:>14} {:>9}".format(
+            "suppliers x parts x years", "nested (s)", "arrays (s)", "speed-up"
+        )
+    )
+    for n_suppliers, n_parts, n_years in SIZES:
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            _,
+            minimum_units,
+            _,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+
+        arrays = [
+            np.asarray(x) for x in (price, demand, capacity, share, minimum_units)
+        ]
+        # the original builder indexed nested lists, not ndarrays
+        nested_lists = [x.tolist() for x in arrays]
+        start = time.perf_counter()
+        build_nested_lists(*nested_lists)
+        nested = time.perf_counter() - start
+
+        start = time.perf_counter()
+        SupplierSelectionModel(
+            arrays[0],
+            arrays[1],
+            capacity=arrays[2],
+            share=arrays[3],
+            minimum_units=arrays[4],
+        )
+        vectorised = time.perf_counter() - start
+
+        print(
+            "{:>24} {:>14.3f} {:>14.3f} {:>8.1f}x".format(
+                "{} x {} x {}".format(n_suppliers, n_parts, n_years),
+                nested,
+                vectorised,
+                nested / vectorised,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Rolling-horizon solve versus the full multi-year solve
+
+Reports the optimality gap of the rolling-horizon cost against the full
+solve and the speed-up, for windows of WINDOWS years. Transfer limits are
+active, so every window carries the assignment of the last fixed year.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from rolling import solve_rolling_horizon
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 20, 6), (10, 50, 10)]
+WINDOWS = [1, 2, 3]
+
+
+def main():
+    print(
+        "\n{:<16} {:<10} {:>10} {:>18} {:>10} {:>10}".format(
+            "Size", "Solve", "Time (s)", "Cost", "Gap", "Speed-up"
+        )
+    )
+    print("-" * 79)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            supplier_transfer_limit,
+            _,
+            _,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        kwargs = {
+            "capacity": capacity,
+            "supplier_transfer_limit": supplier_transfer_limit,
+            "share": share,
+            "share_formulation": "linear",
+        }
+        label = "{}x{}x{}".format(*size)
+
+        start = time.perf_counter()
+        full = SupplierSelectionModel(price, demand, **kwargs)
+        full.minimise_cost()
+        full_time = time.perf_counter() - start
+        full_cost = full.solver.ObjectiveValue()
+        print(
+            "{:<16} {:<10} {:>10.3f} {:>18,.0f} {:>10} {:>10}".format(
+                label, "full", full_time, full_cost, "-", "-"
+            )
+        )
+        for window in WINDOWS:
+            result = solve_rolling_horizon(price, demand, window, **kwargs)
+            if result["objective"] is None:
+                print("{:<16} {:<10} {}".format(label, window, result["status"]))
+                continue
+            print(
+                "{:<16} {:<10} {:>10.3f} {:>18,.0f} {:>9.3%} {:>9.1f}x".format(
+                    label,
+                    "window {}".format(window),
+                    result["wall_time"],
+                    result["objective"],
+                    (result["objective"] - full_cost) / full_cost,
+                    full_time / result["wall_time"],
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare the division and linear share formulations
+
+Builds the same generated instance with share enabled under both
+formulations and reports the model size and solve time of each.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 25, 4), (10, 50, 5)]
+
+
+def main():
+    print(
+        "{:>24} {:>10} {:>11} {:>12} {:>10} {:>14}".format(
+            "suppliers x parts x years",
+            "share",
+            "variables",
+            "constraints",
+            "build (s)",
+            "solve (s)",
+        )
+    )
+    for n_suppliers, n_parts, n_years in SIZES:
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            _,
+            minimum_units,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        for share_formulation in ("division", "linear"):
+            start = time.perf_counter()
+            scenario = SupplierSelectionModel(
+                price,
+                demand,
+                capacity=capacity,
+                share=share,
+                minimum_units=minimum_units,
+                trust=trust,
+                share_formulation=share_formulation,
+            )
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            scenario.minimise_cost()
+            solve = time.perf_counter() - start
+            size = scenario.model_size()
+            print(
+                "{:>24} {:>10} {:>11} {:>12} {:>10.3f} {:>14.3f}".format(
+                    "{} x {} x {}".format(n_suppliers, n_parts, n_years),
+                    share_formulation,
+                    size["variables"],
+                    size["constraints"],
+                    build,
+                    solve,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
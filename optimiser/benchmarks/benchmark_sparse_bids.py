@@ -0,0 +1,93 @@
+"""
+Dense supplier-part cube versus sparse bids
+
+Every part is quoted by BIDS_PER_PART of the suppliers. "dense" builds the
+model for every (supplier, part) pair, with a placeholder PLACEHOLDER_PRICE
+for the pairs that were not quoted, "sparse" passes the quotes as bids.
+Sparse models scale with the number of bids, and dense models are skipped
+above DENSE_MAX_PARTS.
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+
+SIZES = [(30, 100, 5), (30, 1000, 5), (30, 10000, 5)]
+BIDS_PER_PART = (2, 5)
+DENSE_MAX_PARTS = 1000
+PLACEHOLDER_PRICE = 10_000_000
+
+
+def generate(n_suppliers, n_parts, n_years, seed=1):
+    rng = np.random.default_rng(seed)
+    price = rng.integers(1_000, 100_000, (n_suppliers, n_parts, n_years))
+    demand = rng.integers(50, 300, (n_parts, n_years))
+    bids = []
+    for part in range(n_parts):
+        n_bids = rng.integers(BIDS_PER_PART[0], BIDS_PER_PART[1] + 1)
+        for supplier in rng.choice(n_suppliers, n_bids, replace=False):
+            bids.append((supplier, part))
+    return price, demand, bids
+
+
+def build(price, demand, bids, sparse):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if sparse:
+        scenario = SupplierSelectionModel(price, demand, bids=bids)
+    else:
+        quoted = np.zeros(price.shape[:2], dtype=bool)
+        quoted[tuple(np.transpose(bids))] = True
+        price = np.where(quoted[:, :, None], price, PLACEHOLDER_PRICE)
+        scenario = SupplierSelectionModel(price, demand)
+    build_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return scenario, build_time, peak
+
+
+def main():
+    print(
+        "\n{:<16} {:<8} {:>8} {:>10} {:>12} {:>10} {:>12} {:>10}".format(
+            "Size",
+            "Model",
+            "Bids",
+            "Variables",
+            "Constraints",
+            "Build (s)",
+            "Peak (MB)",
+            "Solve (s)",
+        )
+    )
+    print("-" * 94)
+    for size in SIZES:
+        price, demand, bids = generate(*size)
+        for name, sparse in [("dense", False), ("sparse", True)]:
+            if not sparse and size[1] > DENSE_MAX_PARTS:
+                continue
+            scenario, build_time, peak = build(price, demand, bids, sparse)
+            start = time.perf_counter()
+            scenario.minimise_cost()
+            solve_time = time.perf_counter() - start
+            size_info = scenario.model_size()
+            print(
+                "{:<16} {:<8} {:>8} {:>10} {:>12} {:>10.3f} {:>12.1f} {:>10.3f}".format(
+                    "{}x{}x{}".format(*size),
+                    name,
+                    len(bids),
+                    size_info["variables"],
+                    size_info["constraints"],
+                    build_time,
+                    peak / 1e6,
+                    solve_time,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
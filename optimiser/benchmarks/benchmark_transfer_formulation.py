@@ -0,0 +1,90 @@
+"""
+Compare the reified and linear transfer formulations
+
+Builds the same generated instance with supplier_transfer_limit and
+global_transfer_limit enabled under both formulations and reports the model
+size, solve time, objective and gap of each. GLOBAL_TRANSFER_SHARE of the parts
+may be transferred every year.
+"""
+import sys
+import time
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 25, 4), (10, 50, 5), (15, 100, 5)]
+GLOBAL_TRANSFER_SHARE = 0.1
+MAX_TIME_IN_SECONDS = 60
+
+
+def main():
+    print(
+        "{:>24} {:>10} {:>11} {:>12} {:>10} {:>10} {:>10} {:>14} {:>8}".format(
+            "suppliers x parts x years",
+            "transfer",
+            "variables",
+            "constraints",
+            "build (s)",
+            "solve (s)",
+            "status",
+            "objective",
+            "gap",
+        )
+    )
+    for n_suppliers, n_parts, n_years in SIZES:
+        (
+            price,
+            demand,
+            capacity,
+            _,
+            supplier_transfer_limit,
+            _,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed=1,
+        )
+        # limits well below the generated ones, so that they bind
+        supplier_transfer_limit = supplier_transfer_limit // 10
+        global_transfer_limit = max(1, int(n_parts * GLOBAL_TRANSFER_SHARE))
+        for transfer_formulation in ("reified", "linear"):
+            start = time.perf_counter()
+            scenario = SupplierSelectionModel(
+                price,
+                demand,
+                capacity=capacity,
+                supplier_transfer_limit=supplier_transfer_limit,
+                global_transfer_limit=global_transfer_limit,
+                trust=trust,
+                transfer_formulation=transfer_formulation,
+            )
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            scenario.minimise_cost(max_time_in_seconds=MAX_TIME_IN_SECONDS)
+            solve = time.perf_counter() - start
+            size = scenario.model_size()
+            print(
+                (
+                    "{:>24} {:>10} {:>11} {:>12} {:>10.3f} {:>10.3f} {:>10} "
+                    "{:>14,.0f} {:>8.2%}"
+                ).format(
+                    "{} x {} x {}".format(n_suppliers, n_parts, n_years),
+                    transfer_formulation,
+                    size["variables"],
+                    size["constraints"],
+                    build,
+                    solve,
+                    scenario.solve_stats["status"],
+                    scenario.solve_stats["objective"] or 0,
+                    scenario.solve_stats["gap"] or 0,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Trust handled at build time versus reified trust constraints
+
+"before" rebuilds the previous formulation: every (supplier, part) cell
+gets variables, plus a BoolVar per cell channelled to the constant trust
+value and two reified constraints per year forcing untrusted volumes to 0.
+"after" is SupplierSelectionModel with trust, where untrusted cells get no
+variables at all. generate_supplier_selector_variables leaves about 20% of
+the cells untrusted.
+"""
+import sys
+import time
+
+import numpy as np
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import generate_supplier_selector_variables
+
+SIZES = [(5, 25, 4), (10, 50, 5), (30, 100, 5)]
+
+
+def build_before(price, demand, capacity, trust):
+    start = time.perf_counter()
+    scenario = SupplierSelectionModel(price, demand, capacity=capacity)
+    model = scenario.model
+    trust = np.asarray(trust)
+    for supplier, part in np.ndindex(trust.shape):
+        t = model.NewBoolVar("")
+        value = int(trust[supplier, part])
+        model.Add(value == 0).OnlyEnforceIf(t)
+        model.Add(value == 1).OnlyEnforceIf(t.Not())
+        for volume in scenario.volume[scenario.cell_index[supplier, part]]:
+            model.Add(volume == 0).OnlyEnforceIf(t)
+            model.Add(volume >= 0).OnlyEnforceIf(t.Not())
+    return scenario, time.perf_counter() - start
+
+
+def build_after(price, demand, capacity, trust):
+    start = time.perf_counter()
+    scenario = SupplierSelectionModel(price, demand, capacity=capacity, trust=trust)
+    return scenario, time.perf_counter() - start
+
+
+def main():
+    print(
+        "\n{:<16} {:<8} {:>10} {:>10} {:>12} {:>10} {:>10} {:>14}".format(
+            "Size",
+            "Model",
+            "Untrusted",
+            "Variables",
+            "Constraints",
+            "Build (s)",
+            "Solve (s)",
+            "Objective",
+        )
+    )
+    print("-" * 96)
+    for size in SIZES:
+        n_suppliers, n_parts, n_years = size
+        price, demand, capacity, _, _, _, trust = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        untrusted = 1 - np.mean(trust)
+        for name, build in [("before", build_before), ("after", build_after)]:
+            scenario, build_time = build(price, demand, capacity, trust)
+            start = time.perf_counter()
+            scenario.minimise_cost()
+            solve_time = time.perf_counter() - start
+            size_info = scenario.model_size()
+            print(
+                (
+                    "{:<16} {:<8} {:>9.0%} {:>10} {:>12} {:>10.3f} {:>10.3f} "
+                    "{:>14,.0f}"
+                ).format(
+                    "{}x{}x{}".format(*size),
+                    name,
+                    untrusted,
+                    size_info["variables"],
+                    size_info["constraints"],
+                    build_time,
+                    solve_time,
+                    scenario.solver.ObjectiveValue(),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare cold and warm-started solves of a perturbed scenario
+
+Solves a generated base scenario, cuts one supplier's prices by 5% and
+solves the perturbed scenario twice: from scratch, and with the base
+solution installed as a hint.
+"""
+import sys
+
+sys.path.append("../src/")
+
+from decision_engine import SupplierSelectionModel
+from utils import compute_reduced_price, generate_supplier_selector_variables
+
+SIZES = [(10, 50, 5), (15, 100, 5)]
+
+
+def main():
+    print(
+        "{:>24} {:>6} {:>12} {:>12} {:>12} {:>10}".format(
+            "suppliers x parts x years",
+            "start",
+            "first (s)",
+            "best (s)",
+            "optimal (s)",
+            "solutions",
+        )
+    )
+    for n_suppliers, n_parts, n_years in SIZES:
+        (
+            price,
+            demand,
+            capacity,
+            share,
+            supplier_transfer_limit,
+            minimum_units,
+            trust,
+        ) = generate_supplier_selector_variables(
+            n_suppliers=n_suppliers,
+            n_parts=n_parts,
+            n_years=n_years,
+            print_data=False,
+            seed_value=1,
+        )
+        kwargs = dict(
+            capacity=capacity,
+            supplier_transfer_limit=supplier_transfer_limit,
+            share=share,
+            minimum_units=minimum_units,
+            trust=trust,
+            share_formulation="linear",
+        )
+        base = SupplierSelectionModel(price, demand, **kwargs)
+        base.minimise_cost()
+
+        reduced_price = compute_reduced_price(price, 0, 0.05)
+        for start in ("cold", "warm"):
+            scenario = SupplierSelectionModel(reduced_price, demand, **kwargs)
+            if start == "warm":
+                scenario.set_solution_hint(base)
+            scenario.minimise_cost()
+            stats = scenario.solve_stats
+            print(
+                "{:>24} {:>6} {:>12} {:>12} {:>12} {:>10}".format(
+                    "{} x {} x {}".format(n_suppliers, n_parts, n_years),
+                    start,
+                    _seconds(stats["time_to_first_solution"]),
+                    _seconds(stats["time_to_best_solution"]),
+                    _seconds(stats["time_to_optimal"]),
+                    stats["n_solutions"],
+                )
+            )
+
+
+def _seconds(value):
+    return "-" if value is None else "{:.3f}".format(value)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import hashlib
+import inspect
+import os
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel
+
+# bump when the model formulation changes, to invalidate existing entries
+cache_version = 2
+
+# SupplierSelectionModel arguments that do not change the model
+solver_inputs = ("n_threads", "validate")
+
+entry_files = ("model.txt", "index.npz", "solution.npz")
+
+
+def input_key(price, demand, **kwargs):
+    """
+    Content hash of the normalised SupplierSelectionModel inputs
+
+    Defaults are filled in and integer and boolean data is hashed as int64
+    arrays, so nested lists and arrays holding the same values give the
+    same key
+    """
+    signature = inspect.signature(SupplierSelectionModel.__init__)
+    inputs = signature.bind(None, price, demand, **kwargs)
+    inputs.apply_defaults()
+    digest = hashlib.sha256("version {}".format(cache_version).encode())
+    for name, value in inputs.arguments.items():
+        if name == "self" or name in solver_inputs:
+            continue
+        digest.update(name.encode())
+        if value is None or isinstance(value, str):
+            digest.update(repr(value).encode())
+            continue
+        array = np.asarray(value)
+        if array.dtype.kind in "biu":
+            array = array.astype(np.int64)
+        digest.update("{} {}".format(array.shape, array.dtype.str).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Content-addressed on-disk cache of built models and solved volumes
+
+    Entries are keyed by input_key. A model entry holds the model proto
+    and its variable indices, so a cached model is restored with
+    SupplierSelectionModel.from_proto instead of being built. A solution
+    entry holds the volume and cost of an optimal solve, so the solve is
+    skipped too. The least recently used entries are evicted when the
+    cache holds more than `max_bytes`.
+
+    Attributes
+    ----------
+    directory : str
+
+    max_bytes : int
+
+    hits : int
+        Lookups served from the cache, models or solutions
+
+    solution_hits : int
+        Lookups served from a cached solution, without a model
+
+    misses : int
+        Lookups that had to build a model
+
+    Examples
+    --------
+    cache = ModelCache("model_cache")
+    result = cache.minimise_cost(price, demand, capacity=capacity)
+    result["volume"]
+    """
+
+    def __init__(self, directory, max_bytes=1_000_000_000):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.solution_hits = 0
+        self.misses = 0
+
+    def _path(self, key, name):
+        return os.path.join(self.directory, "{}.{}".format(key, name))
+
+    def _touch(self, key):
+        for name in entry_files:
+            if os.path.exists(self._path(key, name)):
+                os.utime(self._path(key, name))
+
+    def _write(self, key, name, write):
+        path = self._path(key, name)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            write(f)
+        os.replace(temporary, path)
+
+    def get_model(self, price, demand, **kwargs):
+        """
+        Returns the SupplierSelectionModel for these inputs, restored from
+        the cache or built and added to it
+        """
+        return self._get_model(
+            input_key(price, demand, **kwargs), price, demand, kwargs
+        )
+
+    def _get_model(self, key, price, demand, kwargs):
+        if os.path.exists(self._path(key, "index.npz")):
+            self.hits += 1
+            self._touch(key)
+            with open(self._path(key, "model.txt")) as f:
+                proto = f.read()
+            with np.load(self._path(key, "index.npz")) as index:
+                variable_index = {name: index[name] for name in index.files}
+            return SupplierSelectionModel.from_proto(
+                proto, variable_index, price, demand, **kwargs
+            )
+
+        self.misses += 1
+        scenario = SupplierSelectionModel(price, demand, **kwargs)
+        proto = str(scenario.model.Proto()).encode()
+        index = {
+            name: value
+            for name, value in scenario.variable_index().items()
+            if value is not None
+        }
+        self._write(key, "model.txt", lambda f: f.write(proto))
+        self._write(key, "index.npz", lambda f: np.savez(f, **index))
+        self._evict()
+        return scenario
+
+    def minimise_cost(self, price, demand, **kwargs):
+        """
+        Solve the model for these inputs, or return the cached solution
+
+        Returns
+        -------
+        result : dict
+            key, status (StatusName), objective, volume
+            (n_suppliers, n_parts, n_years) and model, the solved
+            SupplierSelectionModel or None if the solution was cached.
+            Only optimal solutions are cached
+        """
+        key = input_key(price, demand, **kwargs)
+        if os.path.exists(self._path(key, "solution.npz")):
+            self.hits += 1
+            self.solution_hits += 1
+            self._touch(key)
+            with np.load(self._path(key, "solution.npz")) as solution:
+                return {
+                    "key": key,
+                    "status": "OPTIMAL",
+                    "objective": float(solution["objective"]),
+                    "volume": solution["volume"],
+                    "model": None,
+                }
+
+        scenario = self._get_model(key, price, demand, kwargs)
+        status = scenario.minimise_cost()
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        volume = scenario.return_volume_array() if found else None
+        objective = scenario.solver.ObjectiveValue() if found else None
+        if status == cp_model.OPTIMAL:
+            self._write(
+                key,
+                "solution.npz",
+                lambda f: np.savez(f, volume=volume, objective=objective),
+            )
+            self._evict()
+        return {
+            "key": key,
+            "status": scenario.solver.StatusName(status),
+            "objective": objective,
+            "volume": volume,
+            "model": scenario,
+        }
+
+    def _entries(self):
+        """
+        (last used, size in bytes, key) of every entry
+        """
+        entries = {}
+        for filename in os.listdir(self.directory):
+            key, _, name = filename.partition(".")
+            if name not in entry_files:
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            last_used, size = entries.get(key, (0.0, 0))
+            entries[key] = (max(last_used, stat.st_mtime), size + stat.st_size)
+        return [(last_used, size, key) for key, (last_used, size) in entries.items()]
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache fits in
+        max_bytes
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            for name in entry_files:
+                if os.path.exists(self._path(key, name)):
+                    os.remove(self._path(key, name))
+            total -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "solution_hits": self.solution_hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
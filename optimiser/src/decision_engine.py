@@ -1,8 +1,22 @@
+import asyncio
+import hashlib
+import threading
+import time
+from functools import partial, wraps
+
 import numpy as np
 import matplotlib.pyplot as plt
 from ortools.sat.python import cp_model
 
-from utils import timeit
+from decomposition import find_components, solve_components
+from utils import Metrics, available_cores, timeit
+from validation import (
+    InputError,
+    as_array,
+    check_feasibility,
+    check_shapes,
+    shape_error,
+)
 
 plt.rcParams.update(
     {
@@ -15,11 +29,206 @@ plt.rcParams["font.family"] = "Times New Roman"
 
 convert_to_millions = 1e-6
 
+share_formulations = ("division", "linear")
+
+transfer_formulations = ("reified", "linear")
+
+
+def relative_gap(objective, bound):
+    """
+    Relative gap between an objective and its bound, as used by CP-SAT's
+    relative_gap_limit
+    """
+    return abs(objective - bound) / max(1.0, abs(objective))
+
+
+async def _solve_in_executor(solver, solve, cancelled):
+    """
+    Run a blocking solve in the event loop's default executor
+
+    If the awaiting task is cancelled, `cancelled` is set, the CP-SAT search
+    is stopped with StopSearch, the solve is allowed to return and
+    CancelledError is raised again. StopSearch does nothing before
+    CpSolver.Solve starts, so `solve` must check `cancelled` right before
+    calling it, and StopSearch is repeated until the solve returns to cover
+    a cancel landing between that check and the start of the search
+    """
+    cancelled.clear()
+    future = asyncio.get_running_loop().run_in_executor(None, solve)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancelled.set()
+        while not future.done():
+            solver.StopSearch()
+            await asyncio.wait([future], timeout=0.01)
+        await future
+        raise
+
+
+def model_family(func):
+    """
+    Record the range of proto variables and constraints added by a
+    model-building method in the model's `families` list
+    """
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        proto = self.model.Proto()
+        variables, constraints = len(proto.variables), len(proto.constraints)
+        result = func(self, *args, **kwargs)
+        self.families.append(
+            (
+                func.__name__,
+                (variables, len(proto.variables)),
+                (constraints, len(proto.constraints)),
+            )
+        )
+        return result
+
+    return wrapper
+
+
+class LinearConstraintEmitter:
+    """
+    Emit linear constraints into a CpModel, dropping structurally
+    identical duplicates
+
+    Two constraints are identical when they have the same variables,
+    coefficients, bounds and enforcement literals. The first one is added
+    to the model, later ones are counted in `n_duplicates` and skipped.
+    Constraints that are edited later by their index (such as the capacity
+    constraints) are added with deduplicate=False, so that no two of them
+    share a constraint.
+
+    Attributes
+    ----------
+    model : CpModel
+
+    n_emitted : int
+        Number of constraints added to the model
+
+    n_duplicates : int
+        Number of duplicate constraints dropped
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.n_emitted = 0
+        self.n_duplicates = 0
+        self._seen = {}
+
+    def add(
+        self,
+        variables,
+        coefficients,
+        lower_bound,
+        upper_bound,
+        enforce=(),
+        deduplicate=True,
+    ):
+        """
+        Add lower_bound <= sum(coefficients * variables) <= upper_bound
+
+        Returns the constraint that holds this relation in the model, which
+        is the previously emitted one for a duplicate. With
+        deduplicate=False the constraint is always added and not recorded
+        """
+        if not deduplicate:
+            return self._emit(
+                variables, coefficients, lower_bound, upper_bound, enforce
+            )
+        terms = {}
+        for variable, coefficient in zip(variables, coefficients):
+            index = variable.Index()
+            terms[index] = terms.get(index, 0) + coefficient
+        key = (
+            tuple(sorted(terms.items())),
+            lower_bound,
+            upper_bound,
+            tuple(sorted(literal.Index() for literal in enforce)),
+        )
+        if key in self._seen:
+            self.n_duplicates += 1
+            return self._seen[key]
+
+        constraint = self._emit(
+            variables, coefficients, lower_bound, upper_bound, enforce
+        )
+        self._seen[key] = constraint
+        return constraint
+
+    def add_sum(self, variables, lower_bound, upper_bound, deduplicate=True):
+        """
+        Add lower_bound <= sum(variables) <= upper_bound
+        """
+        variables = list(variables)
+        return self.add(
+            variables,
+            [1] * len(variables),
+            lower_bound,
+            upper_bound,
+            deduplicate=deduplicate,
+        )
+
+    def _emit(self, variables, coefficients, lower_bound, upper_bound, enforce):
+        constraint = self.model.AddLinearConstraint(
+            cp_model.LinearExpr.WeightedSum(list(variables), list(coefficients)),
+            lower_bound,
+            upper_bound,
+        )
+        if enforce:
+            constraint.OnlyEnforceIf(list(enforce))
+        self.n_emitted += 1
+        return constraint
+
+
+class SolveProgress(cp_model.CpSolverSolutionCallback):
+    """
+    Solution callback that records the wall time, objective and bound of
+    every improving solution found during a solve
+
+    Attributes
+    ----------
+    solutions : list
+        (wall time in seconds, objective, best bound) for every solution,
+        in order
+
+    callback : callable
+        Optional, called with a dict holding the wall_time, objective,
+        bound and relative gap of every solution. The search stops when it
+        returns True, keeping the best solution found
+    """
+
+    def __init__(self, callback=None):
+        super().__init__()
+        self.solutions = []
+        self.callback = callback
+
+    def OnSolutionCallback(self):
+        wall_time = self.WallTime()
+        objective = self.ObjectiveValue()
+        bound = self.BestObjectiveBound()
+        self.solutions.append((wall_time, objective, bound))
+        if self.callback is None:
+            return
+        stop = self.callback(
+            {
+                "wall_time": wall_time,
+                "objective": objective,
+                "bound": bound,
+                "gap": relative_gap(objective, bound),
+            }
+        )
+        if stop:
+            self.StopSearch()
+
 
 class MinimalSupplierSelectionModel:
     def __init__(self, price, demand, capacity=None, share=None):
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
+        self._cancelled = threading.Event()
 
         self.price = price
         self.demand = demand
@@ -27,6 +236,8 @@ class MinimalSupplierSelectionModel:
         self.share = share
         self.n_parts = len(self.demand)
         self.n_suppliers = len(self.price)
+        self.linear = LinearConstraintEmitter(self.model)
+        self.status = None
 
         self.volume = self._create_volume_matrix()
         self.assigned = self._create_assigned_matrix()
@@ -94,15 +305,12 @@ class MinimalSupplierSelectionModel:
         Add a constraint to ensure that the manufactured volume of a part
         is equal to the demand
         """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                self.model.Add(
-                    sum(
-                        self.volume[supplier][part]
-                        for supplier in range(self.n_suppliers)
-                    )
-                    == self.demand[part]
-                )
+        for part in range(self.n_parts):
+            self.linear.add_sum(
+                (self.volume[supplier][part] for supplier in range(self.n_suppliers)),
+                self.demand[part],
+                self.demand[part],
+            )
 
     def _add_constraint_manufacturing_capacity(self):
         """
@@ -110,10 +318,7 @@ class MinimalSupplierSelectionModel:
         than that defined by their manufacturing capacity
         """
         for supplier in range(self.n_suppliers):
-            self.model.Add(
-                sum(self.assigned[supplier][part] for part in range(self.n_parts))
-                <= self.capacity[supplier]
-            )
+            self.linear.add_sum(self.assigned[supplier], 0, self.capacity[supplier])
 
     def _add_constraint_part_share(self):
         """
@@ -122,6 +327,10 @@ class MinimalSupplierSelectionModel:
         """
         for supplier in range(self.n_suppliers):
             for part in range(self.n_parts):
+                # the volume must be 0 without demand, and CP-SAT rejects a
+                # division by 0
+                if self.demand[part] == 0:
+                    continue
                 target = self.model.NewIntVar(0, 100, "volume/demand * 100")
                 numerator = self.volume[supplier][part] * 100
                 denominator = self.demand[part]
@@ -150,7 +359,11 @@ class MinimalSupplierSelectionModel:
         Solve the optimisation problem: minimise
         the cost
         """
-        status = self.solver.Solve(self.model)
+        if self._cancelled.is_set():
+            status = cp_model.UNKNOWN
+        else:
+            status = self.solver.Solve(self.model)
+        self.status = status
         if status == cp_model.OPTIMAL:
             print(
                 "\nOptimal solution found: cost - £{:,.2f}".format(
@@ -162,6 +375,45 @@ class MinimalSupplierSelectionModel:
             print("Feasible solution found")
         else:
             print("No solution found")
+        return status
+
+    async def minimise_cost_async(self):
+        """
+        Solve without blocking the event loop, see minimise_cost
+
+        Cancelling the awaiting task stops the search, or skips it when the
+        search has not started yet
+
+        Returns
+        -------
+        status : int
+
+        solution : dict
+            volume of shape (n_suppliers, n_parts), None if no solution was
+            found
+        """
+        status = await _solve_in_executor(
+            self.solver, self.minimise_cost, self._cancelled
+        )
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return status, None
+        volume = np.array(
+            [[self.solver.Value(v) for v in row] for row in self.volume],
+            dtype=np.int64,
+        )
+        return status, {"volume": volume}
+
+    def model_size(self):
+        """
+        Returns the number of variables and constraints in the model and the
+        number of duplicate linear constraints that were dropped
+        """
+        proto = self.model.Proto()
+        return {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "duplicate_constraints_dropped": self.linear.n_duplicates,
+        }
 
 
 class SupplierSelectionModel:
@@ -170,35 +422,109 @@ class SupplierSelectionModel:
 
     Attributes
     ----------
-    price : list
-        List of prices for every supplier, part and year
+    price : list or ndarray
+        Prices for every supplier, part and year,
+        shape (n_suppliers, n_parts, n_years)
 
-    demand : list
-        The demand (number of units needed) for every part in every year
+    demand : list or ndarray
+        The demand (number of units needed) for every part in every year,
+        shape (n_parts, n_years)
 
-    capacity : list
+    capacity : list or ndarray
+        shape (n_suppliers, n_years)
 
-    supplier_transfer_limit : list
+    supplier_transfer_limit : list or ndarray
+        shape (n_suppliers,)
 
     global_transfer_limit : int
 
-    share : list
+    share : list or ndarray
+        shape (n_suppliers, n_parts)
+
+    minimum_units : list or ndarray
+        shape (n_suppliers, n_parts, n_years)
+
+    trust : list or ndarray
+        shape (n_suppliers, n_parts)
+
+    previous_assigned : list or ndarray
+        Whether a supplier was assigned a part in the year before the first
+        modelled year, shape (n_suppliers, n_parts). Optional, when set
+        transfers into the first year count towards the transfer limits,
+        see rolling.solve_rolling_horizon
 
-    minimum_units : list
+    bids : list or ndarray
+        The (supplier, part) pairs that were quoted, as a list of pairs or a
+        boolean mask of shape (n_suppliers, n_parts). Optional,
+        defaults to every pair. Prices, shares and minimum units of pairs
+        that were not quoted are placeholders and are ignored
 
-    trust : list
+    metrics : Metrics
+        Timings of the build, every variable and constraint family, the
+        solve and the solution extraction, see utils.Metrics
+
+    families : list
+        (method name, proto variable range, proto constraint range) for
+        every variable and constraint family built, see family_breakdown
 
     n_threads : int
+        Number of CP-SAT search workers. Optional, defaults to every core
+        available to the process
+
+    share_formulation : str
+        "division" (default) limits floor(100 * volume / demand) with an
+        auxiliary variable and AddDivisionEquality per cell. "linear" posts
+        100 * volume <= share * demand, with no auxiliary variables
+
+    validate : bool
+        Check the inputs for necessary conditions of feasibility before
+        building the model (default), see validation.check_feasibility.
+        Malformed inputs (ragged lists, wrong shapes, values out of range)
+        are always rejected. Both raise a validation.InputError, a
+        ValueError listing the offending indices
+
+    transfer_formulation : str
+        "reified" (default) links assigned and transferred with two reified
+        constraints per cell and year, one of them a reified !=. "linear"
+        posts transferred = assigned[year] and not assigned[year - 1] as
+        three linear inequalities, which CP-SAT's LP relaxation uses
+        directly
+
+    keep_untrusted_bids : bool
+        Also create variables for the cells that were bid for but are not
+        trusted, with their volumes fixed to 0 by their domains, so that
+        override_trust can trust them without rebuilding the model.
+        Default False, those cells get no variables
 
     Methods
     -------
 
     Notes
     -----
-    - TODO: look at using product() from itertools to avoid nested for loops
+    - Inputs are held as numpy arrays. Variables are only created for the
+      (supplier, part) cells a supplier is eligible for, those it bid for
+      and is trusted with, so the model scales with the number of bids
+      rather than n_suppliers * n_parts. Cell c is supplier `cell_supplier[c]` and part
+      `cell_part[c]`, ordered by supplier then part, and `cell_index`
+      maps (supplier, part) to its cell (-1 if not eligible). With
+      keep_untrusted_bids, the untrusted bids are cells as well
+    - `volume` and `assigned` are object arrays of shape
+      (n_cells, n_years), with the matching proto indices in
+      `volume_index` and `assigned_index`. `transferred` and
+      `transferred_index` only hold the years from `first_transfer_year`,
+      1, or 0 when previous_assigned is set, as nothing can be transferred
+      into the first modelled year otherwise. Solutions
+      are returned with shape (n_suppliers, n_parts, n_years), with 0 for
+      cells that are not eligible
+    - Volume pins, capacity and trust overrides can be changed, removed
+      and undone between solves without rebuilding the model, see
+      pin_volume, override_capacity, override_trust and undo. `edits`
+      holds the current ones. The domains set by override_volume_domain
+      are kept when the edits of their cell change, until they are
+      restored
     """
 
-    @timeit
+    @timeit(phase="build")
     def __init__(
         self,
         price,
@@ -209,139 +535,446 @@ class SupplierSelectionModel:
         share=None,
         minimum_units=None,
         trust=None,
-        n_threads=8,
+        n_threads=None,
+        share_formulation="division",
+        bids=None,
+        previous_assigned=None,
+        transfer_formulation="reified",
+        validate=True,
+        keep_untrusted_bids=False,
     ):
-        self.model = cp_model.CpModel()
-        self.solver = cp_model.CpSolver()
-        self.solver.parameters.num_search_workers = n_threads
-
-        self.price = price
-        self.demand = demand
-        self.capacity = capacity
-        self.supplier_transfer_limit = supplier_transfer_limit
-        self.global_transfer_limit = global_transfer_limit
-        self.share = share
-        self.minimum_units = minimum_units
-        self.trust = trust
-        self.n_suppliers = len(self.price)
-        self.n_parts = len(self.price[0])
-        self.n_years = len(self.price[0][0])
+        self._set_inputs(
+            price,
+            demand,
+            capacity,
+            supplier_transfer_limit,
+            global_transfer_limit,
+            share,
+            minimum_units,
+            trust,
+            n_threads,
+            share_formulation,
+            bids,
+            previous_assigned,
+            transfer_formulation,
+            keep_untrusted_bids,
+        )
+        if validate:
+            self._check_feasibility()
 
-        self.volume = self._create_volume_matrix()
-        self.assigned = self._create_assigned_matrix()
+        self.volume, self.volume_index = self._create_volume_matrix()
+        self._fix_untrusted_volumes()
+        self.assigned, self.assigned_index = self._create_assigned_matrix()
+        self.transferred, self.transferred_index = None, None
 
         self._link_volume_to_assigned()
         self._add_constraint_volume()
-        if self.capacity != None:
+        if self.capacity is not None:
             self._add_constraint_manufacturing_capacity()
-        if self.supplier_transfer_limit != None:
-            self.transferred = self._create_transferred_matrix()
+        if (
+            self.supplier_transfer_limit is not None
+            or self.global_transfer_limit is not None
+        ):
+            self.transferred, self.transferred_index = self._create_transferred_matrix()
             self._link_assigned_to_transferred()
+            if self.previous_assigned is not None:
+                self._link_previous_assigned_to_transferred()
+        if self.supplier_transfer_limit is not None:
             self._add_constraint_supplier_transfer_limit()
-        if self.global_transfer_limit != None:
+        if self.global_transfer_limit is not None:
             self._add_constraint_global_transfer_limit()
-        if self.share != None:
+        if self.share is not None:
             self._add_constraint_part_share()
-        if self.minimum_units != None:
-            self._add_constraint_minimum_units()
-        if self.trust != None:
-            self.t = self._create_intermediate_trust_matrix()
-            self._add_constraint_trust()
+
+    @classmethod
+    def from_proto(cls, proto, variable_index, price, demand, **kwargs):
+        """
+        Restore a model from its proto instead of building it
+
+        Parameters
+        ----------
+        proto : str
+            The model proto in text format, str(model.Proto())
+
+        variable_index : dict
+            The volume, assigned and transferred proto indices returned by
+            variable_index() on the model that was saved
+
+        price, demand, **kwargs
+            The inputs the saved model was built from, see
+            SupplierSelectionModel. They are validated like the
+            constructor's, unless validate=False
+        """
+        self = cls.__new__(cls)
+        validate = kwargs.pop("validate", True)
+        self._set_inputs(price, demand, **kwargs)
+        if validate:
+            self._check_feasibility()
+        self.model.Proto().parse_text_format(proto)
+        get_int_var = self.model.GetIntVarFromProtoIndex
+        get_bool_var = self.model.GetBoolVarFromProtoIndex
+        for name, get_var in [
+            ("volume", get_int_var),
+            ("assigned", get_bool_var),
+            ("transferred", get_bool_var),
+        ]:
+            index = variable_index.get(name)
+            variables = None
+            if index is not None:
+                variables = np.empty(index.size, dtype=object)
+                for i, proto_index in enumerate(index.ravel().tolist()):
+                    variables[i] = get_var(proto_index)
+                variables = variables.reshape(index.shape)
+            setattr(self, name, variables)
+            setattr(self, name + "_index", index)
+        self.capacity_constraints = variable_index.get("capacity_constraints")
+        return self
+
+    def variable_index(self):
+        """
+        Proto indices of the volume, assigned and transferred variables,
+        and of the capacity constraints, see from_proto
+        """
+        return {
+            "volume": self.volume_index,
+            "assigned": self.assigned_index,
+            "transferred": self.transferred_index,
+            "capacity_constraints": self.capacity_constraints,
+        }
+
+    def _set_inputs(
+        self,
+        price,
+        demand,
+        capacity=None,
+        supplier_transfer_limit=None,
+        global_transfer_limit=None,
+        share=None,
+        minimum_units=None,
+        trust=None,
+        n_threads=None,
+        share_formulation="division",
+        bids=None,
+        previous_assigned=None,
+        transfer_formulation="reified",
+        keep_untrusted_bids=False,
+    ):
+        """
+        Store the inputs and the eligible cells, and create an empty model
+        and solver
+        """
+        if share_formulation not in share_formulations:
+            raise ValueError(
+                "share_formulation must be one of {}".format(share_formulations)
+            )
+        if transfer_formulation not in transfer_formulations:
+            raise ValueError(
+                "transfer_formulation must be one of {}".format(transfer_formulations)
+            )
+        self.metrics = Metrics()
+        self.families = []
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+        # set by minimise_cost_async when the awaiting task is cancelled
+        self._cancelled = threading.Event()
+        if n_threads is None:
+            n_threads = available_cores()
+        self.solver.parameters.num_search_workers = n_threads
+        self.share_formulation = share_formulation
+        self.transfer_formulation = transfer_formulation
+
+        self.price = as_array("price", price)
+        self.demand = as_array("demand", demand)
+        self.capacity = as_array("capacity", capacity)
+        self.supplier_transfer_limit = as_array(
+            "supplier_transfer_limit", supplier_transfer_limit
+        )
+        self.global_transfer_limit = global_transfer_limit
+        self.share = as_array("share", share)
+        self.minimum_units = as_array("minimum_units", minimum_units)
+        self.trust = as_array("trust", trust)
+        self.previous_assigned = as_array("previous_assigned", previous_assigned)
+        self.first_transfer_year = 0 if self.previous_assigned is not None else 1
+        if self.price.ndim != 3:
+            raise InputError(
+                [
+                    shape_error(
+                        "price",
+                        "price has shape {}, expected (n_suppliers, n_parts, "
+                        "n_years)".format(self.price.shape),
+                    )
+                ]
+            )
+        self.n_suppliers, self.n_parts, self.n_years = self.price.shape
+        errors = check_shapes(
+            {
+                "demand": self.demand,
+                "capacity": self.capacity,
+                "supplier_transfer_limit": self.supplier_transfer_limit,
+                "global_transfer_limit": as_array(
+                    "global_transfer_limit", global_transfer_limit
+                ),
+                "share": self.share,
+                "minimum_units": self.minimum_units,
+                "trust": self.trust,
+                "previous_assigned": self.previous_assigned,
+            },
+            self.n_suppliers,
+            self.n_parts,
+            self.n_years,
+        )
+        if errors:
+            raise InputError(errors)
+        self.linear = LinearConstraintEmitter(self.model)
+        self.status = None
+        self.solution = None
+        self.solve_stats = None
+        self.capacity_constraints = None
+        self.edits = {}
+        self._edit_history = []
+        self._volume_bounds = None
+        self._domain_overrides = {}
+        self._volume_constraints = {}
+        # bumped by every change to the volume domains, pins and capacities
+        self._edit_version = 0
+
+        bid = self._bid_mask(bids)
+        self.eligible = bid.copy()
+        if self.trust is not None:
+            self.eligible &= self.trust != 0
+        self._set_cells(bid if keep_untrusted_bids else self.eligible)
+
+    @timeit
+    def _check_feasibility(self):
+        """
+        Reject inputs that cannot have a solution before the model is
+        built, see validation.check_feasibility
+        """
+        errors = check_feasibility(self)
+        if errors:
+            raise InputError(errors)
 
     def __sub__(self, other):
         """
         Difference of two objects (Scenario A and Scenario B)
         """
+        value = self._value_to_ndarray() - other._value_to_ndarray()
         for supplier in range(self.n_suppliers):
             print("\nSupplier {:>2}: \n------------\n".format(supplier + 1))
             for part in range(self.n_parts):
-                value = 0
-                for year in range(self.n_years):
-                    value += (
-                        self.price[supplier][part][year]
-                        * self.solver.Value(self.volume[supplier][part][year])
-                    ) - (
-                        other.price[supplier][part][year]
-                        * other.solver.Value(other.volume[supplier][part][year])
-                    )
                 print(
                     "Part {:>2}: £{:>12,.2f} m".format(
-                        part + 1, value * convert_to_millions
+                        part + 1, value[supplier, part] * convert_to_millions
                     )
                 )
 
+    def _bid_mask(self, bids):
+        """
+        Boolean mask of shape (n_suppliers, n_parts) from a list of
+        (supplier, part) bids or a mask, every pair if bids is None
+
+        Only a boolean array is a mask, so that pairs of 0 and 1 are never
+        mistaken for one. Anything else must be an array of (supplier, part)
+        pairs, of shape (n_bids, 2)
+        """
+        shape = (self.n_suppliers, self.n_parts)
+        if bids is None:
+            return np.ones(shape, dtype=bool)
+        bids = np.asarray(bids)
+        if bids.dtype == bool:
+            if bids.shape != shape:
+                raise ValueError(
+                    "bids mask has shape {}, expected {}".format(bids.shape, shape)
+                )
+            return bids.astype(bool)
+        if bids.size == 0:
+            bids = bids.reshape(0, 2)
+        if bids.ndim != 2 or bids.shape[1] != 2:
+            raise ValueError(
+                "bids has shape {}, expected a boolean mask of shape {} or "
+                "(supplier, part) pairs of shape (n_bids, 2)".format(bids.shape, shape)
+            )
+        bids = bids.astype(np.int64)
+        out_of_range = (bids < 0) | (bids >= shape)
+        if out_of_range.any():
+            raise ValueError(
+                "bid {} is outside {} suppliers and {} parts".format(
+                    bids[out_of_range.any(axis=1)][0].tolist(), *shape
+                )
+            )
+        mask = np.zeros(shape, dtype=bool)
+        mask[bids[:, 0], bids[:, 1]] = True
+        return mask
+
+    def _set_cells(self, cells):
+        """
+        Set the (supplier, part) cells that get variables from a boolean
+        mask of shape (n_suppliers, n_parts)
+        """
+        self.cell_supplier, self.cell_part = np.nonzero(cells)
+        self.n_cells = len(self.cell_supplier)
+        self.cell_index = np.full(cells.shape, -1, dtype=np.int64)
+        self.cell_index[self.cell_supplier, self.cell_part] = np.arange(self.n_cells)
+
+        # cells are ordered by supplier, so a supplier's cells are contiguous
+        bounds = np.searchsorted(self.cell_supplier, np.arange(self.n_suppliers + 1))
+        self._supplier_cells = [
+            np.arange(bounds[s], bounds[s + 1]) for s in range(self.n_suppliers)
+        ]
+        order = np.argsort(self.cell_part, kind="stable")
+        bounds = np.searchsorted(self.cell_part[order], np.arange(self.n_parts + 1))
+        self._part_cells = [
+            order[bounds[p] : bounds[p + 1]] for p in range(self.n_parts)
+        ]
+
+    def _trusted(self, supplier, part):
+        """
+        Whether a supplier is trusted with a part, by override_trust or
+        otherwise by the trust it was built with
+        """
+        trusted = self.edits.get(("trust", supplier, part))
+        if trusted is None:
+            return bool(self.eligible[supplier, part])
+        return trusted
+
+    def _cell(self, supplier, part):
+        """
+        Cell of a (supplier, part) pair, or None if it is not eligible
+        """
+        cell = int(self.cell_index[supplier, part])
+        return None if cell < 0 else cell
+
+    def _to_cube(self, cells):
+        """
+        Scatter an array of shape (n_cells, n_years) to an array of shape
+        (n_suppliers, n_parts, n_years), with 0 for cells that are not eligible
+        """
+        cube = np.zeros((self.n_suppliers, self.n_parts, self.n_years), cells.dtype)
+        cube[self.cell_supplier, self.cell_part] = cells
+        return cube
+
+    def _new_int_var_array(self, upper_bound, minimum=None):
+        """
+        Create an array of integer variables in a single pass
+
+        Parameters
+        ----------
+        upper_bound : ndarray
+            Upper bound of every variable, the lower bound is 0
+
+        minimum : ndarray
+            Smallest non-zero value of every variable. Optional, where it is
+            greater than 1 the domain becomes {0} U [minimum, upper_bound]
+
+        Returns
+        -------
+        variables : ndarray
+            Object array of IntVar with the shape of `upper_bound`
+
+        index : ndarray
+            Proto index of every variable in `variables`
+        """
+        shape = upper_bound.shape
+        upper_bound = upper_bound.ravel().tolist()
+        if minimum is None:
+            minimum = [0] * len(upper_bound)
+        else:
+            minimum = np.broadcast_to(minimum, shape).ravel().tolist()
+        first = len(self.model.Proto().variables)
+        new_int_var = self.model.NewIntVar
+        variables = np.empty(len(upper_bound), dtype=object)
+        for i, (ub, lb) in enumerate(zip(upper_bound, minimum)):
+            if lb <= 1:
+                variables[i] = new_int_var(0, ub, "")
+            elif lb > ub:
+                variables[i] = new_int_var(0, 0, "")
+            else:
+                variables[i] = self.model.NewIntVarFromDomain(
+                    cp_model.Domain.FromFlatIntervals([0, 0, int(lb), ub]), ""
+                )
+        index = first + np.arange(variables.size).reshape(shape)
+        return variables.reshape(shape), index
+
+    def _new_bool_var_array(self, shape):
+        """
+        Create an array of boolean variables in a single pass
+        """
+        first = len(self.model.Proto().variables)
+        new_bool_var = self.model.NewBoolVar
+        variables = np.empty(int(np.prod(shape)), dtype=object)
+        for i in range(variables.size):
+            variables[i] = new_bool_var("")
+        index = first + np.arange(variables.size).reshape(shape)
+        return variables.reshape(shape), index
+
+    def _volume_upper_bound(self):
+        """
+        Largest volume a supplier can be awarded for every cell and year
+
+        The demand of the part, limited by the part share. The share bound is
+        the largest volume that satisfies the share constraint of the
+        selected formulation: floor(100 * volume / demand) <= share for
+        "division" and 100 * volume <= share * demand for "linear"
+        """
+        upper_bound = self.demand[self.cell_part].astype(np.int64)
+        if self.share is not None:
+            share = self.share[self.cell_supplier, self.cell_part, None]
+            share = share.astype(np.int64)
+            if self.share_formulation == "linear":
+                share_bound = share * upper_bound // 100
+            else:
+                share_bound = ((share + 1) * upper_bound - 1) // 100
+            upper_bound = np.minimum(upper_bound, share_bound)
+        return np.maximum(upper_bound, 0)
+
+    @timeit
+    @model_family
     def _create_volume_matrix(self):
         """
-        Volume S{supplier}P{part}Y{year}
+        Volume S{supplier}P{part}Y{year} of every eligible cell
+
+        Domains are derived from the data: [0, upper bound] from
+        _volume_upper_bound, or {0} U [minimum units, upper bound] when
+        minimum units are set, which replaces a reified minimum units
+        constraint per cell
         """
-        s = []
-        for supplier in range(self.n_suppliers):
-            p = []
-            for part in range(self.n_parts):
-                y = []
-                for year in range(self.n_years):
-                    y.append(
-                        self.model.NewIntVar(
-                            0, 500, "Volume S{}P{}Y{}".format(supplier, part, year)
-                        )
-                    )
-                p.append(y)
-            s.append(p)
-        return s
+        minimum = None
+        if self.minimum_units is not None:
+            minimum = self.minimum_units[self.cell_supplier, self.cell_part]
+        return self._new_int_var_array(self._volume_upper_bound(), minimum)
 
+    def _fix_untrusted_volumes(self):
+        """
+        Fix the volumes of the untrusted cells kept by keep_untrusted_bids
+        to 0, see _refresh_volume_domain
+        """
+        untrusted = ~self.eligible[self.cell_supplier, self.cell_part]
+        variables = self.model.Proto().variables
+        for index in self.volume_index[untrusted].ravel().tolist():
+            variables[index].domain.clear()
+            variables[index].domain.extend([0, 0])
+
+    @timeit
+    @model_family
     def _create_assigned_matrix(self):
         """
         True if a part has been assigned to a supplier, else false
         """
-        s = []
-        for supplier in range(self.n_suppliers):
-            p = []
-            for part in range(self.n_parts):
-                y = []
-                for year in range(self.n_years):
-                    y.append(
-                        self.model.NewBoolVar(
-                            "Assigned S{}P{}Y{}".format(supplier, part, year)
-                        )
-                    )
-                p.append(y)
-            s.append(p)
-        return s
+        return self._new_bool_var_array((self.n_cells, self.n_years))
 
+    @timeit
+    @model_family
     def _create_transferred_matrix(self):
         """
         True if a part has been transferred to a different supplier, else false
-        """
-        s = []
-        for supplier in range(self.n_suppliers):
-            p = []
-            for part in range(self.n_parts):
-                y = []
-                for year in range(self.n_years):
-                    y.append(
-                        self.model.NewBoolVar(
-                            "Transferred S{}P{}Y{}".format(supplier, part, year)
-                        )
-                    )
-                p.append(y)
-            s.append(p)
-        return s
-
-    def _create_intermediate_trust_matrix(self):
-        """
-        Create an intermediate boolean variable to represent supplier trust
 
-        True - supplier x is trusted to manufacture part y
-        False - supplier x is not trusted to manufacture part y
+        Only created from first_transfer_year, column 0 is that year
         """
-        s = []
-        for supplier in range(self.n_suppliers):
-            p = []
-            for part in range(self.n_parts):
-                p.append(self.model.NewBoolVar("Trust S{}P{}".format(supplier, part)))
-            s.append(p)
-        return s
+        n_years = self.n_years - self.first_transfer_year
+        return self._new_bool_var_array((self.n_cells, n_years))
 
+    @timeit
+    @model_family
     def _link_volume_to_assigned(self):
         """
         Link the volume and assigned matrix
@@ -349,16 +982,12 @@ class SupplierSelectionModel:
         if volume[supplier][part][year] > 0:
             assigned[supplier][part][year] = True
         """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    self.model.Add(self.volume[supplier][part][year] > 0).OnlyEnforceIf(
-                        self.assigned[supplier][part][year]
-                    )
-                    self.model.Add(
-                        self.volume[supplier][part][year] == 0
-                    ).OnlyEnforceIf(self.assigned[supplier][part][year].Not())
+        for volume, assigned in zip(self.volume.flat, self.assigned.flat):
+            self.model.Add(volume > 0).OnlyEnforceIf(assigned)
+            self.model.Add(volume == 0).OnlyEnforceIf(assigned.Not())
 
+    @timeit
+    @model_family
     def _link_assigned_to_transferred(self):
         """
         Constraint 1 : supplier remains the same or the supplier is exited
@@ -371,177 +1000,168 @@ class SupplierSelectionModel:
             transferred[supplier][part][year] = True
 
         Supplier exited or entered
+
+        With the linear transfer formulation, transferred is the supplier
+        entry, assigned[year] and not assigned[year-1], see _link_transfer
         """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(1, self.n_years):
-                    self.model.Add(
-                        self.assigned[supplier][part][year - 1]
-                        >= self.assigned[supplier][part][year]
-                    ).OnlyEnforceIf(self.transferred[supplier][part][year].Not())
+        self._link_transfer(
+            self.assigned[:, :-1].ravel().tolist(),
+            self.assigned[:, 1:].ravel().tolist(),
+            self.transferred[:, 1 - self.first_transfer_year :].ravel().tolist(),
+        )
+
+    @timeit
+    @model_family
+    def _link_previous_assigned_to_transferred(self):
+        """
+        Link the first year to the assignment of the year before it, with
+        the same constraints as _link_assigned_to_transferred
 
-                    self.model.Add(
-                        self.assigned[supplier][part][year - 1]
-                        != self.assigned[supplier][part][year]
-                    ).OnlyEnforceIf(self.transferred[supplier][part][year])
+        if previous_assigned[supplier][part] != assigned[supplier][part][0]:
+            transferred[supplier][part][0] = True
+        """
+        previous_assigned = self.previous_assigned[self.cell_supplier, self.cell_part]
+        self._link_transfer(
+            previous_assigned.astype(int).tolist(),
+            self.assigned[:, 0].tolist(),
+            self.transferred[:, 0].tolist(),
+        )
 
+    def _link_transfer(self, previous, current, transferred):
+        """
+        Link every transferred variable to the assignment of its year
+        (current) and of the year before (previous), a variable or a 0/1
+        constant
+
+        "reified":
+            previous >= current if not transferred
+            previous != current if transferred
+
+        "linear":
+            transferred >= current - previous
+            transferred <= current
+            transferred <= 1 - previous
+        """
+        add = self.model.Add
+        if self.transfer_formulation == "linear":
+            for previous, current, transferred in zip(previous, current, transferred):
+                add(transferred >= current - previous)
+                add(transferred <= current)
+                add(transferred + previous <= 1)
+            return
+        for previous, current, transferred in zip(previous, current, transferred):
+            add(current <= previous).OnlyEnforceIf(transferred.Not())
+            add(current != previous).OnlyEnforceIf(transferred)
+
+    @timeit
+    @model_family
     def _add_constraint_volume(self):
         """
         Add a constraint to ensure that the manufactured volume of a part
         is equal to the demand
         """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    self.model.Add(
-                        sum(
-                            self.volume[supplier][part][year]
-                            for supplier in range(self.n_suppliers)
-                        )
-                        == self.demand[part][year]
-                    )
+        for part, year in np.ndindex(self.n_parts, self.n_years):
+            demand = int(self.demand[part, year])
+            self.linear.add_sum(
+                self.volume[self._part_cells[part], year], demand, demand
+            )
 
+    @timeit
+    @model_family
     def _add_constraint_manufacturing_capacity(self):
         """
         Add a constraint to ensure that a manufacturer is not assigned more
         parts than that defined by their manufacturing capacity
+
+        The proto index of every constraint is kept in capacity_constraints,
+        shape (n_suppliers, n_years), see override_capacity. The constraints
+        are not deduplicated, as suppliers without eligible cells would
+        otherwise share an empty one
         """
-        for supplier in range(self.n_suppliers):
-            for year in range(self.n_years):
-                self.model.Add(
-                    sum(
-                        self.assigned[supplier][part][year]
-                        for part in range(self.n_parts)
-                    )
-                    <= self.capacity[supplier][year]
-                )
+        self.capacity_constraints = np.empty(
+            (self.n_suppliers, self.n_years), dtype=np.int64
+        )
+        for supplier, year in np.ndindex(self.n_suppliers, self.n_years):
+            constraint = self.linear.add_sum(
+                self.assigned[self._supplier_cells[supplier], year],
+                0,
+                int(self.capacity[supplier, year]),
+                deduplicate=False,
+            )
+            self.capacity_constraints[supplier, year] = constraint.Index()
 
+    @timeit
+    @model_family
     def _add_constraint_part_share(self):
         """
         Add a constraint to ensure that the share of a part
         assigned to a supplier is less than the limit
         """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    target = self.model.NewIntVar(0, 100, "volume/demand * 100")
-                    numerator = self.volume[supplier][part][year] * 100
-                    denominator = self.demand[part][year]
-                    self.model.AddDivisionEquality(target, numerator, denominator)
-                    self.model.Add(target <= self.share[supplier][part])
+        shape = (self.n_cells, self.n_years)
+        demand = self.demand[self.cell_part].ravel().tolist()
+        share = self.share[self.cell_supplier, self.cell_part, None]
+        share = np.broadcast_to(share, shape).ravel().tolist()
+        if self.share_formulation == "linear":
+            for volume, denominator, limit in zip(self.volume.flat, demand, share):
+                self.model.Add(100 * volume <= limit * denominator)
+            return
+        for volume, denominator, limit in zip(self.volume.flat, demand, share):
+            # the volume domain is [0, 0] without demand, and CP-SAT rejects
+            # a division by 0
+            if denominator == 0:
+                continue
+            target = self.model.NewIntVar(0, 100, "volume/demand * 100")
+            self.model.AddDivisionEquality(target, volume * 100, denominator)
+            self.model.Add(target <= limit)
 
+    @timeit
+    @model_family
     def _add_constraint_supplier_transfer_limit(self):
         """
         Add a constraint to ensure that the number of parts transferred to a
         supplier per year is less than the specified limit
         """
-        for supplier in range(self.n_suppliers):
-            for year in range(self.n_years):
-                self.model.Add(
-                    sum(
-                        self.transferred[supplier][part][year]
-                        for part in range(self.n_parts)
-                    )
-                    <= self.supplier_transfer_limit[supplier]
-                )
+        n_years = self.n_years - self.first_transfer_year
+        for supplier, year in np.ndindex(self.n_suppliers, n_years):
+            self.linear.add_sum(
+                self.transferred[self._supplier_cells[supplier], year],
+                0,
+                int(self.supplier_transfer_limit[supplier]),
+            )
 
+    @timeit
+    @model_family
     def _add_constraint_global_transfer_limit(self):
         """
         Add a constraint to ensure that the number of parts transferred
         globally is less than the specified limit
         """
-        for year in range(self.n_years):
-            self.model.Add(
-                sum(
-                    sum(
-                        self.transferred[supplier][part][year]
-                        for supplier in range(self.n_suppliers)
-                    )
-                    for part in range(self.n_parts)
-                )
-                <= self.global_transfer_limit
+        for year in range(self.n_years - self.first_transfer_year):
+            self.linear.add_sum(
+                self.transferred[:, year], 0, int(self.global_transfer_limit)
             )
 
-    def _add_constraint_minimum_units(self):
-        """
-        Add a constraint to enforce a minimum number of units - a supplier
-        will only accept a contract to manufacture a part if the
-        number of units awarded exceeds a minimum threshold
-
-        if assigned[supplier][part][year] == True:
-            self.volume[supplier][part][year]
-                        > self.minimum_units[supplier][part][year]
-        """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    self.model.Add(
-                        self.volume[supplier][part][year]
-                        >= self.minimum_units[supplier][part][year]
-                    ).OnlyEnforceIf(self.assigned[supplier][part][year])
-
-    def _add_constraint_trust(self):
-        """
-        Add a constraint that a supplier can only be assigned to manufacture
-        a part if they are trusted - supplier x cannot be assigned part y if
-        trust is False
-
-        if trust is False:
-            supplier x cannot be assigned part y
-
-        Notes
-        -----
-        t = (self.trust[supplier][part] == 0)
-        self.model.Add(self.volume[supplier][part][year] == 0).OnlyEnforceIf(t)
-        """
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                self.model.Add(self.trust[supplier][part] == 0).OnlyEnforceIf(
-                    self.t[supplier][part]
-                )  # if trust is False
-                self.model.Add(self.trust[supplier][part] == 1).OnlyEnforceIf(
-                    self.t[supplier][part].Not()
-                )  # if trust is True
-                for year in range(self.n_years):
-                    self.model.Add(
-                        self.volume[supplier][part][year] == 0
-                    ).OnlyEnforceIf(self.t[supplier][part])
-                    self.model.Add(
-                        self.volume[supplier][part][year] >= 0
-                    ).OnlyEnforceIf(self.t[supplier][part].Not())
-
     def _compute_cost(self):
-        cost = 0
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    cost += (
-                        self.price[supplier][part][year]
-                        * self.volume[supplier][part][year]
-                    )
-        return cost
+        price = self.price[self.cell_supplier, self.cell_part]
+        return cp_model.LinearExpr.WeightedSum(
+            self.volume.ravel().tolist(), price.ravel().tolist()
+        )
 
     def print_solution(
         self, volume=False, price=False, assigned=False, transferred=False
     ):
+        solution = self._get_solution()
         for part in range(self.n_parts):
             self._print_header(part)
             for supplier in range(self.n_suppliers):
-                v = []
-                p = []
-                a = []
-                t = []
-                for year in range(self.n_years):
-                    if volume:
-                        v.append(self.solver.Value(self.volume[supplier][part][year]))
-                    if price:
-                        p.append(self.solver.Value(self.price[supplier][part][year]))
-                    if assigned:
-                        a.append(self.solver.Value(self.assigned[supplier][part][year]))
-                    if transferred:
-                        t.append(
-                            self.solver.Value(self.transferred[supplier][part][year])
-                        )
+                v = solution["volume"][supplier, part].tolist() if volume else []
+                p = self.price[supplier, part].tolist() if price else []
+                a = solution["assigned"][supplier, part].tolist() if assigned else []
+                t = (
+                    solution["transferred"][supplier, part].tolist()
+                    if transferred
+                    else []
+                )
                 self._print_line(supplier, p, v, a, t)
 
     def _print_header(self, part):
@@ -574,28 +1194,19 @@ class SupplierSelectionModel:
                             print("{:>10}".format(arg[year]))
 
     def print_work_value(self):
+        value = self._value_to_ndarray().sum(axis=1)
         for supplier in range(self.n_suppliers):
-            value = 0
             print("\nSupplier {:>2}: ".format(supplier + 1), end="")
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    value += self.price[supplier][part][year] * self.solver.Value(
-                        self.volume[supplier][part][year]
-                    )
-            print("£{:>12,.2f} m".format(value * convert_to_millions))
+            print("£{:>12,.2f} m".format(value[supplier] * convert_to_millions))
 
     def print_work_value_detailed(self):
+        value = self._value_to_ndarray()
         for supplier in range(self.n_suppliers):
             print("\nSupplier {:>2}: \n------------\n".format(supplier + 1))
             for part in range(self.n_parts):
-                value = 0
-                for year in range(self.n_years):
-                    value += self.price[supplier][part][year] * self.solver.Value(
-                        self.volume[supplier][part][year]
-                    )
                 print(
                     "Part {:>2}: £{:>12,.2f} m".format(
-                        part + 1, value * convert_to_millions
+                        part + 1, value[supplier, part] * convert_to_millions
                     )
                 )
 
@@ -603,13 +1214,179 @@ class SupplierSelectionModel:
         pass
 
     @timeit
-    def minimise_cost(self):
+    def estimate_cost(self):
+        """
+        Fast lower bound and greedy feasible assignment, without CP-SAT
+
+        The lower bound fills the demand of every part and year from its
+        cheapest eligible suppliers up to their share limits, ignoring
+        capacity, minimum units and transfer limits. The greedy assignment
+        takes the parts in order of decreasing demand and awards each one to
+        its cheapest suppliers that still have capacity, up to their share
+        limit. An award below the minimum units is raised to the minimum by
+        taking volume back from the previous award, or skipped. Transfer
+        limits are not considered.
+
+        Both start from the current model: pinned volumes are awarded
+        first, and the edits, domain overrides and capacity overrides
+        restrict the rest. The estimate records the state it was computed
+        for, and minimise_cost only uses it as a hint once the edits or the
+        prices have changed.
+
+        Returns
+        -------
+        estimate : dict
+            lower_bound (None if the share limits cannot cover the demand,
+            so the problem is infeasible), greedy_volume of shape
+            (n_suppliers, n_parts, n_years), greedy_cost (None if the
+            greedy assignment failed) and state, to be passed to
+            minimise_cost
+        """
+        volume_lower_bound, minimum, upper_bound = self._edited_volume_bounds()
+        price = self.price[self.cell_supplier, self.cell_part].astype(np.int64)
+        lower_bound = self._lower_bound(upper_bound, price)
+        greedy = None
+        if lower_bound is not None:
+            greedy = self._greedy_volume(
+                volume_lower_bound, minimum, upper_bound, price
+            )
+        return {
+            "lower_bound": lower_bound,
+            "greedy_volume": None if greedy is None else self._to_cube(greedy),
+            "greedy_cost": None if greedy is None else int((price * greedy).sum()),
+            "state": self._estimate_state(),
+        }
+
+    def _lower_bound(self, upper_bound, price):
+        lower_bound = 0
+        for year in range(self.n_years):
+            # cells grouped by part, cheapest first
+            order = np.lexsort((price[:, year], self.cell_part))
+            part = self.cell_part[order]
+            available = upper_bound[order, year]
+            cumulative = np.cumsum(available) - available
+            first = np.searchsorted(part, part)
+            before = cumulative - cumulative[first]
+            taken = np.clip(self.demand[part, year] - before, 0, available)
+            covered = np.bincount(part, taken, minlength=self.n_parts)
+            if np.any(covered < self.demand[:, year]):
+                return None
+            lower_bound += int((taken * price[order, year]).sum())
+        return lower_bound
+
+    def _greedy_volume(self, lower_bound, minimum, upper_bound, price):
+        # pinned volumes are awarded up front
+        fixed = lower_bound == upper_bound
+        volume = np.where(fixed, upper_bound, 0)
+        minimum = np.maximum(minimum, lower_bound)
+        all_capacity = self._edited_capacity()
+        for year in range(self.n_years):
+            if all_capacity is None:
+                capacity = None
+            else:
+                capacity = all_capacity[:, year].copy()
+                np.subtract.at(capacity, self.cell_supplier[volume[:, year] > 0], 1)
+            order = np.lexsort((price[:, year], self.cell_part))
+            bounds = np.searchsorted(
+                self.cell_part[order], np.arange(self.n_parts + 1)
+            ).tolist()
+            pinned = np.bincount(
+                self.cell_part, volume[:, year], minlength=self.n_parts
+            ).astype(np.int64)
+            demand = (self.demand[:, year] - pinned).tolist()
+            for part in np.argsort(self.demand[:, year], kind="stable")[::-1]:
+                need = demand[part]
+                if need < 0:
+                    return None
+                previous = None
+                for cell in order[bounds[part] : bounds[part + 1]].tolist():
+                    if need == 0:
+                        break
+                    if fixed[cell, year]:
+                        continue
+                    supplier = self.cell_supplier[cell]
+                    if capacity is not None and capacity[supplier] <= 0:
+                        continue
+                    amount = min(int(upper_bound[cell, year]), need)
+                    if amount < minimum[cell, year] <= upper_bound[cell, year]:
+                        # award the minimum and take the excess back from
+                        # the previous (cheaper) award if it stays valid
+                        excess = minimum[cell, year] - amount
+                        if previous is None or (
+                            volume[previous, year] - excess
+                            < max(minimum[previous, year], 1)
+                        ):
+                            continue
+                        volume[previous, year] -= excess
+                        amount += excess
+                        need += excess
+                    if amount <= 0:
+                        continue
+                    volume[cell, year] = amount
+                    need -= amount
+                    previous = cell
+                    if capacity is not None:
+                        capacity[supplier] -= 1
+                if need > 0:
+                    return None
+        return volume
+
+    @timeit
+    def minimise_cost(
+        self,
+        estimate=None,
+        max_time_in_seconds=None,
+        relative_gap_limit=None,
+        callback=None,
+    ):
         """
         Solve the optimisation problem: minimise
         the cost
+
+        Parameters
+        ----------
+        estimate : dict
+            The result of estimate_cost. Optional, the greedy assignment
+            replaces the solution hint and the objective is bounded below by
+            the lower bound, and above by the greedy cost when there are no
+            transfer limits and the greedy assignment satisfies the current
+            pins and edits. An estimate computed before the last edit or
+            price change is only used as a hint (see estimate_cost)
+
+        max_time_in_seconds : float
+            Time limit for this solve. Optional
+
+        relative_gap_limit : float
+            Stop when |objective - bound| / |objective| is below this limit.
+            Optional
+
+        callback : callable
+            Called with the wall_time, objective, bound and gap of every
+            improving solution, see SolveProgress. Returning True stops the
+            search. Optional
+
+        Notes
+        -----
+        A solve stopped by a limit or the callback keeps its best solution,
+        with status FEASIBLE unless optimality was proven
         """
         self.model.Minimize(self._compute_cost())
-        status = self.solver.Solve(self.model)
+        if estimate is not None:
+            self._apply_estimate(estimate)
+        progress = SolveProgress(callback)
+        parameters = self.solver.parameters
+        previous = (parameters.max_time_in_seconds, parameters.relative_gap_limit)
+        if max_time_in_seconds is not None:
+            parameters.max_time_in_seconds = max_time_in_seconds
+        if relative_gap_limit is not None:
+            parameters.relative_gap_limit = relative_gap_limit
+        try:
+            status = self._solve(progress)
+        finally:
+            parameters.max_time_in_seconds, parameters.relative_gap_limit = previous
+        self.status = status
+        self.solution = self._extract_solution()
+        self.solve_stats = self._solve_stats(progress)
         if status == cp_model.OPTIMAL:
             print(
                 "\nOptimal solution found: cost - £{:,.2f}".format(
@@ -620,29 +1397,789 @@ class SupplierSelectionModel:
             print("Feasible solution found")
         else:
             print("No solution found")
+        return status
+
+    async def minimise_cost_async(self, **kwargs):
+        """
+        Solve without blocking the event loop
+
+        minimise_cost runs in the loop's default executor. Cancelling the
+        awaiting task stops the search (StopSearch), or skips it when the
+        search has not started yet, and waits for the solve to return before
+        CancelledError is raised
+
+        Parameters
+        ----------
+        **kwargs
+            minimise_cost arguments
+
+        Returns
+        -------
+        status : int
+
+        solution : dict
+            volume, assigned and transferred arrays, see _extract_solution,
+            None if no solution was found
+        """
+        status = await _solve_in_executor(
+            self.solver, partial(self.minimise_cost, **kwargs), self._cancelled
+        )
+        return status, self.solution
+
+    def _apply_estimate(self, estimate):
+        if estimate["lower_bound"] is None:
+            return
+        upper_bound = cp_model.INT_MAX
+        greedy = estimate["greedy_volume"]
+        if greedy is not None:
+            self.set_solution_hint(greedy)
+        if estimate.get("state") != self._estimate_state():
+            # the bounds of a stale estimate could cut off the optimum
+            return
+        if greedy is not None:
+            if self.transferred is None and self._satisfies_model(greedy):
+                upper_bound = int((self.price * greedy).sum())
+        self.model.Proto().objective.domain.extend(
+            [estimate["lower_bound"], upper_bound]
+        )
+
+    def _estimate_state(self):
+        """
+        The edits and prices an estimate is computed for, see estimate_cost
+        """
+        price = np.ascontiguousarray(self.price)
+        digest = hashlib.sha1(price.tobytes()).hexdigest()
+        return self._edit_version, price.dtype.str, price.shape, digest
+
+    def _satisfies_model(self, volume):
+        """
+        Whether a volume array of shape (n_suppliers, n_parts, n_years)
+        meets the demand, the current volume domains and capacities, see
+        _edited_volume_bounds and _edited_capacity. Transfer limits are not
+        checked
+        """
+        volume = np.asarray(volume)
+        cells = volume[self.cell_supplier, self.cell_part]
+        if np.any(volume < 0) or cells.sum() != volume.sum():
+            return False
+        lower_bound, minimum, upper_bound = self._edited_volume_bounds()
+        in_domain = np.where(
+            cells > 0,
+            (cells >= np.maximum(np.maximum(lower_bound, minimum), 1))
+            & (cells <= upper_bound),
+            lower_bound <= 0,
+        )
+        if not in_domain.all() or not np.array_equal(volume.sum(axis=0), self.demand):
+            return False
+        capacity = self._edited_capacity()
+        return capacity is None or bool(np.all((volume > 0).sum(axis=1) <= capacity))
+
+    @timeit(phase="solve")
+    def _solve(self, callback):
+        if self._cancelled.is_set():
+            # stop at once, but keep a solver response for the solve stats;
+            # minimise_cost restores the time limit
+            self.solver.parameters.max_time_in_seconds = 0
+        return self.solver.Solve(self.model, callback)
+
+    @timeit
+    def minimise_cost_decomposed(
+        self, total_cores=None, max_workers=None, min_batch_variables=1000
+    ):
+        """
+        Solve the optimisation problem by solving its independent
+        sub-problems separately
+
+        Without capacity and transfer limits, every part (and every year
+        without transfers) is an independent sub-problem. The connected
+        components of the constraint graph are found, packed into batches
+        of at least `min_batch_variables` variables and solved in a process
+        pool sharing `total_cores`, see decomposition.solve_components. The
+        solutions are stitched back, so the usual solution accessors work.
+        When at most one component holds volume variables, e.g. capacity
+        and transfer limits couple every part, the monolithic minimise_cost
+        is used instead
+
+        solve_stats has the keys of minimise_cost, with the objective and
+        best bound summed over the components, and n_components and
+        n_batches. The batch solves do not report their solutions, so
+        n_solutions and the times to the first and best solution are None
+        """
+        self.model.Minimize(self._compute_cost())
+        labels = find_components(self.model.Proto())
+        if labels is None or len(np.unique(labels[self.volume_index])) <= 1:
+            print("Model is not decomposable: solving monolithic model")
+            return self.minimise_cost()
+
+        start = time.perf_counter()
+        status, objective, bound, values, n_batches = self._solve_components(
+            labels, total_cores, max_workers, min_batch_variables
+        )
+        self.status = status
+        self.solution = self._extract_solution(values)
+        wall_time = time.perf_counter() - start
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        self.solve_stats = {
+            "status": self.solver.StatusName(status),
+            "objective": objective,
+            "best_bound": bound,
+            "gap": relative_gap(objective, bound) if found else None,
+            "n_solutions": None,
+            "time_to_first_solution": None,
+            "time_to_best_solution": None,
+            "time_to_optimal": wall_time if status == cp_model.OPTIMAL else None,
+            "wall_time": wall_time,
+            "n_components": len(np.unique(labels[self.volume_index])),
+            "n_batches": n_batches,
+        }
+        if status == cp_model.OPTIMAL:
+            print("\nOptimal solution found: cost - £{:,.2f}".format(objective))
+        elif status == cp_model.FEASIBLE:
+            print("Feasible solution found")
+        else:
+            print("No solution found")
+        return status
+
+    @timeit(phase="solve")
+    def _solve_components(self, labels, total_cores, max_workers, min_batch_variables):
+        return solve_components(
+            self.model.Proto(), labels, total_cores, max_workers, min_batch_variables
+        )
+
+    def _solve_stats(self, progress):
+        """
+        Summarise the last solve
+
+        time_to_first_solution is the wall time at which the first feasible
+        solution was found, time_to_best_solution when the final incumbent
+        was found and time_to_optimal the wall time of the solve when
+        optimality was proven (None otherwise). objective, best_bound and
+        gap are those of the final incumbent (None without a solution)
+        """
+        solutions = progress.solutions
+        found = self.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        objective = self.solver.ObjectiveValue() if found else None
+        bound = self.solver.BestObjectiveBound() if found else None
+        return {
+            "status": self.solver.StatusName(self.status),
+            "objective": objective,
+            "best_bound": bound,
+            "gap": relative_gap(objective, bound) if found else None,
+            "n_solutions": len(solutions),
+            "time_to_first_solution": solutions[0][0] if solutions else None,
+            "time_to_best_solution": solutions[-1][0] if solutions else None,
+            "time_to_optimal": (
+                self.solver.WallTime() if self.status == cp_model.OPTIMAL else None
+            ),
+            "wall_time": self.solver.WallTime(),
+        }
+
+    def set_solution_hint(self, previous):
+        """
+        Hint the next solve with a previous solution (warm start)
+
+        Parameters
+        ----------
+        previous : SupplierSelectionModel, list or ndarray
+            A solved model, or a volume array of shape
+            (n_suppliers, n_parts, n_years). Volume variables are hinted
+            with the volumes, assigned variables with volume > 0 and
+            transferred variables with the supplier entries that follow.
+            Existing hints are replaced
+        """
+        if isinstance(previous, SupplierSelectionModel):
+            previous = previous.return_volume_array()
+        volume = np.asarray(previous)
+        shape = (self.n_suppliers, self.n_parts, self.n_years)
+        if volume.shape != shape:
+            raise ValueError(
+                "hint has shape {}, expected {}".format(volume.shape, shape)
+            )
+        volume = volume[self.cell_supplier, self.cell_part]
+        self.model.ClearHints()
+        hint = self.model.Proto().solution_hint
+        hint.vars.extend(self.volume_index.ravel().tolist())
+        hint.values.extend(volume.ravel().tolist())
+        assigned = volume > 0
+        hint.vars.extend(self.assigned_index.ravel().tolist())
+        hint.values.extend(assigned.ravel().astype(int).tolist())
+        if self.transferred is not None:
+            transferred = np.zeros_like(assigned)
+            transferred[:, 1:] = assigned[:, 1:] & ~assigned[:, :-1]
+            if self.previous_assigned is not None:
+                previous = self.previous_assigned[self.cell_supplier, self.cell_part]
+                transferred[:, 0] = assigned[:, 0] & ~previous.astype(bool)
+            transferred = transferred[:, self.first_transfer_year :]
+            hint.vars.extend(self.transferred_index.ravel().tolist())
+            hint.values.extend(transferred.ravel().astype(int).tolist())
+
+    @timeit(phase="extraction")
+    def _extract_solution(self, values=None):
+        """
+        Read every variable value from the solver response once and
+        return the volume, assigned and transferred arrays, each of shape
+        (n_suppliers, n_parts, n_years), or None if no solution was found
+
+        `values` holds the value of every proto variable when the solution
+        does not come from self.solver, see minimise_cost_decomposed
+        """
+        if self.status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        if values is None:
+            response = self.solver.ResponseProto().solution
+            values = np.fromiter(response, dtype=np.int64, count=len(response))
+        solution = {
+            "volume": self._to_cube(values[self.volume_index]),
+            "assigned": self._to_cube(values[self.assigned_index]),
+        }
+        if self.transferred is not None:
+            transferred = np.zeros((self.n_cells, self.n_years), dtype=np.int64)
+            transferred[:, self.first_transfer_year :] = values[self.transferred_index]
+            solution["transferred"] = self._to_cube(transferred)
+        return solution
+
+    def _get_solution(self):
+        if self.status is None:
+            raise ValueError("optimiser has not run")
+        if self.solution is None:
+            raise ValueError("optimiser has not found a solution")
+        return self.solution
 
     def set_volume_constraint(self, supplier, part, year, vol):
         """
         Setter function - set a constraint on the volume for a
         given supplier, part and year
+
+        A supplier can only be pinned to 0 for a part it is not eligible for.
+        The pin is permanent, see pin_volume and pin_volumes for pins that
+        can be undone
+        """
+        cell = self._cell(supplier, part)
+        if cell is None:
+            if vol != 0:
+                raise ValueError(
+                    "supplier {} is not eligible for part {}".format(supplier, part)
+                )
+            return
+        self.linear.add([self.volume[cell, year]], [1], vol, vol)
+        self._volume_constraints[supplier, part, year] = vol
+        self._edit_version += 1
+
+    def override_volume_domain(self, supplier, part, year, lower_bound, upper_bound):
+        """
+        Restrict the domain of a volume variable to [lower_bound, upper_bound]
+        in place, without adding a constraint
+
+        The new domain is the intersection with the current one, so trust,
+        share and minimum units still hold, and the override holds until it
+        is restored, whatever edits are made to the cell in between. Returns
+        the previous domain as flat intervals, to be passed to
+        restore_volume_domain. Cells that are not eligible have no variable
+        and the fixed domain [0, 0]
+        """
+        cell = self._cell(supplier, part)
+        if cell is None:
+            previous = [0, 0]
+        else:
+            variable = self.model.Proto().variables[int(self.volume_index[cell, year])]
+            previous = list(variable.domain)
+        domain = cp_model.Domain.from_flat_intervals(previous).intersection_with(
+            cp_model.Domain(lower_bound, upper_bound)
+        )
+        if domain.is_empty():
+            raise ValueError(
+                "volume [{}, {}] is outside the domain {} of "
+                "supplier {}, part {}, year {}".format(
+                    lower_bound, upper_bound, previous, supplier, part, year
+                )
+            )
+        if cell is not None:
+            self._domain_overrides.setdefault((supplier, part, year), []).append(
+                (lower_bound, upper_bound)
+            )
+            self._edit_version += 1
+            variable.domain.clear()
+            variable.domain.extend(domain.flattened_intervals())
+        return previous
+
+    def restore_volume_domain(self, supplier, part, year, domain):
+        """
+        Restore a volume domain returned by override_volume_domain
+
+        The last override of the volume is removed and its domain rebuilt
+        from the edits and the remaining overrides, so edits made since the
+        override are kept. `domain` is only used for volumes without an
+        override
+        """
+        cell = self._cell(supplier, part)
+        if cell is None:
+            return
+        overrides = self._domain_overrides.get((supplier, part, year))
+        if overrides:
+            overrides.pop()
+            if not overrides:
+                del self._domain_overrides[supplier, part, year]
+            self._edit_version += 1
+            self._refresh_volume_domain(supplier, part, year)
+            return
+        variable = self.model.Proto().variables[int(self.volume_index[cell, year])]
+        variable.domain.clear()
+        variable.domain.extend(domain)
+        self._edit_version += 1
+
+    @timeit(phase="edit")
+    def pin_volume(self, supplier, part, year, volume=None):
+        """
+        Pin the volume of a supplier, part and year for the following
+        solves, or remove the pin with volume=None
+
+        Unlike set_volume_constraint, the pin is a bound change on the
+        volume variable, so it can be changed, removed or undone between
+        solves without rebuilding the model, see undo
+        """
+        self._edit(("volume", supplier, part, year), volume)
+
+    @timeit(phase="edit")
+    def override_capacity(self, supplier, year, capacity=None):
+        """
+        Replace the capacity of a supplier in a year for the following
+        solves, or remove the override with capacity=None
+
+        The domain of the capacity constraint is changed in place, so the
+        capacity can be raised as well as lowered. Models built without
+        capacity get the constraint the first time it is overridden
+        """
+        if capacity is not None and capacity < 0:
+            raise ValueError("capacity must be positive, got {}".format(capacity))
+        if self.capacity is not None and self.capacity_constraints is None:
+            raise ValueError("the capacity constraints of this model are unknown")
+        self._edit(("capacity", supplier, year), capacity)
+
+    @timeit(phase="edit")
+    def override_trust(self, supplier, part, trusted=None):
+        """
+        Trust or distrust a supplier with a part for the following solves,
+        or remove the override with trusted=None
+
+        Distrusting fixes the volumes of the cell to 0 in every year.
+        Cells that are not eligible have no variables, so they can only be
+        trusted by rebuilding the model, unless they were bid for and the
+        model was built with keep_untrusted_bids
+        """
+        if trusted is not None:
+            trusted = bool(trusted)
+            if trusted and self._cell(supplier, part) is None:
+                raise ValueError(
+                    "supplier {} is not eligible for part {}, rebuild the model "
+                    "to trust it".format(supplier, part)
+                )
+        self._edit(("trust", supplier, part), trusted)
+
+    @timeit(phase="edit")
+    def pin_volumes(self, volume, supplier=None, part=None, year=None):
+        """
+        Pin many volumes at once for the following solves
+
+        The pins are applied as fixed variable domains, like pin_volume,
+        and are undone together by a single undo. They are checked against
+        the volume domains and the demand before the model is changed, so
+        infeasible pins fail here rather than after a solve. Without pins
+        (a fully masked array or empty index arrays) nothing changes and
+        nothing is added to the undo history
+
+        Parameters
+        ----------
+        volume : ndarray or MaskedArray
+            A value per pin with the `supplier`, `part` and `year` index
+            arrays, or without them an array of shape
+            (n_suppliers, n_parts, n_years), masked where volumes are not
+            pinned
+
+        supplier, part, year : ndarray
+            Index arrays of the pins. Optional
+
+        Raises
+        ------
+        ValueError
+            If a pin is outside its volume domain (for example a volume on
+            a cell that is not eligible, or above the share), the pins of a
+            part and year exceed its demand, or every supplier of a part
+            and year is pinned below its demand. Pins already set, by
+            set_volume_constraint as well, count towards the demand checks
+        """
+        shape = (self.n_suppliers, self.n_parts, self.n_years)
+        if supplier is None:
+            if np.shape(volume) != shape:
+                raise ValueError(
+                    "volume has shape {}, expected {}".format(np.shape(volume), shape)
+                )
+            supplier, part, year = np.nonzero(~np.ma.getmaskarray(volume))
+            volume = np.ma.getdata(volume)[supplier, part, year]
+        supplier, part, year, volume = (
+            np.asarray(array, dtype=np.int64).ravel()
+            for array in np.broadcast_arrays(supplier, part, year, volume)
+        )
+        if volume.size == 0:
+            return
+        flat = np.ravel_multi_index((supplier, part, year), shape)
+        if len(np.unique(flat)) < len(flat):
+            raise ValueError("a volume is pinned more than once")
+
+        pinned = np.zeros(shape, dtype=bool)
+        pins = np.zeros(shape, dtype=np.int64)
+        for key, value in self._volume_constraints.items():
+            pinned[key] = True
+            pins[key] = value
+        for key, value in self.edits.items():
+            if key[0] == "volume":
+                pinned[key[1:]] = True
+                pins[key[1:]] = value
+        pinned[supplier, part, year] = True
+        pins[supplier, part, year] = volume
+        self._check_pins(pinned, pins, supplier, part, year)
+
+        keys = [
+            ("volume", s, p, y)
+            for s, p, y in zip(supplier.tolist(), part.tolist(), year.tolist())
+        ]
+        edits = self.edits
+        self._edit_history.append([(key, edits.get(key)) for key in keys])
+        edits.update(zip(keys, volume.tolist()))
+        self._edit_version += 1
+
+        # only the eligible cells have variables
+        cell = self.cell_index[supplier, part]
+        eligible = cell >= 0
+        index = self.volume_index[cell[eligible], year[eligible]].tolist()
+        proto_variables = self.model.Proto().variables
+        for index, value in zip(index, volume[eligible].tolist()):
+            domain = proto_variables[index].domain
+            domain.clear()
+            domain.extend((value, value))
+
+    def _check_pins(self, pinned, pins, supplier, part, year):
+        """
+        Check new pins, given by their index arrays, against the volume
+        domains derived from the data and every pin (pinned, pins of shape
+        (n_suppliers, n_parts, n_years)) against the demand
+        """
+        cell_lower_bound, cell_minimum, cell_upper_bound = self._edited_volume_bounds(
+            pins=False
+        )
+        shape = (self.n_suppliers, self.n_parts, self.n_years)
+        cells = (self.cell_supplier, self.cell_part)
+        lower_bound = np.zeros(shape, dtype=np.int64)
+        lower_bound[cells] = cell_lower_bound
+        upper_bound = np.zeros(shape, dtype=np.int64)
+        upper_bound[cells] = cell_upper_bound
+        minimum = np.ones(shape, dtype=np.int64)
+        minimum[cells] = np.maximum(np.maximum(cell_minimum, cell_lower_bound), 1)
+
+        value = pins[supplier, part, year]
+        invalid = np.where(
+            value == 0,
+            lower_bound[supplier, part, year] > 0,
+            (value < minimum[supplier, part, year])
+            | (value > upper_bound[supplier, part, year]),
+        )
+        if invalid.any():
+            raise ValueError(
+                "{} pins are outside their volume domain, first at supplier {}, "
+                "part {}, year {}".format(
+                    invalid.sum(),
+                    supplier[invalid][0],
+                    part[invalid][0],
+                    year[invalid][0],
+                )
+            )
+
+        total = pins.sum(axis=0)
+        free = (~pinned & (upper_bound > 0)).any(axis=0)
+        invalid = (total > self.demand) | (~free & (total < self.demand))
+        invalid &= pinned.any(axis=0)
+        if invalid.any():
+            part, year = np.argwhere(invalid)[0]
+            raise ValueError(
+                "pins of {} part-years do not meet the demand, first part {} "
+                "year {}: {} pinned, demand {}".format(
+                    invalid.sum(),
+                    part,
+                    year,
+                    total[part, year],
+                    self.demand[part, year],
+                )
+            )
+
+    def undo(self):
+        """
+        Revert the last edit, or the last pin_volumes call
+
+        Returns
+        -------
+        keys : list
+            The keys in `edits` of the reverted edits, empty if there was
+            nothing to undo
+        """
+        if not self._edit_history:
+            return []
+        history = self._edit_history.pop()
+        for key, previous in reversed(history):
+            self._apply_edit(key, previous)
+        return [key for key, _ in history]
+
+    def clear_edits(self):
+        """
+        Remove every edit, restoring the model as it was built
+        """
+        while self._edit_history:
+            self.undo()
+
+    def _edit(self, key, value):
+        previous = self.edits.get(key)
+        self._apply_edit(key, value)
+        self._edit_history.append([(key, previous)])
+
+    def _apply_edit(self, key, value):
+        """
+        Set (or remove, with value None) an edit and update the variable
+        domains or the constraint it affects. A ValueError is raised, and
+        the model left unchanged, if the edit empties a volume domain
+        """
+        previous = self.edits.get(key)
+        self._set_edit(key, value)
+        try:
+            self._refresh_edit(key)
+        except ValueError:
+            self._set_edit(key, previous)
+            self._refresh_edit(key)
+            raise
+
+    def _set_edit(self, key, value):
+        self._edit_version += 1
+        if value is None:
+            self.edits.pop(key, None)
+        else:
+            self.edits[key] = value
+
+    def _refresh_edit(self, key):
+        kind = key[0]
+        if kind == "volume":
+            self._refresh_volume_domain(*key[1:])
+        elif kind == "trust":
+            for year in range(self.n_years):
+                self._refresh_volume_domain(key[1], key[2], year)
+        else:
+            self._refresh_capacity(*key[1:])
+
+    def _refresh_volume_domain(self, supplier, part, year):
+        """
+        Set the domain of a volume variable to its built domain restricted
+        by the pin and trust edits of its cell and by override_volume_domain
+        """
+        cell = self._cell(supplier, part)
+        if cell is None:
+            index, domain = None, cp_model.Domain(0, 0)
+        else:
+            index = int(self.volume_index[cell, year])
+            upper_bound, minimum = self._built_volume_bounds()
+            upper_bound = int(upper_bound[cell, year])
+            minimum = int(minimum[cell, year])
+            if minimum <= 1:
+                domain = cp_model.Domain(0, upper_bound)
+            elif minimum > upper_bound:
+                domain = cp_model.Domain(0, 0)
+            else:
+                domain = cp_model.Domain.FromFlatIntervals([0, 0, minimum, upper_bound])
+        if not self._trusted(supplier, part):
+            domain = domain.intersection_with(cp_model.Domain(0, 0))
+        for lower_bound, upper_bound in self._domain_overrides.get(
+            (supplier, part, year), ()
+        ):
+            domain = domain.intersection_with(cp_model.Domain(lower_bound, upper_bound))
+        pin = self.edits.get(("volume", supplier, part, year))
+        if pin is not None:
+            domain = domain.intersection_with(cp_model.Domain(pin, pin))
+        if domain.is_empty():
+            raise ValueError(
+                "volume {} is outside the domain of supplier {}, part {}, "
+                "year {}".format(pin, supplier, part, year)
+            )
+        if index is not None:
+            variable = self.model.Proto().variables[index]
+            variable.domain.clear()
+            variable.domain.extend(domain.flattened_intervals())
+
+    def _built_volume_bounds(self):
+        """
+        Upper bound and minimum units of every volume variable, shape
+        (n_cells, n_years), from which its domain was built, see
+        _create_volume_matrix. The domains are derived from the data rather
+        than read back from the proto, which is slow for many pins
+        """
+        if self._volume_bounds is None:
+            upper_bound = self._volume_upper_bound()
+            minimum = np.zeros_like(upper_bound)
+            if self.minimum_units is not None:
+                minimum[:] = self.minimum_units[self.cell_supplier, self.cell_part]
+            self._volume_bounds = (upper_bound, minimum)
+        return self._volume_bounds
+
+    def _edited_volume_bounds(self, pins=True):
+        """
+        Lower bound, minimum units and upper bound of every volume variable,
+        shape (n_cells, n_years), with the trust edits, the domain
+        overrides and set_volume_constraint applied, and the volume pins
+        unless pins=False. The
+        domain of a volume is 0 if its lower bound is 0, and
+        [max(lower bound, minimum units, 1), upper bound]
+        """
+        built_upper_bound, built_minimum = self._built_volume_bounds()
+        lower_bound = np.zeros_like(built_upper_bound)
+        minimum = built_minimum.copy()
+        upper_bound = built_upper_bound.copy()
+        trusted = self.eligible[self.cell_supplier, self.cell_part]
+        for key, value in self.edits.items():
+            if key[0] == "trust" and self.cell_index[key[1:]] >= 0:
+                trusted[self.cell_index[key[1:]]] = value
+        upper_bound[~trusted] = 0
+        for (supplier, part, year), overrides in self._domain_overrides.items():
+            cell = self.cell_index[supplier, part]
+            for override_lower, override_upper in overrides:
+                lower_bound[cell, year] = max(lower_bound[cell, year], override_lower)
+                upper_bound[cell, year] = min(upper_bound[cell, year], override_upper)
+        for (supplier, part, year), value in self._volume_constraints.items():
+            cell = self.cell_index[supplier, part]
+            lower_bound[cell, year] = max(lower_bound[cell, year], value)
+            upper_bound[cell, year] = min(upper_bound[cell, year], value)
+        if pins:
+            for key, value in self.edits.items():
+                if key[0] == "volume" and self.cell_index[key[1:3]] >= 0:
+                    cell = self.cell_index[key[1:3]]
+                    lower_bound[cell, key[3]] = upper_bound[cell, key[3]] = value
+        return lower_bound, minimum, upper_bound
+
+    def _edited_capacity(self):
+        """
+        Capacity of every supplier and year, shape (n_suppliers, n_years),
+        with the capacity overrides applied. None if the model has no
+        capacity constraints
+        """
+        capacity = None
+        if self.capacity is not None:
+            capacity = self.capacity.astype(np.int64)
+        for key, value in self.edits.items():
+            if key[0] == "capacity":
+                if capacity is None:
+                    capacity = np.full(
+                        (self.n_suppliers, self.n_years),
+                        cp_model.INT_MAX,
+                        dtype=np.int64,
+                    )
+                capacity[key[1:]] = value
+        return capacity
+
+    def _refresh_capacity(self, supplier, year):
+        """
+        Set the domain of a capacity constraint to [0, overridden capacity],
+        or back to the capacity it was built with
         """
-        self.model.Add(self.volume[supplier][part][year] == vol)
+        capacity = self.edits.get(("capacity", supplier, year))
+        if self.capacity_constraints is None:
+            self.capacity_constraints = np.full(
+                (self.n_suppliers, self.n_years), -1, dtype=np.int64
+            )
+        index = int(self.capacity_constraints[supplier, year])
+        if index < 0:
+            if capacity is None:
+                return
+            constraint = self.model.AddLinearConstraint(
+                cp_model.LinearExpr.Sum(
+                    list(self.assigned[self._supplier_cells[supplier], year])
+                ),
+                0,
+                cp_model.INT_MAX,
+            )
+            index = constraint.Index()
+            self.capacity_constraints[supplier, year] = index
+        if capacity is None:
+            capacity = (
+                int(self.capacity[supplier, year])
+                if self.capacity is not None
+                else cp_model.INT_MAX
+            )
+        domain = self.model.Proto().constraints[index].linear.domain
+        domain.clear()
+        domain.extend([0, int(capacity)])
+
+    def model_size(self):
+        """
+        Returns the number of variables and constraints in the model and the
+        number of duplicate linear constraints that were dropped
+        """
+        proto = self.model.Proto()
+        return {
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+            "duplicate_constraints_dropped": self.linear.n_duplicates,
+        }
+
+    def family_breakdown(self):
+        """
+        Returns the variables, constraints and enforcement literals added by
+        every _create_*, _link_* and _add_constraint_* method, and the time
+        it took, in build order
+        """
+        proto = self.model.Proto()
+        seconds = self.metrics.totals()
+        breakdown = []
+        for name, (var_start, var_end), (con_start, con_end) in self.families:
+            enforcement_literals = 0
+            for i in range(con_start, con_end):
+                enforcement_literals += len(proto.constraints[i].enforcement_literal)
+            breakdown.append(
+                {
+                    "family": name,
+                    "variables": var_end - var_start,
+                    "constraints": con_end - con_start,
+                    "enforcement_literals": enforcement_literals,
+                    "seconds": seconds.get(name, 0.0),
+                }
+            )
+        return breakdown
+
+    def print_family_breakdown(self):
+        print(
+            "\n{:<40} {:>10} {:>12} {:>12} {:>10}".format(
+                "Family", "Variables", "Constraints", "Enforcement", "Time"
+            )
+        )
+        print("-" * 88)
+        for row in self.family_breakdown():
+            print(
+                "{:<40} {:>10} {:>12} {:>12} {:>9.3f}s".format(
+                    row["family"],
+                    row["variables"],
+                    row["constraints"],
+                    row["enforcement_literals"],
+                    row["seconds"],
+                )
+            )
 
     def return_volume(self, supplier, part, year):
-        return self.solver.Value(self.volume[supplier][part][year])
+        return int(self._get_solution()["volume"][supplier, part, year])
+
+    def return_volume_array(self):
+        """
+        Returns the solved volume as an array of shape
+        (n_suppliers, n_parts, n_years)
+        """
+        return self._get_solution()["volume"]
 
     def _value_to_ndarray(self):
         """
-        Convert a list of values to a numpy array
+        Value of work won by every supplier for every part, summed over years
         """
-        value = np.zeros([self.n_suppliers, self.n_parts])
-        for supplier in range(self.n_suppliers):
-            for part in range(self.n_parts):
-                for year in range(self.n_years):
-                    value[supplier][part] += self.price[supplier][part][
-                        year
-                    ] * self.solver.Value(self.volume[supplier][part][year])
-        return value
+        return (self.price * self._get_solution()["volume"]).sum(axis=2)
 
     def _heatmap(
         self,
@@ -773,15 +2310,4 @@ class SupplierSelectionModel:
         """
         Returns the solution
         """
-        s = []
-        for supplier in range(self.n_suppliers):
-            p = []
-            for part in range(self.n_parts):
-                y = []
-                for year in range(self.n_years):
-                    y.append(
-                        self.return_volume(supplier=supplier, part=part, year=year)
-                    )
-                p.append(y)
-            s.append(p)
-        return s
+        return self.return_volume_array().tolist()
@@ -0,0 +1,270 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from utils import split_cores
+
+solve_statuses = (
+    cp_model.MODEL_INVALID,
+    cp_model.INFEASIBLE,
+    cp_model.UNKNOWN,
+    cp_model.FEASIBLE,
+    cp_model.OPTIMAL,
+)
+
+
+def _literal_variable(literal):
+    return literal if literal >= 0 else -literal - 1
+
+
+def _constraint_variables(constraint):
+    """
+    Proto indices of the variables of a constraint, or None for constraint
+    types this module does not split
+    """
+    variables = [_literal_variable(ref) for ref in constraint.enforcement_literal]
+    if constraint.has_linear():
+        variables.extend(constraint.linear.vars)
+    elif constraint.has_int_div():
+        variables.extend(constraint.int_div.target.vars)
+        for expr in constraint.int_div.exprs:
+            variables.extend(expr.vars)
+    elif constraint.has_bool_or():
+        variables.extend(_literal_variable(ref) for ref in constraint.bool_or.literals)
+    elif constraint.has_bool_and():
+        variables.extend(_literal_variable(ref) for ref in constraint.bool_and.literals)
+    else:
+        return None
+    return variables
+
+
+def _first_variable(constraint):
+    """
+    Proto index of one variable of a supported constraint
+    """
+    if len(constraint.enforcement_literal):
+        return _literal_variable(constraint.enforcement_literal[0])
+    return _constraint_variables(constraint)[0]
+
+
+def _remap_constraint(constraint, remap):
+    """
+    Rewrite the variable indices of a constraint in place
+    """
+
+    def remap_literals(literals):
+        for i, ref in enumerate(literals):
+            literals[i] = remap[ref] if ref >= 0 else -remap[-ref - 1] - 1
+
+    def remap_variables(variables):
+        for i, ref in enumerate(variables):
+            variables[i] = remap[ref]
+
+    remap_literals(constraint.enforcement_literal)
+    if constraint.has_linear():
+        remap_variables(constraint.linear.vars)
+    elif constraint.has_int_div():
+        remap_variables(constraint.int_div.target.vars)
+        for expr in constraint.int_div.exprs:
+            remap_variables(expr.vars)
+    elif constraint.has_bool_or():
+        remap_literals(constraint.bool_or.literals)
+    elif constraint.has_bool_and():
+        remap_literals(constraint.bool_and.literals)
+
+
+def find_components(proto):
+    """
+    Connected components of the constraint graph of a model
+
+    Two variables are connected when they appear in the same constraint,
+    including as an enforcement literal
+
+    Parameters
+    ----------
+    proto : CpModelProto
+
+    Returns
+    -------
+    labels : ndarray
+        Component label of every variable, the smallest proto index in its
+        component. None if the model holds a constraint that cannot be
+        assigned to a component (an unsupported type or no variables)
+    """
+    n_variables = len(proto.variables)
+    first, other = [], []
+    for constraint in proto.constraints:
+        variables = _constraint_variables(constraint)
+        if not variables:
+            return None
+        first.extend([variables[0]] * (len(variables) - 1))
+        other.extend(variables[1:])
+    first = np.asarray(first, dtype=np.int64)
+    other = np.asarray(other, dtype=np.int64)
+
+    # propagate the smallest label along every edge until nothing changes
+    labels = np.arange(n_variables)
+    while True:
+        smallest = np.minimum(labels[first], labels[other])
+        updated = labels.copy()
+        np.minimum.at(updated, first, smallest)
+        np.minimum.at(updated, other, smallest)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def split_model(proto, labels, min_batch_variables=1):
+    """
+    Split a model into independent sub-models along its components
+
+    Components are packed in order into batches of at least
+    `min_batch_variables` variables, so that very small components share a
+    solve. Variable domains, constraints, objective terms and solution
+    hints are copied to the batch that holds their variables.
+
+    Returns
+    -------
+    batches : list
+        (proto indices of the batch variables, sub-model in text format)
+        for every batch
+    """
+    components, component_of = np.unique(labels, return_inverse=True)
+    sizes = np.bincount(component_of)
+    batch_of_component = np.zeros(len(components), dtype=np.int64)
+    batch, filled = 0, 0
+    for component, size in enumerate(sizes.tolist()):
+        if filled >= min_batch_variables:
+            batch, filled = batch + 1, 0
+        batch_of_component[component] = batch
+        filled += size
+    n_batches = batch + 1
+    batch_of_variable = batch_of_component[component_of]
+
+    order = np.argsort(batch_of_variable, kind="stable")
+    bounds = np.searchsorted(batch_of_variable[order], np.arange(n_batches + 1))
+    batch_variables = [order[bounds[b] : bounds[b + 1]] for b in range(n_batches)]
+    remap = np.zeros(len(labels), dtype=np.int64)
+    for variables in batch_variables:
+        remap[variables] = np.arange(len(variables))
+    remap = remap.tolist()
+    batch_of_variable = batch_of_variable.tolist()
+
+    models = [cp_model.CpModel() for _ in range(n_batches)]
+    sub_protos = [model.Proto() for model in models]
+    for variables, sub_proto in zip(batch_variables, sub_protos):
+        for variable in variables.tolist():
+            sub_proto.variables.add().copy_from(proto.variables[variable])
+    for constraint in proto.constraints:
+        variable = _first_variable(constraint)
+        sub_constraint = sub_protos[batch_of_variable[variable]].constraints.add()
+        sub_constraint.copy_from(constraint)
+        _remap_constraint(sub_constraint, remap)
+
+    if proto.has_objective():
+        objective = proto.objective
+        for b, sub_proto in enumerate(sub_protos):
+            sub_objective = sub_proto.objective
+            sub_objective.copy_from(objective)
+            sub_objective.vars.clear()
+            sub_objective.coeffs.clear()
+            if b > 0:
+                sub_objective.offset = 0
+        for variable, coefficient in zip(objective.vars, objective.coeffs):
+            sub_objective = sub_protos[batch_of_variable[variable]].objective
+            sub_objective.vars.append(remap[variable])
+            sub_objective.coeffs.append(coefficient)
+
+    hint = proto.solution_hint
+    for variable, value in zip(hint.vars, hint.values):
+        sub_hint = sub_protos[batch_of_variable[variable]].solution_hint
+        sub_hint.vars.append(remap[variable])
+        sub_hint.values.append(value)
+
+    return [
+        (variables, str(sub_proto))
+        for variables, sub_proto in zip(batch_variables, sub_protos)
+    ]
+
+
+def _solve_batches(texts, n_threads):
+    """
+    Solve sub-models given in text format, one after the other
+
+    Returns (status, objective, best bound, values) for every sub-model
+    """
+    results = []
+    for text in texts:
+        model = cp_model.CpModel()
+        model.Proto().parse_text_format(text)
+        solver = cp_model.CpSolver()
+        solver.parameters.num_search_workers = n_threads
+        status = solver.Solve(model)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            solution = solver.ResponseProto().solution
+            values = np.fromiter(solution, dtype=np.int64, count=len(solution))
+            results.append(
+                (status, solver.ObjectiveValue(), solver.BestObjectiveBound(), values)
+            )
+        else:
+            results.append((status, None, None, None))
+    return results
+
+
+def solve_components(
+    proto, labels, total_cores=None, max_workers=None, min_batch_variables=1
+):
+    """
+    Solve the components of a model separately and stitch the solutions
+
+    Batches of components are solved in a process pool sharing the core
+    budget, see utils.split_cores, or in this process when only one worker
+    is available
+
+    Returns
+    -------
+    status : int
+        The worst status over every batch, OPTIMAL only if every batch was
+        solved to optimality
+
+    objective : float
+        Sum of the batch objectives, None without a solution
+
+    best_bound : float
+        Sum of the batch best objective bounds, None without a solution
+
+    values : ndarray
+        Value of every variable of the model, None without a solution
+
+    n_batches : int
+    """
+    batches = split_model(proto, labels, min_batch_variables)
+    n_processes, n_threads = split_cores(len(batches), total_cores, max_workers)
+    texts = [text for _, text in batches]
+    if n_processes == 1:
+        results = _solve_batches(texts, n_threads)
+    else:
+        chunks = [texts[i::n_processes] for i in range(n_processes)]
+        with ProcessPoolExecutor(max_workers=n_processes) as executor:
+            chunk_results = list(
+                executor.map(_solve_batches, chunks, [n_threads] * n_processes)
+            )
+        results = [None] * len(texts)
+        for i, chunk in enumerate(chunk_results):
+            results[i::n_processes] = chunk
+
+    status = min((result[0] for result in results), key=solve_statuses.index)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return status, None, None, None, len(batches)
+    values = np.zeros(len(labels), dtype=np.int64)
+    objective = 0.0
+    best_bound = 0.0
+    for (variables, _), (_, batch_objective, batch_bound, batch_values) in zip(
+        batches, results
+    ):
+        values[variables] = batch_values
+        objective += batch_objective
+        best_bound += batch_bound
+    return status, objective, best_bound, values, len(batches)
@@ -0,0 +1,325 @@
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel, model_family
+from utils import timeit
+from validation import check_feasibility
+
+
+def check_inputs(price, demand, **kwargs):
+    """
+    Cheap necessary conditions for a feasible SupplierSelectionModel
+
+    The checks of validation.check_feasibility, computed on the input
+    arrays without building or solving a model. Transfer limits are only
+    diagnosed by the solve, see diagnose_infeasibility
+
+    Parameters
+    ----------
+    price, demand, **kwargs
+        See SupplierSelectionModel
+
+    Returns
+    -------
+    findings : list
+        One dict per failed check, see validation.InputError. Empty if
+        every check passed, which does not make the model feasible
+    """
+    kwargs.pop("validate", None)
+    scenario = SupplierSelectionModel.__new__(SupplierSelectionModel)
+    scenario._set_inputs(price, demand, **kwargs)
+    return check_feasibility(scenario)
+
+
+class DiagnosisModel(SupplierSelectionModel):
+    """
+    SupplierSelectionModel whose restricting constraints are guarded by
+    assumption literals
+
+    Capacity, share, minimum units and the transfer limits only hold when
+    the assumption literal of their group is true. Share and minimum units
+    become guarded constraints instead of volume domains. The demand, the
+    eligible cells and the links between volume, assigned and transferred
+    always hold.
+
+    Parameters
+    ----------
+    price, demand, **kwargs
+        See SupplierSelectionModel
+
+    detailed : bool
+        False (default) for one assumption per family, True for one per
+        group: ("capacity", supplier, year), ("share", supplier, part),
+        ("minimum_units", supplier, part),
+        ("supplier_transfer_limit", supplier, year) and
+        ("global_transfer_limit", year)
+
+    Attributes
+    ----------
+    assumptions : dict
+        Assumption literal of every group, keyed by (family,) or the
+        detailed key
+    """
+
+    def __init__(self, price, demand, detailed=False, **kwargs):
+        self.detailed = detailed
+        self.assumptions = {}
+        kwargs["validate"] = False
+        super().__init__(price, demand, **kwargs)
+        if self.minimum_units is not None:
+            self._add_constraint_minimum_units()
+
+    def _assumption(self, *key):
+        if not self.detailed:
+            key = key[:1]
+        if key not in self.assumptions:
+            self.assumptions[key] = self.model.NewBoolVar(str(key))
+        return self.assumptions[key]
+
+    def _volume_upper_bound(self):
+        """
+        The demand of the part, share and minimum units are guarded
+        constraints
+        """
+        return np.maximum(self.demand[self.cell_part].astype(np.int64), 0)
+
+    @timeit
+    @model_family
+    def _create_volume_matrix(self):
+        """
+        Volume S{supplier}P{part}Y{year} of every eligible cell, with domain
+        [0, demand]
+        """
+        return self._new_int_var_array(self._volume_upper_bound())
+
+    @timeit
+    @model_family
+    def _add_constraint_manufacturing_capacity(self):
+        for supplier, year in np.ndindex(self.n_suppliers, self.n_years):
+            cells = self._supplier_cells[supplier]
+            self.linear.add(
+                self.assigned[cells, year],
+                [1] * len(cells),
+                0,
+                int(self.capacity[supplier, year]),
+                enforce=[self._assumption("capacity", supplier, year)],
+            )
+
+    @timeit
+    @model_family
+    def _add_constraint_part_share(self):
+        """
+        volume <= the share bound of the selected share formulation, see
+        SupplierSelectionModel._volume_upper_bound
+        """
+        share_bound = SupplierSelectionModel._volume_upper_bound(self)
+        for supplier, part, volumes, bounds in zip(
+            self.cell_supplier.tolist(),
+            self.cell_part.tolist(),
+            self.volume,
+            share_bound.tolist(),
+        ):
+            assumption = self._assumption("share", supplier, part)
+            for volume, bound in zip(volumes, bounds):
+                self.model.Add(volume <= bound).OnlyEnforceIf(assumption)
+
+    @timeit
+    @model_family
+    def _add_constraint_minimum_units(self):
+        """
+        volume >= minimum units if assigned
+        """
+        minimum = self.minimum_units[self.cell_supplier, self.cell_part]
+        for supplier, part, volumes, assigned, minimums in zip(
+            self.cell_supplier.tolist(),
+            self.cell_part.tolist(),
+            self.volume,
+            self.assigned,
+            minimum.tolist(),
+        ):
+            assumption = self._assumption("minimum_units", supplier, part)
+            for volume, is_assigned, units in zip(volumes, assigned, minimums):
+                if units > 1:
+                    self.model.Add(volume >= units).OnlyEnforceIf(
+                        [is_assigned, assumption]
+                    )
+
+    @timeit
+    @model_family
+    def _add_constraint_supplier_transfer_limit(self):
+        n_years = self.n_years - self.first_transfer_year
+        for supplier, year in np.ndindex(self.n_suppliers, n_years):
+            cells = self._supplier_cells[supplier]
+            assumption = self._assumption(
+                "supplier_transfer_limit", supplier, year + self.first_transfer_year
+            )
+            self.linear.add(
+                self.transferred[cells, year],
+                [1] * len(cells),
+                0,
+                int(self.supplier_transfer_limit[supplier]),
+                enforce=[assumption],
+            )
+
+    @timeit
+    @model_family
+    def _add_constraint_global_transfer_limit(self):
+        for year in range(self.n_years - self.first_transfer_year):
+            assumption = self._assumption(
+                "global_transfer_limit", year + self.first_transfer_year
+            )
+            self.linear.add(
+                self.transferred[:, year],
+                [1] * self.n_cells,
+                0,
+                int(self.global_transfer_limit),
+                enforce=[assumption],
+            )
+
+    def solve_assuming(self, keys, max_time_in_seconds=None):
+        """
+        Solve for feasibility with the groups in `keys` enforced and every
+        other group relaxed
+
+        Returns
+        -------
+        status : int
+
+        core : list
+            If infeasible, a subset of `keys` that is already infeasible,
+            not necessarily minimal. Else empty
+        """
+        self.model.ClearAssumptions()
+        self.model.AddAssumptions([self.assumptions[key] for key in keys])
+        try:
+            status = self._solve_within(max_time_in_seconds)
+        finally:
+            self.model.ClearAssumptions()
+        if status != cp_model.INFEASIBLE:
+            return status, []
+        key_of = {self.assumptions[key].Index(): key for key in keys}
+        core = set(
+            key_of[index]
+            for index in self.solver.SufficientAssumptionsForInfeasibility()
+            if index in key_of
+        )
+        if not core:
+            # no core reported, every enforced group is a sufficient one
+            return status, list(keys)
+        return status, [key for key in keys if key in core]
+
+    def solve_enforcing(self, keys, max_time_in_seconds=None):
+        """
+        Solve for feasibility with the groups in `keys` enforced and every
+        other group removed
+
+        The assumption literals are fixed rather than assumed, so presolve
+        removes them and the guarded constraints keep their full strength
+        in the LP relaxation, which is much faster than solve_assuming on
+        feasible subsets. No core is returned
+
+        Returns
+        -------
+        status : int
+        """
+        self.model.ClearAssumptions()
+        keys = set(keys)
+        proto_variables = self.model.Proto().variables
+        for key, literal in self.assumptions.items():
+            domain = proto_variables[literal.Index()].domain
+            domain.clear()
+            domain.extend([1, 1] if key in keys else [0, 0])
+        try:
+            return self._solve_within(max_time_in_seconds)
+        finally:
+            for literal in self.assumptions.values():
+                domain = proto_variables[literal.Index()].domain
+                domain.clear()
+                domain.extend([0, 1])
+
+    def _solve_within(self, max_time_in_seconds):
+        """
+        Solve with a time limit for this solve only, as minimise_cost does
+        """
+        parameters = self.solver.parameters
+        previous = parameters.max_time_in_seconds
+        if max_time_in_seconds is not None:
+            parameters.max_time_in_seconds = max_time_in_seconds
+        try:
+            return self.solver.Solve(self.model)
+        finally:
+            parameters.max_time_in_seconds = previous
+
+
+def diagnose_infeasibility(
+    price, demand, detailed=False, max_time_in_seconds=None, **kwargs
+):
+    """
+    Find the inputs that make a SupplierSelectionModel infeasible
+
+    The cheap pre-checks of check_inputs run first, and the diagnosis
+    stops at the ones that fail. Otherwise a DiagnosisModel is solved with
+    every group assumed. If it is infeasible, the groups of the core
+    returned by CP-SAT are removed one at a time and kept only if the
+    model becomes feasible without them (deletion filter,
+    see DiagnosisModel.solve_enforcing), which leaves a minimal infeasible
+    subset: every group in it is needed for the infeasibility
+
+    Parameters
+    ----------
+    price, demand, **kwargs
+        See SupplierSelectionModel
+
+    detailed : bool
+        Group the constraints per family (False, default) or per supplier,
+        part or year, see DiagnosisModel
+
+    max_time_in_seconds : float
+        Time limit of every solve. Optional. A group whose removal cannot be
+        decided within the limit is kept, and minimal is set to False
+
+    Returns
+    -------
+    result : dict
+        checks (see check_inputs), status (StatusName of the solve with
+        every group enforced, None if a check failed), core (the minimal
+        infeasible subset, a list of DiagnosisModel.assumptions keys, empty
+        if the model is feasible, None if a check failed), unguarded,
+        minimal, n_solves and wall_time. unguarded is True when the model
+        is infeasible with every group removed: the demand, the eligible
+        cells and the links between the variables alone cannot be met, so
+        the core is empty although the status is INFEASIBLE
+    """
+    start = time.perf_counter()
+    result = {
+        "checks": check_inputs(price, demand, **kwargs),
+        "status": None,
+        "core": None,
+        "unguarded": False,
+        "minimal": True,
+        "n_solves": 0,
+        "wall_time": None,
+    }
+    if result["checks"]:
+        result["wall_time"] = time.perf_counter() - start
+        return result
+
+    scenario = DiagnosisModel(price, demand, detailed=detailed, **kwargs)
+    keys = list(scenario.assumptions)
+    status, core = scenario.solve_assuming(keys, max_time_in_seconds)
+    result["status"] = scenario.solver.StatusName(status)
+    result["n_solves"] = 1
+    for key in list(core):
+        candidate = [other for other in core if other != key]
+        status = scenario.solve_enforcing(candidate, max_time_in_seconds)
+        result["n_solves"] += 1
+        if status == cp_model.INFEASIBLE:
+            core = candidate
+        elif status == cp_model.UNKNOWN:
+            result["minimal"] = False
+    result["core"] = core
+    result["unguarded"] = result["status"] == "INFEASIBLE" and not core
+    result["wall_time"] = time.perf_counter() - start
+    return result
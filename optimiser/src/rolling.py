@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel
+
+# SupplierSelectionModel arguments with a year axis, always the last one
+yearly_inputs = ("capacity", "minimum_units")
+
+
+def _window_inputs(price, demand, kwargs, years):
+    window_kwargs = dict(kwargs)
+    for name in yearly_inputs:
+        if window_kwargs.get(name) is not None:
+            window_kwargs[name] = np.asarray(window_kwargs[name])[..., years]
+    return price[:, :, years], demand[:, years], window_kwargs
+
+
+def solve_rolling_horizon(price, demand, window, **kwargs):
+    """
+    Solve a long horizon as a sequence of short windows
+
+    A model of `window` years is solved, the decisions of its first year
+    are fixed and the window slides forward by a year. The assignment of
+    the last fixed year is passed to the next window as previous_assigned,
+    so transfers into the window count towards the transfer limits. The
+    last window fixes every remaining year.
+
+    Parameters
+    ----------
+    price, demand : list or ndarray
+        See SupplierSelectionModel
+
+    window : int
+        Number of years in every solve
+
+    **kwargs
+        Other SupplierSelectionModel arguments. capacity and minimum_units
+        are sliced to the window years
+
+    Returns
+    -------
+    result : dict
+        status (StatusName, OPTIMAL if every window was solved to
+        optimality, which does not make the whole horizon optimal),
+        objective (total cost of the fixed volumes, None if a window has no
+        solution), volume (n_suppliers, n_parts, n_years), wall_time and
+        window_times
+    """
+    price = np.asarray(price)
+    demand = np.asarray(demand)
+    n_suppliers, n_parts, n_years = price.shape
+    window = max(1, min(window, n_years))
+    volume = np.zeros((n_suppliers, n_parts, n_years), dtype=np.int64)
+    previous_assigned = kwargs.pop("previous_assigned", None)
+    window_times = []
+
+    start_time = time.perf_counter()
+    status = cp_model.OPTIMAL
+    for start in range(n_years - window + 1):
+        years = np.arange(start, start + window)
+        window_price, window_demand, window_kwargs = _window_inputs(
+            price, demand, kwargs, years
+        )
+        window_start = time.perf_counter()
+        scenario = SupplierSelectionModel(
+            window_price,
+            window_demand,
+            previous_assigned=previous_assigned,
+            **window_kwargs
+        )
+        window_status = scenario.minimise_cost()
+        window_times.append(time.perf_counter() - window_start)
+        if window_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            status = window_status
+            break
+        if window_status == cp_model.FEASIBLE:
+            status = cp_model.FEASIBLE
+
+        solved = scenario.return_volume_array()
+        if start + window == n_years:
+            volume[:, :, start:] = solved
+        else:
+            volume[:, :, start] = solved[:, :, 0]
+            previous_assigned = solved[:, :, 0] > 0
+
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "status": scenario.solver.StatusName(status),
+        "objective": int((price * volume).sum()) if found else None,
+        "volume": volume if found else None,
+        "wall_time": time.perf_counter() - start_time,
+        "window_times": window_times,
+    }
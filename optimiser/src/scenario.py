@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel
+
+
+class ScenarioEngine:
+    """
+    Solve many what-if scenarios on a single built SupplierSelectionModel
+
+    The variables and constraints are built once. A scenario only changes
+    the objective coefficients (prices) and temporarily pins volumes by
+    restricting variable domains, then re-solves. Every scenario starts
+    from the base prices and domains.
+
+    Attributes
+    ----------
+    scenario : SupplierSelectionModel
+        The model shared by every scenario
+
+    base_price : ndarray
+
+    build_time : float
+        Time taken to build the model (seconds)
+
+    results : list
+        One dict per scenario run, see run()
+
+    Examples
+    --------
+    engine = ScenarioEngine(price, demand, capacity=capacity)
+    engine.run(name="base")
+    engine.run(price=compute_reduced_price(price, 0, 0.05), name="S1 -5%")
+    engine.run(volume_pins={(1, 3, 2): 70}, name="contract")
+    engine.print_summary()
+    """
+
+    def __init__(self, price, demand, **kwargs):
+        start = time.perf_counter()
+        self.scenario = SupplierSelectionModel(price, demand, **kwargs)
+        self.build_time = time.perf_counter() - start
+        self.base_price = self.scenario.price
+        self.results = []
+
+    def run(self, price=None, volume_pins=None, name=None):
+        """
+        Solve one scenario
+
+        Parameters
+        ----------
+        price : list or ndarray
+            Prices for this scenario, same shape as the base prices.
+            Optional, defaults to the base prices
+
+        volume_pins : dict
+            {(supplier, part, year): volume} pins applied for this
+            scenario only. Optional
+
+        name : str
+            Optional
+
+        Returns
+        -------
+        result : dict
+            name, status, objective, volume, setup_time, solve_time and
+            time_saved, the build time avoided by not rebuilding the model
+            (build_time - setup_time)
+        """
+        if name is None:
+            name = "scenario {}".format(len(self.results) + 1)
+        volume_pins = {} if volume_pins is None else volume_pins
+
+        start = time.perf_counter()
+        if price is None:
+            self.scenario.price = self.base_price
+        else:
+            price = np.asarray(price)
+            if price.shape != self.base_price.shape:
+                raise ValueError(
+                    "price has shape {}, expected {}".format(
+                        price.shape, self.base_price.shape
+                    )
+                )
+            self.scenario.price = price
+        previous = {}
+        try:
+            for (supplier, part, year), vol in volume_pins.items():
+                previous[supplier, part, year] = self.scenario.override_volume_domain(
+                    supplier, part, year, vol, vol
+                )
+            setup_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.scenario.minimise_cost()
+            solve_time = time.perf_counter() - start
+        finally:
+            for (supplier, part, year), domain in previous.items():
+                self.scenario.restore_volume_domain(supplier, part, year, domain)
+            self.scenario.price = self.base_price
+
+        status = self.scenario.status
+        found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        result = {
+            "name": name,
+            "status": self.scenario.solver.StatusName(status),
+            "objective": self.scenario.solver.ObjectiveValue() if found else None,
+            "volume": self.scenario.return_volume_array().copy() if found else None,
+            "setup_time": setup_time,
+            "solve_time": solve_time,
+            "time_saved": self.build_time - setup_time,
+        }
+        self.results.append(result)
+        return result
+
+    def print_summary(self):
+        print(
+            "\n{:<20} {:>10} {:>16} {:>10} {:>10} {:>10}".format(
+                "Scenario", "Status", "Cost", "Setup", "Solve", "Saved"
+            )
+        )
+        print("-" * 81)
+        for result in self.results:
+            cost = (
+                "£{:,.2f}".format(result["objective"])
+                if result["objective"] is not None
+                else "-"
+            )
+            print(
+                "{:<20} {:>10} {:>16} {:>9.3f}s {:>9.3f}s {:>9.3f}s".format(
+                    result["name"],
+                    result["status"],
+                    cost,
+                    result["setup_time"],
+                    result["solve_time"],
+                    result["time_saved"],
+                )
+            )
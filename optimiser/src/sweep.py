@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from decision_engine import SupplierSelectionModel
+from utils import split_cores
+from validation import InputError
+
+
+def _solve_variant(kwargs, n_threads):
+    kwargs = dict(kwargs)
+    name = kwargs.pop("name")
+    volume_pins = kwargs.pop("volume_pins", {})
+
+    start = time.perf_counter()
+    try:
+        scenario = SupplierSelectionModel(n_threads=n_threads, **kwargs)
+    except InputError as e:
+        # a variant failing the feasibility pre-checks is reported, not raised
+        if any(error["check"] in ("shape", "range") for error in e.errors):
+            raise
+        return {
+            "name": name,
+            "status": "INFEASIBLE",
+            "objective": None,
+            "wall_time": time.perf_counter() - start,
+            "volume": None,
+        }
+    for (supplier, part, year), vol in volume_pins.items():
+        scenario.override_volume_domain(supplier, part, year, vol, vol)
+    scenario.minimise_cost()
+    wall_time = time.perf_counter() - start
+
+    found = scenario.status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "name": name,
+        "status": scenario.solver.StatusName(scenario.status),
+        "objective": scenario.solver.ObjectiveValue() if found else None,
+        "wall_time": wall_time,
+        "volume": scenario.return_volume_array() if found else None,
+    }
+
+
+def run_sweep(base, variants, total_cores=None, max_workers=None):
+    """
+    Solve scenario variants concurrently in a process pool
+
+    Parameters
+    ----------
+    base : dict
+        SupplierSelectionModel arguments shared by every scenario,
+        e.g. {"price": price, "demand": demand, "capacity": capacity}
+
+    variants : list
+        One dict per scenario, overriding entries of `base`. A variant may
+        also hold a "name" and "volume_pins", {(supplier, part, year): volume}
+
+    total_cores : int
+        Core budget for the sweep, split between concurrent solves and
+        CP-SAT's num_search_workers. Optional, defaults to every core
+        available to the process
+
+    max_workers : int
+        Upper limit on concurrent solves. Optional
+
+    Returns
+    -------
+    results : list
+        One dict per variant, in the order given, with name, status,
+        objective, wall_time and volume (n_suppliers, n_parts, n_years).
+        Variants rejected by the feasibility pre-checks of the
+        SupplierSelectionModel constructor are INFEASIBLE without a solve
+    """
+    jobs = []
+    for i, variant in enumerate(variants):
+        kwargs = dict(base)
+        kwargs.update(variant)
+        kwargs.setdefault("name", "scenario {}".format(i + 1))
+        jobs.append(kwargs)
+
+    n_processes, n_threads = split_cores(len(jobs), total_cores, max_workers)
+    with ProcessPoolExecutor(max_workers=n_processes) as executor:
+        futures = [executor.submit(_solve_variant, job, n_threads) for job in jobs]
+        return [future.result() for future in futures]
+
+
+def print_sweep_results(results):
+    print("\n{:<20} {:>10} {:>18} {:>10}".format("Scenario", "Status", "Cost", "Time"))
+    print("-" * 61)
+    for result in results:
+        cost = (
+            "£{:,.2f}".format(result["objective"])
+            if result["objective"] is not None
+            else "-"
+        )
+        print(
+            "{:<20} {:>10} {:>18} {:>9.3f}s".format(
+                result["name"], result["status"], cost, result["wall_time"]
+            )
+        )
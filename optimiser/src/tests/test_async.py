@@ -0,0 +1,148 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decision_engine import MinimalSupplierSelectionModel, SupplierSelectionModel
+
+
+def generate(n_suppliers, n_parts, n_years, seed=1):
+    rng = np.random.default_rng(seed)
+    price = rng.integers(1_000, 100_000, (n_suppliers, n_parts, n_years))
+    demand = rng.integers(50, 300, (n_parts, n_years))
+    capacity = rng.integers(n_parts // 2, n_parts, (n_suppliers, n_years))
+    share = rng.choice([30, 60, 100], (n_suppliers, n_parts))
+    return price, demand, capacity, share
+
+
+class FirstSolution:
+    """
+    Progress callback that holds the solver thread at the first solution
+    until the event loop releases it
+    """
+
+    def __init__(self):
+        self.found = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, solution):
+        if not self.found.is_set():
+            self.found.set()
+            # bounded, so that a failing test cannot hang
+            self.release.wait(10)
+
+
+async def tick_until(event, ticks):
+    while not event.is_set():
+        ticks.append(time.perf_counter())
+        await asyncio.sleep(0.005)
+
+
+def test_concurrent_requests_progress_during_solve():
+    price, demand, capacity, share = generate(8, 20, 3)
+    supplier_selection = SupplierSelectionModel(
+        price, demand, capacity=capacity, share=share, n_threads=1
+    )
+    first_solution = FirstSolution()
+
+    async def main():
+        ticks = []
+        solve = asyncio.create_task(
+            supplier_selection.minimise_cost_async(callback=first_solution)
+        )
+        await tick_until(first_solution.found, ticks)
+        # the solver thread is inside the solve until released
+        held = len(ticks)
+        for _ in range(3):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+        assert not solve.done()
+        first_solution.release.set()
+        return await solve, ticks[held:]
+
+    (status, solution), ticks_during_solve = asyncio.run(main())
+    assert status == cp_model.OPTIMAL
+    assert solution["volume"].sum(axis=0).tolist() == demand.tolist()
+    assert len(ticks_during_solve) == 3
+
+
+def test_cancel_stops_search():
+    # the first of its solutions is not optimal
+    price, demand, capacity, share = generate(8, 20, 3)
+    supplier_selection = SupplierSelectionModel(
+        price, demand, capacity=capacity, share=share, n_threads=1
+    )
+    first_solution = FirstSolution()
+
+    async def main():
+        solve = asyncio.create_task(
+            supplier_selection.minimise_cost_async(callback=first_solution)
+        )
+        await tick_until(first_solution.found, [])
+        start = time.perf_counter()
+        solve.cancel()
+        # let the task handle the cancellation (StopSearch) before the
+        # search resumes
+        await asyncio.sleep(0)
+        first_solution.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await solve
+        return time.perf_counter() - start
+
+    stopped_after = asyncio.run(main())
+    assert stopped_after < 5
+    assert supplier_selection.status == cp_model.FEASIBLE
+    assert supplier_selection.solve_stats["n_solutions"] == 1
+
+
+def test_cancel_before_solve_starts():
+    price, demand, capacity, share = generate(8, 20, 3)
+    supplier_selection = SupplierSelectionModel(
+        price, demand, capacity=capacity, share=share, n_threads=1
+    )
+    # hold the solver thread while the objective is built, before Solve
+    entered = threading.Event()
+    release = threading.Event()
+    compute_cost = supplier_selection._compute_cost
+
+    def held_compute_cost():
+        entered.set()
+        release.wait(10)
+        return compute_cost()
+
+    supplier_selection._compute_cost = held_compute_cost
+
+    async def main():
+        solve = asyncio.create_task(supplier_selection.minimise_cost_async())
+        await tick_until(entered, [])
+        solve.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await solve
+
+    asyncio.run(main())
+    assert supplier_selection.status == cp_model.UNKNOWN
+    assert supplier_selection.solution is None
+
+    # the next solve is not cancelled
+    status, solution = asyncio.run(supplier_selection.minimise_cost_async())
+    assert status == cp_model.OPTIMAL
+
+
+def test_minimal_model_async():
+    minimal = MinimalSupplierSelectionModel(
+        [[60, 605, 95, 75], [50, 615, 98, 60]],
+        [300, 20, 150, 80],
+        capacity=[4, 3],
+    )
+    status, solution = asyncio.run(minimal.minimise_cost_async())
+    assert status == cp_model.OPTIMAL
+    assert solution["volume"].sum(axis=0).tolist() == [300, 20, 150, 80]
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from cache import ModelCache, input_key
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+kwargs = {
+    "capacity": capacity,
+    "supplier_transfer_limit": supplier_transfer_limit,
+    "share": share,
+}
+
+expected = [
+    [[58, 59, 61], [20, 30, 0], [46, 44, 38], [0, 0, 80]],
+    [[242, 251, 259], [0, 0, 40], [104, 101, 92], [80, 80, 0]],
+]
+
+
+def test_input_key():
+    key = input_key(price, demand, **kwargs)
+    arrays = {name: np.array(value) for name, value in kwargs.items()}
+    assert input_key(np.array(price), np.array(demand), **arrays) == key
+    assert (
+        input_key(price, demand, n_threads=2, share_formulation="division", **kwargs)
+        == key
+    )
+    assert input_key(price, demand, validate=False, **kwargs) == key
+    assert input_key(price, demand, share_formulation="linear", **kwargs) != key
+    assert input_key(price, demand, capacity=capacity) != key
+
+
+def test_cached_model_and_solution(tmp_path):
+    cache = ModelCache(str(tmp_path))
+
+    first = cache.minimise_cost(price, demand, **kwargs)
+    assert first["model"] is not None
+    assert first["volume"].tolist() == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # the model is restored from its proto instead of being rebuilt
+    restored = cache.get_model(price, demand, **kwargs)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert (
+        restored.model_size()["variables"] == first["model"].model_size()["variables"]
+    )
+    assert restored.families == []
+    restored.minimise_cost()
+    assert restored.return_solution() == expected
+
+    # the solution is cached too, so nothing is built or solved
+    cached = cache.minimise_cost(np.array(price), np.array(demand), **kwargs)
+    assert cached["model"] is None
+    assert cached["volume"].tolist() == expected
+    assert cached["objective"] == first["objective"]
+    assert cache.stats()["solution_hits"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    cache.minimise_cost(price, demand, **kwargs)
+    entry_bytes = cache.stats()["bytes"]
+
+    cache.max_bytes = int(1.5 * entry_bytes)
+    cache.minimise_cost(price, demand, capacity=capacity, share=share)
+    assert cache.stats()["entries"] == 1
+    cache.minimise_cost(price, demand, capacity=capacity, share=share)
+    assert cache.solution_hits == 1
+    cache.minimise_cost(price, demand, **kwargs)
+    assert cache.solution_hits == 1
+    assert cache.misses == 3
+
+
+def test_restored_model_validated(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    short = [[40] * 4, [40] * 4]
+    cache.get_model(price, demand, share=short, validate=False)
+    cache.get_model(price, demand, share=short, validate=False)
+    assert (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(ValueError, match="cannot cover"):
+        cache.get_model(price, demand, share=short)
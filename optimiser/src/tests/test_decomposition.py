@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decision_engine import SupplierSelectionModel
+from decomposition import find_components
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+min_units = [
+    [[100, 100, 100], [5, 5, 5], [20, 25, 30], [15, 15, 15]],
+    [[100, 100, 100], [5, 5, 5], [20, 25, 30], [15, 15, 15]],
+]
+
+trust = [[True, False, True, True], [True, True, True, False]]
+
+
+def test_find_components():
+    supplier_selection = SupplierSelectionModel(
+        price, demand, share=share, minimum_units=min_units, trust=trust
+    )
+    labels = find_components(supplier_selection.model.Proto())
+    # every part and year is independent
+    assert len(np.unique(labels)) == 4 * 3
+    volume_labels = labels[supplier_selection.volume_index]
+    for cell in range(supplier_selection.n_cells):
+        part = supplier_selection.cell_part[cell]
+        for other in np.flatnonzero(supplier_selection.cell_part == part):
+            assert volume_labels[cell].tolist() == volume_labels[other].tolist()
+
+    coupled = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    labels = find_components(coupled.model.Proto())
+    assert len(np.unique(labels[coupled.volume_index])) == 1
+
+
+def test_decomposed_solve_matches_monolithic():
+    monolithic = SupplierSelectionModel(
+        price, demand, share=share, minimum_units=min_units, trust=trust
+    )
+    monolithic.minimise_cost()
+
+    decomposed = SupplierSelectionModel(
+        price, demand, share=share, minimum_units=min_units, trust=trust
+    )
+    status = decomposed.minimise_cost_decomposed(total_cores=2, min_batch_variables=1)
+    assert status == cp_model.OPTIMAL
+    assert decomposed.solve_stats["n_components"] == 12
+    assert decomposed.solve_stats["objective"] == monolithic.solver.ObjectiveValue()
+    assert set(decomposed.solve_stats) >= set(monolithic.solve_stats)
+    assert decomposed.solve_stats["best_bound"] == monolithic.solve_stats["best_bound"]
+    assert decomposed.solve_stats["gap"] == 0
+    assert decomposed.return_solution() == monolithic.return_solution()
+
+
+def test_coupled_model_falls_back_to_monolithic():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+        share=share,
+    )
+    status = supplier_selection.minimise_cost_decomposed()
+    assert status == cp_model.OPTIMAL
+    assert "n_components" not in supplier_selection.solve_stats
+    assert supplier_selection.return_solution() == [
+        [[58, 59, 61], [20, 30, 0], [46, 44, 38], [0, 0, 80]],
+        [[242, 251, 259], [0, 0, 40], [104, 101, 92], [80, 80, 0]],
+    ]
@@ -0,0 +1,109 @@
+import os
+import sys
+
+import pytest
+from ortools.sat.python import cp_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import diagnosis
+from diagnosis import DiagnosisModel, check_inputs, diagnose_infeasibility
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+# supplier 1 held every part, and no part may change supplier
+locked_in = {
+    "capacity": capacity,
+    "global_transfer_limit": 0,
+    "previous_assigned": [[0, 0, 0, 0], [1, 1, 1, 1]],
+}
+
+
+@pytest.mark.parametrize(
+    "kwargs, check, first",
+    [
+        ({"trust": [[1, 0, 1, 1], [1, 0, 1, 1]]}, "eligibility", (1, 0)),
+        ({"share": [[100, 100, 30, 100], [80, 100, 60, 100]]}, "share", (2, 0)),
+        (
+            {"share": [[60] * 4] * 2, "minimum_units": [[[200] * 3] * 4] * 2},
+            "minimum_units",
+            (0, 0),
+        ),
+        (
+            {"capacity": [[1, 1, 1], [4, 4, 4]], "trust": [[1] * 4, [0, 1, 1, 0]]},
+            "capacity",
+            (0, 0),
+        ),
+        ({"capacity": [[1, 1, 1], [2, 2, 2]]}, "capacity", (0,)),
+    ],
+)
+def test_pre_checks(kwargs, check, first):
+    findings = check_inputs(price, demand, **kwargs)
+    assert [finding["check"] for finding in findings] == [check]
+    assert tuple(findings[0]["indices"][0]) == first
+
+    result = diagnose_infeasibility(price, demand, **kwargs)
+    assert [finding["message"] for finding in result["checks"]] == [
+        finding["message"] for finding in findings
+    ]
+    assert result["core"] is None
+    assert result["n_solves"] == 0
+
+
+def test_feasible_model_has_no_core():
+    result = diagnose_infeasibility(price, demand, capacity=capacity)
+    assert result["checks"] == []
+    assert result["status"] == "OPTIMAL"
+    assert result["core"] == []
+
+
+def test_minimal_infeasible_subset_of_families():
+    result = diagnose_infeasibility(price, demand, **locked_in)
+    assert result["status"] == "INFEASIBLE"
+    assert result["minimal"]
+    assert set(result["core"]) == {("capacity",), ("global_transfer_limit",)}
+
+
+def test_detailed_core_is_minimal():
+    result = diagnose_infeasibility(price, demand, detailed=True, **locked_in)
+    core = result["core"]
+    assert ("capacity", 1, 0) in core
+    assert {key[0] for key in core} == {"capacity", "global_transfer_limit"}
+
+    scenario = DiagnosisModel(price, demand, detailed=True, **locked_in)
+    assert scenario.solve_enforcing(core) == cp_model.INFEASIBLE
+    for key in core:
+        smaller = [other for other in core if other != key]
+        assert scenario.solve_enforcing(smaller) != cp_model.INFEASIBLE
+
+
+def test_solves_keep_the_model_time_limit():
+    scenario = DiagnosisModel(price, demand, **locked_in)
+    parameters = scenario.solver.parameters
+    parameters.max_time_in_seconds = 30
+    keys = list(scenario.assumptions)
+    assert scenario.solve_assuming(keys, 5)[0] == cp_model.INFEASIBLE
+    assert scenario.solve_enforcing(keys[:1], 5) != cp_model.INFEASIBLE
+    assert parameters.max_time_in_seconds == 30
+    assert not scenario.model.Proto().assumptions
+
+
+def test_infeasible_without_guarded_groups(monkeypatch):
+    # part 1 has no eligible supplier, found by the solve once the
+    # pre-checks are skipped
+    monkeypatch.setattr(diagnosis, "check_inputs", lambda *args, **kwargs: [])
+    result = diagnosis.diagnose_infeasibility(
+        price, demand, trust=[[1, 0, 1, 1], [1, 0, 1, 1]], capacity=capacity
+    )
+    assert result["status"] == "INFEASIBLE"
+    assert result["core"] == []
+    assert result["unguarded"]
+
+    assert not diagnose_infeasibility(price, demand, capacity=capacity)["unguarded"]
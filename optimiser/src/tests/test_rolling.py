@@ -0,0 +1,64 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decision_engine import SupplierSelectionModel
+from rolling import solve_rolling_horizon
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+kwargs = {
+    "capacity": capacity,
+    "supplier_transfer_limit": supplier_transfer_limit,
+    "share": share,
+}
+
+
+def test_previous_assigned_limits_first_year_transfers():
+    # supplier 1 already makes part 3, so it is a transfer to supplier 0
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        supplier_transfer_limit=[0, 0],
+        previous_assigned=[[1, 1, 1, 0], [1, 1, 1, 1]],
+    )
+    supplier_selection.minimise_cost()
+    volume = supplier_selection.return_volume_array()
+    assert np.all(volume[0, 3] == 0)
+
+
+def test_full_window_matches_full_solve():
+    full = SupplierSelectionModel(price, demand, **kwargs)
+    full.minimise_cost()
+    result = solve_rolling_horizon(price, demand, window=3, **kwargs)
+    assert result["status"] == "OPTIMAL"
+    assert len(result["window_times"]) == 1
+    assert result["volume"].tolist() == full.return_solution()
+    assert result["objective"] == full.solver.ObjectiveValue()
+
+
+def test_rolling_windows():
+    full = SupplierSelectionModel(price, demand, **kwargs)
+    full.minimise_cost()
+    result = solve_rolling_horizon(price, demand, window=1, **kwargs)
+    assert len(result["window_times"]) == 3
+    volume = result["volume"]
+    assert volume.sum(axis=0).tolist() == demand
+    assigned = volume > 0
+    entered = assigned[:, :, 1:] & ~assigned[:, :, :-1]
+    assert np.all(entered.sum(axis=1) <= np.array(supplier_transfer_limit)[:, None])
+    assert result["objective"] >= full.solver.ObjectiveValue()
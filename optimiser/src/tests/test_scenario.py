@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from scenario import ScenarioEngine
+from utils import compute_reduced_price
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+base_solution = [
+    [[58, 59, 61], [20, 30, 0], [46, 44, 38], [0, 0, 80]],
+    [[242, 251, 259], [0, 0, 40], [104, 101, 92], [80, 80, 0]],
+]
+
+
+def test_scenarios_reuse_one_model():
+    engine = ScenarioEngine(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+        share=share,
+    )
+    model = engine.scenario.model
+    n_constraints = len(model.Proto().constraints)
+
+    base = engine.run(name="base")
+    contract = engine.run(volume_pins={(1, 3, 2): 70}, name="contract")
+    reduced = engine.run(price=compute_reduced_price(price, 0, 0.1))
+    again = engine.run()
+
+    assert engine.scenario.model is model
+    assert len(model.Proto().constraints) == n_constraints
+    assert base["volume"].tolist() == base_solution
+    assert contract["volume"].tolist() == [
+        [[58, 59, 61], [20, 30, 40], [46, 44, 38], [0, 0, 10]],
+        [[242, 251, 259], [0, 0, 0], [104, 101, 92], [80, 80, 70]],
+    ]
+    assert reduced["objective"] < base["objective"]
+    assert reduced["name"] == "scenario 3"
+    assert again["volume"].tolist() == base_solution
+    assert np.array_equal(engine.scenario.price, np.array(price))
+    assert all(result["time_saved"] is not None for result in engine.results)
+
+
+def test_scenario_pin_outside_domain():
+    engine = ScenarioEngine(price, demand, share=share)
+    with pytest.raises(ValueError):
+        engine.run(volume_pins={(0, 2, 0): 100})
+    assert engine.run()["status"] == "OPTIMAL"
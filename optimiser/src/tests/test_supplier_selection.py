@@ -0,0 +1,733 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+from ortools.sat.python import cp_model
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decision_engine import MinimalSupplierSelectionModel, SupplierSelectionModel
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+min_units = [
+    [[100, 100, 100], [5, 5, 5], [20, 25, 30], [15, 15, 15]],
+    [[100, 100, 100], [5, 5, 5], [20, 25, 30], [15, 15, 15]],
+]
+
+trust = [[True, False, True, True], [True, True, True, False]]
+
+
+def test_array_inputs():
+    supplier_selection_arrays = SupplierSelectionModel(
+        np.array(price),
+        np.array(demand),
+        capacity=np.array(capacity),
+        supplier_transfer_limit=np.array(supplier_transfer_limit),
+        share=np.array(share),
+        minimum_units=np.array(min_units),
+        trust=np.array(trust),
+    )
+    supplier_selection_arrays.minimise_cost()
+    assert supplier_selection_arrays.return_solution() == [
+        [[100, 100, 100], [0, 0, 0], [46, 44, 38], [80, 80, 80]],
+        [[200, 210, 220], [20, 30, 40], [104, 101, 92], [0, 0, 0]],
+    ]
+
+
+def test_variable_index_arrays():
+    supplier_selection = SupplierSelectionModel(
+        price, demand, supplier_transfer_limit=supplier_transfer_limit
+    )
+    for variables, index, n_years in [
+        (supplier_selection.volume, supplier_selection.volume_index, 3),
+        (supplier_selection.assigned, supplier_selection.assigned_index, 3),
+        (supplier_selection.transferred, supplier_selection.transferred_index, 2),
+    ]:
+        assert variables.shape == (8, n_years)
+        assert index.shape == (8, n_years)
+        assert [v.Index() for v in variables.flat] == index.ravel().tolist()
+
+
+def test_global_transfer_limit_only():
+    supplier_selection = SupplierSelectionModel(
+        price, demand, capacity=capacity, global_transfer_limit=1
+    )
+    supplier_selection.minimise_cost()
+    assigned = np.array(supplier_selection.return_solution()) > 0
+    entered = assigned[:, :, 1:] & ~assigned[:, :, :-1]
+    assert np.all(entered.sum(axis=(0, 1)) <= 1)
+
+
+def test_duplicate_demand_constraints_dropped():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+        share=share,
+    )
+    size = supplier_selection.model_size()
+    assert size["duplicate_constraints_dropped"] == 0
+
+    # re-emit the demand rows once per supplier, as the nested loops used to
+    for _ in range(supplier_selection.n_suppliers):
+        supplier_selection._add_constraint_volume()
+    n_rows = supplier_selection.n_parts * supplier_selection.n_years
+    assert supplier_selection.model_size() == dict(
+        size, duplicate_constraints_dropped=supplier_selection.n_suppliers * n_rows
+    )
+
+    supplier_selection.minimise_cost()
+    assert supplier_selection.return_solution() == [
+        [[58, 59, 61], [20, 30, 0], [46, 44, 38], [0, 0, 80]],
+        [[242, 251, 259], [0, 0, 40], [104, 101, 92], [80, 80, 0]],
+    ]
+
+
+def test_minimal_duplicate_demand_constraints_dropped():
+    minimal_price = [[60, 605, 95, 75], [50, 615, 98, 60]]
+    minimal_demand = [300, 20, 150, 80]
+    supplier_selection = MinimalSupplierSelectionModel(
+        minimal_price, minimal_demand, [2, 3], [[100, 100, 30, 100], [80, 100, 70, 100]]
+    )
+    supplier_selection._add_constraint_volume()
+    assert supplier_selection.model_size()["duplicate_constraints_dropped"] == 4
+
+    supplier_selection.minimise_cost()
+    assert [
+        [supplier_selection.solver.Value(v) for v in volume]
+        for volume in supplier_selection.volume
+    ] == [[300, 0, 46, 0], [0, 20, 104, 80]]
+
+
+def test_repeated_volume_pin_dropped():
+    supplier_selection = SupplierSelectionModel(price, demand, capacity=capacity)
+    supplier_selection.set_volume_constraint(1, 3, 2, 70)
+    supplier_selection.set_volume_constraint(1, 3, 2, 70)
+    assert supplier_selection.model_size()["duplicate_constraints_dropped"] == 1
+
+
+def test_capacity_constraints_not_shared():
+    # suppliers 1 and 2 have no eligible cells and the same capacity
+    supplier_selection = SupplierSelectionModel(
+        price + [price[0], price[0]],
+        demand,
+        capacity=capacity + [[1, 1, 1], [1, 1, 1]],
+        trust=[[True] * 4, [False] * 4, [False] * 4, [True] * 4],
+    )
+    indices = supplier_selection.capacity_constraints
+    assert len(np.unique(indices)) == indices.size
+
+    supplier_selection.override_capacity(1, 0, 5)
+    constraints = supplier_selection.model.Proto().constraints
+    assert list(constraints[int(indices[1, 0])].linear.domain) == [0, 5]
+    assert list(constraints[int(indices[2, 0])].linear.domain) == [0, 1]
+
+
+def test_edits_and_undo_match_rebuilt_models():
+    def solve(scenario):
+        scenario.minimise_cost()
+        return scenario.return_solution()
+
+    edited = SupplierSelectionModel(price, demand, capacity=capacity, trust=trust)
+    base = solve(edited)
+
+    edited.pin_volume(1, 2, 2, 70)
+    edited.pin_volume(1, 2, 2, 40)
+    pinned = SupplierSelectionModel(price, demand, capacity=capacity, trust=trust)
+    pinned.set_volume_constraint(1, 2, 2, 40)
+    assert solve(edited) == solve(pinned)
+    assert edited.edits == {("volume", 1, 2, 2): 40}
+
+    assert edited.undo() == [("volume", 1, 2, 2)]
+    assert edited.edits == {("volume", 1, 2, 2): 70}
+    edited.pin_volume(1, 2, 2)
+    edited.override_capacity(0, 1, 2)
+    edited.override_trust(1, 0, False)
+    reduced_capacity = np.array(capacity)
+    reduced_capacity[0, 1] = 2
+    reduced_trust = np.array(trust)
+    reduced_trust[1, 0] = False
+    rebuilt = SupplierSelectionModel(
+        price, demand, capacity=reduced_capacity, trust=reduced_trust
+    )
+    assert solve(edited) == solve(rebuilt)
+    assert edited.metrics.totals()["edit"] > 0
+
+    # an edit that empties a domain is rejected and leaves the model as it was
+    with pytest.raises(ValueError):
+        edited.pin_volume(1, 0, 0, 300)
+    with pytest.raises(ValueError):
+        edited.override_trust(0, 1, True)
+    assert len(edited.edits) == 2
+
+    edited.clear_edits()
+    assert edited.edits == {}
+    assert solve(edited) == base
+
+
+def test_edits_keep_domain_overrides():
+    supplier_selection = SupplierSelectionModel(price, demand, capacity=capacity)
+    variables = supplier_selection.model.Proto().variables
+
+    def domain(supplier, part, year):
+        cell = supplier_selection.cell_index[supplier, part]
+        return list(variables[int(supplier_selection.volume_index[cell, year])].domain)
+
+    built = domain(1, 3, 2)
+    previous = supplier_selection.override_volume_domain(1, 3, 2, 70, 70)
+    supplier_selection.pin_volume(1, 3, 2, 70)
+    supplier_selection.undo()
+    supplier_selection.override_trust(1, 3, True)
+    supplier_selection.pin_volume(1, 3, 1, 50)
+    assert domain(1, 3, 2) == [70, 70]
+    with pytest.raises(ValueError):
+        supplier_selection.pin_volumes(np.array([60]), [1], [3], [2])
+    assert supplier_selection.minimise_cost() == cp_model.OPTIMAL
+    assert supplier_selection.return_volume(1, 3, 2) == 70
+
+    supplier_selection.restore_volume_domain(1, 3, 2, previous)
+    assert domain(1, 3, 2) == built
+    assert domain(1, 3, 1) == [50, 50]
+
+
+def test_trust_kept_untrusted_bids():
+    def solve(scenario):
+        scenario.minimise_cost()
+        return scenario.return_solution()
+
+    kept = SupplierSelectionModel(
+        price, demand, capacity=capacity, trust=trust, keep_untrusted_bids=True
+    )
+    rebuilt = SupplierSelectionModel(price, demand, capacity=capacity, trust=trust)
+    assert kept.n_cells == 8
+    assert rebuilt.n_cells == 6
+    base = solve(rebuilt)
+    assert solve(kept) == base
+
+    kept.override_trust(0, 1, True)
+    more_trust = np.array(trust)
+    more_trust[0, 1] = True
+    trusted = SupplierSelectionModel(price, demand, capacity=capacity, trust=more_trust)
+    assert solve(kept) == solve(trusted)
+    assert solve(kept) != base
+
+    kept.undo()
+    assert solve(kept) == base
+    with pytest.raises(ValueError):
+        kept.pin_volume(0, 1, 0, 10)
+
+
+def test_bulk_pins():
+    supplier, part, year = [0, 0, 0, 1], [0, 0, 0, 2], [0, 1, 2, 1]
+    volume = [100, 110, 120, 50]
+    pinned = SupplierSelectionModel(
+        price, demand, capacity=capacity, minimum_units=min_units, trust=trust
+    )
+    for pin in zip(supplier, part, year, volume):
+        pinned.set_volume_constraint(*pin)
+    pinned.minimise_cost()
+
+    bulk = SupplierSelectionModel(
+        price, demand, capacity=capacity, minimum_units=min_units, trust=trust
+    )
+    domains = [list(variable.domain) for variable in bulk.model.Proto().variables]
+    n_constraints = bulk.model_size()["constraints"]
+    bulk.pin_volumes(volume, supplier, part, year)
+    assert bulk.model_size()["constraints"] == n_constraints
+    bulk.minimise_cost()
+    assert bulk.return_solution() == pinned.return_solution()
+    assert len(bulk.undo()) == 4
+    assert bulk.edits == {}
+    assert [list(v.domain) for v in bulk.model.Proto().variables] == domains
+
+    masked = np.ma.masked_all((2, 4, 3), dtype=np.int64)
+    masked[supplier, part, year] = volume
+    bulk.pin_volumes(masked)
+    bulk.minimise_cost()
+    assert bulk.return_solution() == pinned.return_solution()
+
+    # no pins leave the undo history as it was
+    bulk.pin_volumes(np.ma.masked_all((2, 4, 3), dtype=np.int64))
+    bulk.pin_volumes([], [], [], [])
+    assert len(bulk.undo()) == 4
+    bulk.pin_volumes(masked)
+
+    # checked before the model is changed
+    for args in [
+        ([10], [0], [1], [0]),  # supplier 0 is not trusted with part 1
+        ([250], [1], [0], [0]),  # 100 + 250 above the demand of 300
+        ([20], [0], [3], [1]),  # part 3 only has supplier 0, pinned below demand
+        ([1, 2], [1, 1], [0, 0], [1, 1]),  # pinned twice
+    ]:
+        with pytest.raises(ValueError):
+            bulk.pin_volumes(*args)
+    assert len(bulk.edits) == 4
+
+    # pins of set_volume_constraint count too
+    for args in [([250], [1], [0], [0]), ([90], [0], [0], [0])]:
+        with pytest.raises(ValueError):
+            pinned.pin_volumes(*args)
+    pinned.pin_volumes([200], [1], [0], [0])
+    pinned.minimise_cost()
+    assert pinned.return_solution() == bulk.return_solution()
+
+
+def test_capacity_override_without_capacity():
+    supplier_selection = SupplierSelectionModel(price, demand)
+    supplier_selection.override_capacity(1, 0, 1)
+    supplier_selection.minimise_cost()
+    assigned = supplier_selection.solution["assigned"]
+    assert assigned[1, :, 0].sum() == 1
+    supplier_selection.undo()
+    supplier_selection.minimise_cost()
+    assert supplier_selection.solution["assigned"][1, :, 0].sum() > 1
+
+
+def test_volume_domains_from_data():
+    supplier_selection = SupplierSelectionModel(
+        price, demand, share=share, minimum_units=min_units, trust=trust
+    )
+    proto = supplier_selection.model.Proto()
+
+    def domain(supplier, part, year):
+        cell = supplier_selection.cell_index[supplier, part]
+        index = supplier_selection.volume_index[cell, year]
+        return list(proto.variables[int(index)].domain)
+
+    assert domain(0, 0, 0) == [0, 0, 100, 300]
+    # floor(100 * volume / 150) <= 30 allows up to 46 units
+    assert domain(0, 2, 0) == [0, 0, 20, 46]
+
+
+def test_untrusted_cells_have_no_variables():
+    supplier_selection = SupplierSelectionModel(
+        price, demand, capacity=capacity, minimum_units=min_units, trust=trust
+    )
+    assert supplier_selection.n_cells == 6
+    assert supplier_selection.cell_index[0, 1] == -1
+    assert supplier_selection.cell_index[1, 3] == -1
+    assert supplier_selection.model_size()["variables"] == 2 * 6 * 3
+    with pytest.raises(ValueError):
+        supplier_selection.set_volume_constraint(0, 1, 0, 10)
+
+    supplier_selection.minimise_cost()
+    volume = supplier_selection.return_volume_array()
+    assert volume.shape == (2, 4, 3)
+    assert np.all(volume[~np.array(trust)] == 0)
+    assert volume.sum(axis=0).tolist() == demand
+
+
+def test_demand_above_500():
+    supplier_selection = SupplierSelectionModel(
+        price, [[900, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+    )
+    supplier_selection.minimise_cost()
+    assert supplier_selection.return_solution()[1][0] == [900, 310, 320]
+
+
+def test_linear_share_formulation():
+    # 30% of 145 units is 43.5, which the linear formulation rounds down
+    # and the division formulation rounds up, so give supplier 1 some room
+    linear_share = [[100, 100, 40, 100], [80, 100, 70, 100]]
+    division = SupplierSelectionModel(
+        price, demand, capacity=capacity, share=linear_share
+    )
+    linear = SupplierSelectionModel(
+        price, demand, capacity=capacity, share=linear_share, share_formulation="linear"
+    )
+    n_cells = linear.n_suppliers * linear.n_parts * linear.n_years
+    assert (
+        division.model_size()["variables"] - linear.model_size()["variables"] == n_cells
+    )
+
+    linear.minimise_cost()
+    volume = np.array(linear.return_solution())
+    limit = np.array(linear_share)[:, :, None] * np.array(demand)
+    assert np.all(100 * volume <= limit)
+    assert volume[0, 2].tolist() == [60, 58, 39]
+
+
+@pytest.mark.parametrize("share_formulation", ["division", "linear"])
+def test_share_without_demand(share_formulation):
+    # the share of test_linear_share_formulation, which both formulations
+    # can meet
+    both_share = [[100, 100, 40, 100], [80, 100, 70, 100]]
+    no_demand = np.array(demand)
+    no_demand[1, 2] = 0
+    supplier_selection = SupplierSelectionModel(
+        price,
+        no_demand,
+        capacity=capacity,
+        share=both_share,
+        share_formulation=share_formulation,
+    )
+    assert supplier_selection.minimise_cost() == cp_model.OPTIMAL
+    volume = np.array(supplier_selection.return_solution())
+    assert volume[:, 1, 2].tolist() == [0, 0]
+    assert volume.sum(axis=0).tolist() == no_demand.tolist()
+
+    minimal = MinimalSupplierSelectionModel(
+        [[60, 605, 95, 75], [50, 615, 98, 60]], [300, 0, 150, 80], share=share
+    )
+    assert minimal.minimise_cost() == cp_model.OPTIMAL
+
+
+@pytest.mark.parametrize("previous_assigned", [None, [[1, 0, 1, 0], [0, 1, 0, 1]]])
+def test_linear_transfer_formulation(previous_assigned):
+    kwargs = {
+        "capacity": capacity,
+        "supplier_transfer_limit": [1, 1],
+        "global_transfer_limit": 1,
+        "previous_assigned": previous_assigned,
+    }
+    reified = SupplierSelectionModel(price, demand, **kwargs)
+    linear = SupplierSelectionModel(
+        price, demand, transfer_formulation="linear", **kwargs
+    )
+    assert linear.transferred.shape == reified.transferred.shape
+    assert linear.transferred.shape[1] == 3 - linear.first_transfer_year
+    assert reified.minimise_cost() == linear.minimise_cost() == cp_model.OPTIMAL
+    assert linear.solver.ObjectiveValue() == reified.solver.ObjectiveValue()
+
+    # transferred is exactly the supplier entries, as with reified constraints
+    assigned = linear.solution["assigned"].astype(bool)
+    entered = np.zeros_like(assigned)
+    entered[:, :, 1:] = assigned[:, :, 1:] & ~assigned[:, :, :-1]
+    if previous_assigned is not None:
+        entered[:, :, 0] = assigned[:, :, 0] & ~np.array(previous_assigned, dtype=bool)
+    assert np.array_equal(linear.solution["transferred"], entered)
+
+    with pytest.raises(ValueError):
+        SupplierSelectionModel(price, demand, transfer_formulation="indicator")
+
+
+def test_solution_extracted_once():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    with pytest.raises(ValueError):
+        supplier_selection.return_volume_array()
+    supplier_selection.minimise_cost()
+
+    solver = supplier_selection.solver
+    for name in ("volume", "assigned", "transferred"):
+        variables = getattr(supplier_selection, name)
+        expected = [solver.Value(v) for v in variables.flat]
+        solution = supplier_selection.solution[name][:, :, -variables.shape[1] :]
+        assert solution.ravel().tolist() == expected
+    assert not supplier_selection.solution["transferred"][:, :, 0].any()
+
+    value = supplier_selection._value_to_ndarray()
+    assert value.shape == (2, 4)
+    assert value.sum() == solver.ObjectiveValue()
+
+
+def test_warm_start_from_solved_model():
+    base = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    base.minimise_cost()
+    assert base.solve_stats["n_solutions"] >= 1
+    assert base.solve_stats["time_to_optimal"] is not None
+
+    scenario = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    scenario.set_solution_hint(base)
+    hint = scenario.model.Proto().solution_hint
+    assert len(hint.vars) == 2 * base.volume.size + base.transferred.size
+    scenario.solver.parameters.num_search_workers = 1
+    scenario.minimise_cost()
+    assert scenario.return_solution() == base.return_solution()
+    first = scenario.solve_stats["time_to_first_solution"]
+    assert first <= scenario.solve_stats["time_to_optimal"]
+
+    with pytest.raises(ValueError):
+        scenario.set_solution_hint(np.zeros((2, 4)))
+
+
+def test_phase_timings_recorded():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    status = supplier_selection.minimise_cost()
+    assert status == cp_model.OPTIMAL
+
+    totals = supplier_selection.metrics.totals()
+    for phase in [
+        "build",
+        "_create_volume_matrix",
+        "_link_volume_to_assigned",
+        "_add_constraint_volume",
+        "_add_constraint_manufacturing_capacity",
+        "_link_assigned_to_transferred",
+        "_add_constraint_supplier_transfer_limit",
+        "solve",
+        "extraction",
+        "minimise_cost",
+    ]:
+        assert totals[phase] >= 0
+    assert "_add_constraint_part_share" not in totals
+    assert totals["build"] >= totals["_add_constraint_volume"]
+
+    exported = json.loads(supplier_selection.metrics.to_json())
+    assert exported["totals"] == totals
+    rows = supplier_selection.metrics.to_csv().splitlines()
+    assert rows[0] == "phase,seconds"
+    assert len(rows) == len(supplier_selection.metrics.records) + 1
+
+
+def test_family_breakdown():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+        share=share,
+    )
+    breakdown = {row["family"]: row for row in supplier_selection.family_breakdown()}
+    n_cells = 2 * 4 * 3
+
+    assert breakdown["_create_volume_matrix"]["variables"] == n_cells
+    assert breakdown["_link_volume_to_assigned"]["constraints"] == 2 * n_cells
+    assert breakdown["_link_volume_to_assigned"]["enforcement_literals"] == 2 * n_cells
+    assert breakdown["_add_constraint_volume"]["constraints"] == 4 * 3
+    assert breakdown["_add_constraint_manufacturing_capacity"]["constraints"] == 2 * 3
+    assert breakdown["_add_constraint_part_share"]["variables"] == n_cells
+    assert "_add_constraint_trust" not in breakdown
+    assert sum(row["variables"] for row in breakdown.values()) == (
+        supplier_selection.model_size()["variables"]
+    )
+
+
+def test_sparse_bids():
+    bids = [(s, p) for s in range(2) for p in range(4) if trust[s][p]]
+    by_trust = SupplierSelectionModel(price, demand, share=share, trust=trust)
+    by_pairs = SupplierSelectionModel(price, demand, share=share, bids=bids)
+    by_mask = SupplierSelectionModel(
+        price, demand, share=share, bids=np.array(trust, dtype=bool)
+    )
+    assert by_pairs.n_cells == by_mask.n_cells == len(bids)
+    assert by_pairs.model_size() == by_trust.model_size()
+
+    by_trust.minimise_cost()
+    by_pairs.minimise_cost()
+    by_mask.minimise_cost()
+    assert by_pairs.return_solution() == by_trust.return_solution()
+    assert by_mask.return_solution() == by_trust.return_solution()
+
+    # only a boolean array is a mask: with 2 suppliers and 2 parts, pairs of
+    # 0 and 1 have the shape of a mask but are still read as pairs
+    two_parts = [row[:2] for row in price], demand[:2]
+    pairs = [[0, 0], [1, 1]]
+    for bids in [pairs, np.array(pairs)]:
+        by_pairs = SupplierSelectionModel(*two_parts, bids=bids)
+        assert by_pairs._bid_mask(bids).tolist() == [[True, False], [False, True]]
+    by_mask = SupplierSelectionModel(*two_parts, bids=np.array(pairs, dtype=bool))
+    assert by_mask.n_cells == 2
+    assert by_mask._bid_mask(np.array(pairs, dtype=bool)).tolist() == [
+        [False, False],
+        [True, True],
+    ]
+
+    int_mask = np.array(trust, dtype=np.int64)
+    for invalid in [
+        [(2, 0)],
+        np.ones((4, 2), dtype=bool),
+        [[0, 1, 1]],
+        [0, 1],
+        int_mask,
+        int_mask.tolist(),
+    ]:
+        with pytest.raises(ValueError):
+            SupplierSelectionModel(price, demand, bids=invalid)
+
+
+def test_estimate_cost():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        share=share,
+        minimum_units=min_units,
+        trust=trust,
+    )
+    estimate = supplier_selection.estimate_cost()
+    greedy = estimate["greedy_volume"]
+    assert greedy.sum(axis=0).tolist() == demand
+    assert np.all((greedy > 0).sum(axis=1) <= np.array(capacity))
+    assert np.all((greedy == 0) | (greedy >= np.array(min_units)))
+    assert np.all(greedy[~np.array(trust)] == 0)
+    assert estimate["greedy_cost"] == (np.array(price) * greedy).sum()
+
+    status = supplier_selection.minimise_cost(estimate)
+    assert status == cp_model.OPTIMAL
+    objective = supplier_selection.solver.ObjectiveValue()
+    assert estimate["lower_bound"] <= objective <= estimate["greedy_cost"]
+    assert supplier_selection.return_solution() == [
+        [[100, 100, 100], [0, 0, 0], [46, 44, 38], [80, 80, 80]],
+        [[200, 210, 220], [20, 30, 40], [104, 101, 92], [0, 0, 0]],
+    ]
+
+    # shares of 40% from two suppliers cannot cover the demand
+    uncovered = SupplierSelectionModel(
+        price, demand, share=[[40] * 4, [40] * 4], validate=False
+    )
+    assert uncovered.estimate_cost() == {
+        "lower_bound": None,
+        "greedy_volume": None,
+        "greedy_cost": None,
+        "state": uncovered._estimate_state(),
+    }
+
+
+@pytest.mark.parametrize("pin", ["set_volume_constraint", "pin_volume"])
+def test_estimate_with_pins(pin):
+    supplier_selection = SupplierSelectionModel(price, demand)
+    stale = supplier_selection.estimate_cost()
+    getattr(supplier_selection, pin)(0, 0, 0, 300)
+    estimate = supplier_selection.estimate_cost()
+    assert estimate["greedy_volume"][0, 0, 0] == 300
+    assert supplier_selection._satisfies_model(estimate["greedy_volume"])
+    assert not supplier_selection._satisfies_model(stale["greedy_volume"])
+
+    # the stale greedy assignment is only used as a hint
+    for guess in [estimate, stale]:
+        assert supplier_selection.minimise_cost(guess) == cp_model.OPTIMAL
+        assert supplier_selection.solver.ObjectiveValue() == 165900
+
+
+def test_stale_estimate_only_hints():
+    plain = SupplierSelectionModel(price, demand, capacity=capacity)
+    plain.minimise_cost()
+    optimum = plain.solver.ObjectiveValue()
+
+    # supplier 1 is the cheapest for part 0, its lower bound is too high
+    # once the pin is undone
+    supplier_selection = SupplierSelectionModel(price, demand, capacity=capacity)
+    supplier_selection.pin_volume(1, 0, 0, 0)
+    estimate = supplier_selection.estimate_cost()
+    supplier_selection.undo()
+    assert supplier_selection.minimise_cost(estimate) == cp_model.OPTIMAL
+    assert supplier_selection.solver.ObjectiveValue() == optimum
+
+    half_price = np.array(price) // 2
+    estimate = supplier_selection.estimate_cost()
+    supplier_selection.price = half_price
+    assert supplier_selection.minimise_cost(estimate) == cp_model.OPTIMAL
+    fresh = SupplierSelectionModel(half_price, demand, capacity=capacity)
+    fresh.minimise_cost()
+    assert supplier_selection.solver.ObjectiveValue() == fresh.solver.ObjectiveValue()
+
+
+def test_solve_limits_and_progress_callback():
+    supplier_selection = SupplierSelectionModel(
+        price,
+        demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+    )
+    progress = []
+
+    def stop_at_first_solution(solution):
+        progress.append(solution)
+        return True
+
+    status = supplier_selection.minimise_cost(
+        max_time_in_seconds=10, relative_gap_limit=0.01, callback=stop_at_first_solution
+    )
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    assert len(progress) == 1
+    assert set(progress[0]) == {"wall_time", "objective", "bound", "gap"}
+    assert progress[0]["bound"] <= progress[0]["objective"]
+    stats = supplier_selection.solve_stats
+    assert stats["n_solutions"] == 1
+    assert stats["objective"] == progress[0]["objective"]
+    assert np.array(supplier_selection.return_solution()).sum(axis=0).tolist() == demand
+
+    # limits only apply to the solve they were given for
+    parameters = supplier_selection.solver.parameters
+    assert parameters.relative_gap_limit != 0.01
+    assert parameters.max_time_in_seconds != 10
+
+
+@pytest.mark.parametrize(
+    "kwargs, check, name, indices",
+    [
+        ({"trust": [[1, 0, 1], [1, 1, 1]]}, "shape", "trust", [[]]),
+        (
+            {"share": [[100, 100, 30, 120], [80, 100, -5, 100]]},
+            "range",
+            "share",
+            [[0, 3], [1, 2]],
+        ),
+        (
+            {"supplier_transfer_limit": [1, -1]},
+            "range",
+            "supplier_transfer_limit",
+            [[1]],
+        ),
+        (
+            {"trust": [[True, False, True, True], [True, False, True, False]]},
+            "eligibility",
+            "trust",
+            [[1, 0], [1, 1], [1, 2]],
+        ),
+        ({"share": [[40] * 4, [40] * 4]}, "share", "share", None),
+        (
+            {"share": [[60] * 4] * 2, "minimum_units": [[[200] * 3] * 4] * 2},
+            "minimum_units",
+            "minimum_units",
+            [[part, year] for part in range(4) for year in range(3)],
+        ),
+        ({"capacity": [[1, 1, 1], [2, 2, 2]]}, "capacity", "capacity", [[0], [1], [2]]),
+    ],
+)
+def test_constructor_rejects_invalid_inputs(kwargs, check, name, indices):
+    with pytest.raises(ValueError) as raised:
+        SupplierSelectionModel(price, demand, **kwargs)
+    errors = raised.value.errors
+    assert [(error["check"], error["input"]) for error in errors] == [(check, name)]
+    assert errors[0]["count"] == len(errors[0]["indices"])
+    if indices is not None:
+        assert errors[0]["indices"].tolist() == indices
+
+    if check not in ("shape", "range"):
+        scenario = SupplierSelectionModel(price, demand, validate=False, **kwargs)
+        assert scenario.minimise_cost() == cp_model.INFEASIBLE
+
+
+def test_constructor_rejects_malformed_arrays():
+    with pytest.raises(ValueError, match="ragged"):
+        SupplierSelectionModel(price, [[300, 310], [20, 30, 40]])
+    with pytest.raises(ValueError, match="price has shape"):
+        SupplierSelectionModel(price[0], demand)
+    with pytest.raises(ValueError, match="demand has shape"):
+        SupplierSelectionModel(price, demand[:3])
@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sweep import run_sweep, split_cores
+from utils import compute_reduced_price
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 30, 100], [80, 100, 70, 100]]
+
+supplier_transfer_limit = [1, 2]
+
+
+def test_split_cores():
+    assert split_cores(3, total_cores=8) == (3, 2)
+    assert split_cores(20, total_cores=8) == (8, 1)
+    assert split_cores(1, total_cores=8) == (1, 8)
+    assert split_cores(4, total_cores=8, max_workers=2) == (2, 4)
+
+
+def test_run_sweep():
+    base = dict(
+        price=price,
+        demand=demand,
+        capacity=capacity,
+        supplier_transfer_limit=supplier_transfer_limit,
+        share=share,
+    )
+    results = run_sweep(
+        base,
+        [
+            {"name": "base"},
+            {"volume_pins": {(1, 3, 2): 70}},
+            {"name": "S1 -10%", "price": compute_reduced_price(price, 0, 0.1)},
+        ],
+        total_cores=2,
+    )
+
+    assert [r["name"] for r in results] == ["base", "scenario 2", "S1 -10%"]
+    assert [r["status"] for r in results] == ["OPTIMAL"] * 3
+    assert results[0]["volume"].tolist() == [
+        [[58, 59, 61], [20, 30, 0], [46, 44, 38], [0, 0, 80]],
+        [[242, 251, 259], [0, 0, 40], [104, 101, 92], [80, 80, 0]],
+    ]
+    assert results[1]["volume"][1, 3, 2] == 70
+    assert results[2]["objective"] < results[0]["objective"]
+    assert all(r["wall_time"] > 0 for r in results)
+
+
+def test_run_sweep_reports_rejected_variants():
+    results = run_sweep(
+        dict(price=price, demand=demand),
+        [{"name": "short", "share": [[40] * 4, [40] * 4]}],
+        total_cores=1,
+    )
+    assert results[0]["status"] == "INFEASIBLE"
+    assert results[0]["objective"] is None
+    assert results[0]["volume"] is None
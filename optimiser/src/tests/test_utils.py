@@ -0,0 +1,99 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from decision_engine import SupplierSelectionModel
+from utils import (
+    compute_reduced_price,
+    generate_supplier_selector_variables,
+    load_inputs,
+    save_inputs,
+)
+
+price = [
+    [[60, 62, 64], [605, 610, 615], [95, 96, 97], [75, 75, 75]],
+    [[50, 55, 60], [615, 610, 605], [98, 97, 96], [60, 70, 80]],
+]
+
+demand = [[300, 310, 320], [20, 30, 40], [150, 145, 130], [80, 80, 80]]
+
+capacity = [[4, 4, 4], [3, 3, 3]]
+
+share = [[100, 100, 40, 100], [80, 100, 70, 100]]
+
+trust = [[True, False, True, True], [True, True, True, False]]
+
+inputs = {
+    "price": price,
+    "demand": demand,
+    "capacity": capacity,
+    "share": share,
+    "trust": trust,
+    "global_transfer_limit": np.int64(2),
+    "share_formulation": "linear",
+}
+
+
+@pytest.mark.parametrize("filename", ["inputs", "inputs.npz"])
+def test_save_and_load_inputs(tmp_path, filename):
+    path = str(tmp_path / filename)
+    save_inputs(path, **inputs)
+    loaded = load_inputs(path)
+
+    assert set(loaded) == set(inputs)
+    assert loaded["global_transfer_limit"] == 2
+    assert loaded["share_formulation"] == "linear"
+    assert loaded["price"].dtype == np.int16
+    assert loaded["share"].dtype == np.int8
+    assert loaded["trust"].dtype == bool
+    if filename == "inputs":
+        assert isinstance(loaded["price"], np.memmap)
+    for name in ["price", "demand", "capacity", "share", "trust"]:
+        assert loaded[name].tolist() == inputs[name]
+
+    from_lists = SupplierSelectionModel(**inputs)
+    from_lists.minimise_cost()
+    from_disk = SupplierSelectionModel(**loaded)
+    from_disk.minimise_cost()
+    assert from_disk.return_solution() == from_lists.return_solution()
+
+
+def test_reduced_price_of_memory_mapped_prices(tmp_path):
+    path = str(tmp_path / "inputs")
+    save_inputs(path, price=price)
+    mapped = load_inputs(path)["price"]
+    reduced = compute_reduced_price(mapped, 0, 0.1)
+    assert reduced.tolist() == compute_reduced_price(price, 0, 0.1)
+    assert mapped.tolist() == price
+
+
+def test_generate_supplier_selector_variables_is_seeded():
+    kwargs = {"n_suppliers": 6, "n_parts": 500, "n_years": 3, "print_data": False}
+    first = generate_supplier_selector_variables(seed=3, **kwargs)
+    again = generate_supplier_selector_variables(seed=3, **kwargs)
+    alias = generate_supplier_selector_variables(seed_value=3, **kwargs)
+    for a, b, c in zip(first, again, alias):
+        assert np.array_equal(a, b)
+        assert np.array_equal(a, c)
+
+    price, demand, capacity, share, transfer_limit, minimum_units, trust = first
+    assert price.shape == minimum_units.shape == (6, 500, 3)
+    assert demand.shape == (500, 3)
+    assert capacity.shape == (6, 3)
+    assert transfer_limit.shape == (6,)
+    assert share.shape == trust.shape == (6, 500)
+    assert (price >= 0).all() and (demand > 0).all()
+    assert 0.7 < trust.mean() < 0.9
+
+
+def test_generated_data_printed_as_lists(capsys):
+    price, demand = generate_supplier_selector_variables(
+        n_suppliers=2, n_parts=3, n_years=2, seed=1
+    )[:2]
+    printed = capsys.readouterr().out
+    assert "price: {}\n".format(price.tolist()) in printed
+    assert "demand: {}\n".format(demand.tolist()) in printed
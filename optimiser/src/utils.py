@@ -1,4 +1,7 @@
-import random
+import os
+import io
+import csv
+import json
 import copy
 from functools import wraps
 import time
@@ -6,37 +9,208 @@ import time
 import numpy as np
 
 
-def timeit(func):
+class Metrics:
+    """
+    Phase timings recorded for one model
+
+    Attributes
+    ----------
+    records : list
+        One dict per timed call: {"phase": str, "seconds": float}, in the
+        order the calls finished
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, phase, seconds):
+        self.records.append({"phase": phase, "seconds": seconds})
+
+    def totals(self):
+        """
+        Returns {phase: total seconds} summed over repeated calls, in the
+        order each phase was first recorded
+        """
+        totals = {}
+        for record in self.records:
+            totals[record["phase"]] = totals.get(record["phase"], 0) + record["seconds"]
+        return totals
+
+    def to_json(self, path=None):
+        """
+        Export the records as JSON, to `path` if given, and return the string
+        """
+        text = json.dumps({"records": self.records, "totals": self.totals()}, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, path=None):
+        """
+        Export the records as CSV (phase, seconds), to `path` if given, and
+        return the string
+        """
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=["phase", "seconds"])
+        writer.writeheader()
+        writer.writerows(self.records)
+        text = buffer.getvalue()
+        if path is not None:
+            with open(path, "w", newline="") as f:
+                f.write(text)
+        return text
+
+    def print_summary(self):
+        for phase, seconds in self.totals().items():
+            print("{:<45} {:>10.5f} s".format(phase, seconds))
+
+
+def timeit(func=None, phase=None):
+    """
+    Time a function and return its result unchanged
+
+    Used on methods of an object with a `metrics` attribute (a Metrics),
+    the time is recorded under `phase` (default: the function name).
+    Otherwise it is printed. Can be used as @timeit or @timeit(phase="build")
+    """
+    if func is None:
+        return lambda f: timeit(f, phase=phase)
+    name = func.__name__ if phase is None else phase
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         start = time.perf_counter()
-        func(*args, **kwargs)
-        end = time.perf_counter()
-        total = end - start
-        print("Execution time: {:.5f} seconds".format(total))
+        result = func(*args, **kwargs)
+        total = time.perf_counter() - start
+        metrics = getattr(args[0], "metrics", None) if args else None
+        if isinstance(metrics, Metrics):
+            metrics.record(name, total)
+        else:
+            print("Execution time: {:.5f} seconds".format(total))
+        return result
 
     return wrapper
 
 
-def random_walk(mean, std_dev):
-    return np.rint(np.random.normal(mean, std_dev))
+def available_cores():
+    """
+    Number of CPU cores this process is allowed to run on
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
 
 
-def brownian_motion(n_time_steps, start, mean=0, std_dev=10):
+def split_cores(n_scenarios, total_cores=None, max_workers=None):
     """
-    1D simulation of Brownian motion
+    Divide a core budget between concurrent solves and CP-SAT workers
 
     Parameters
     ----------
-    u : int
-        Displacement
+    n_scenarios : int
+
+    total_cores : int
+        Core budget shared by every solve. Optional, defaults to every core
+        available to the process
+
+    max_workers : int
+        Upper limit on concurrent solves. Optional
+
+    Returns
+    -------
+    n_processes : int
+        Number of scenarios solved at the same time
+
+    n_threads : int
+        num_search_workers given to each solve
+    """
+    if total_cores is None:
+        total_cores = available_cores()
+    n_processes = max(1, min(n_scenarios, total_cores))
+    if max_workers is not None:
+        n_processes = max(1, min(n_processes, max_workers))
+    n_threads = max(1, total_cores // n_processes)
+    return n_processes, n_threads
+
+
+def _compact(array):
+    """
+    Store integer data in the smallest signed integer type that holds it
+    """
+    if array.dtype.kind not in "iu" or array.size == 0:
+        return array
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= array.min() and array.max() <= info.max:
+            return array.astype(dtype)
+    return array.astype(np.int64)
+
+
+def save_inputs(path, **inputs):
+    """
+    Save SupplierSelectionModel inputs in a compact binary format
+
+    Integer arrays are stored in the smallest integer type that holds them.
+    If path ends in ".npz" the inputs are saved in a single compressed
+    file, otherwise path is a directory holding one ".npy" file per array,
+    which load_inputs can memory-map, and the other inputs (e.g.
+    global_transfer_limit, share_formulation) in "inputs.json"
+
+    Examples
+    --------
+    save_inputs("large_problem", price=price, demand=demand, capacity=capacity)
+    scenario = SupplierSelectionModel(**load_inputs("large_problem"))
+    """
+    arrays, values = {}, {}
+    for name, value in inputs.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            values[name] = value
+        elif np.ndim(value) == 0:
+            values[name] = np.asarray(value).item()
+        else:
+            arrays[name] = _compact(np.asarray(value))
+
+    if path.endswith(".npz"):
+        np.savez_compressed(
+            path,
+            **arrays,
+            **{name: np.asarray(value) for name, value in values.items()},
+        )
+        return
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+    with open(os.path.join(path, "inputs.json"), "w") as f:
+        json.dump(values, f)
+
+
+def load_inputs(path, mmap_mode="r"):
+    """
+    Load inputs saved by save_inputs
+
+    Arrays saved in a directory are memory-mapped with `mmap_mode`
+    (None reads them into memory), those in a ".npz" file are read into
+    memory. Returns a dict of SupplierSelectionModel arguments
     """
-    u = start
-    u_hist = []
-    for i in range(n_time_steps):
-        u += random_walk(mean, std_dev)
-        u_hist.append(np.abs(u.astype(int)))
-    return u_hist
+    inputs = {}
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            for name in data.files:
+                array = data[name]
+                inputs[name] = array.item() if array.ndim == 0 else array
+        return inputs
+    for filename in sorted(os.listdir(path)):
+        name, extension = os.path.splitext(filename)
+        if extension == ".npy":
+            inputs[name] = np.load(os.path.join(path, filename), mmap_mode=mmap_mode)
+    values_path = os.path.join(path, "inputs.json")
+    if os.path.exists(values_path):
+        with open(values_path) as f:
+            inputs.update(json.load(f))
+    return inputs
 
 
 def generate_supplier_selector_variables(
@@ -48,84 +222,104 @@ def generate_supplier_selector_variables(
     n_parts=50,
     n_years=4,
     print_data=True,
+    seed=None,
     seed_value=None,
 ):
-    np.random.seed(seed_value)
-    random.seed(seed_value)
-
-    price = []
-    start = np.random.randint(min_price, max_price, n_parts)
-    for _ in range(n_suppliers):
-        s = []
-        for part in range(n_parts):
-            y = brownian_motion(n_years, start[part], std_dev=.2e3)
-            s.append(y)
-        price.append(s)
-
-    demand = []
-    for _ in range(n_parts):
-        y = []
-        start = np.random.randint(min_demand, max_demand)
-        for _ in range(n_years):
-            y = brownian_motion(n_years, start)
-        demand.append(y)
-
-    minimum_units = []
-    for supplier in range(n_suppliers):
-        s = []
-        for part in range(n_parts):
-            y = []
-            for year in range(n_years):
-                y.append(round(demand[part][year] * 0.1))
-            s.append(y)
-        minimum_units.append(s)
-
-    capacity = []
-    for _ in range(n_suppliers):
-        y = []
-        for _ in range(n_years):
-            y.append(np.random.randint(n_parts * 0.5, n_parts))
-        capacity.append(y)
-
-    share = []
-    for _ in range(n_suppliers):
-        s = []
-        for _ in range(n_parts):
-            sample = np.random.rand()
-            if sample < 0.2:
-                s.append(30)
-            elif 0.2 <= sample < 0.7:
-                s.append(60)
-            else:
-                s.append(100)
-        share.append(s)
-
-    trust = []
-    for _ in range(n_suppliers):
-        s = []
-        for _ in range(n_parts):
-            s.append(random.choice([0, 1, 1, 1, 1]))
-        trust.append(s)
-
-    supplier_transfer_limit = []
-    for _ in range(n_suppliers):
-        supplier_transfer_limit.append(np.random.randint(n_parts * 0.5, n_parts))
+    """
+    Generate a random supplier selection problem
+
+    Prices and demands are Brownian motions over the years, drawn for every
+    supplier and part at once from a numpy Generator (cumulative sums of
+    normal steps).
+
+    Every input is returned as a numpy array rather than nested lists.
+    SupplierSelectionModel and compute_reduced_price take either, call
+    .tolist() where nested lists are needed.
+
+    Parameters
+    ----------
+    seed : int
+        Seed of the random number generator, for reproducible problems.
+        Optional
+
+    seed_value : int
+        Former name of seed, used when seed is not given
+
+    Returns
+    -------
+    price : ndarray
+        shape (n_suppliers, n_parts, n_years)
+
+    demand : ndarray
+        shape (n_parts, n_years)
+
+    capacity : ndarray
+        shape (n_suppliers, n_years)
+
+    share : ndarray
+        30, 60 or 100 (%), shape (n_suppliers, n_parts)
+
+    supplier_transfer_limit : ndarray
+        shape (n_suppliers,)
+
+    minimum_units : ndarray
+        10% of the demand, shape (n_suppliers, n_parts, n_years). A
+        read-only view, the same for every supplier
+
+    trust : ndarray
+        0 for about 20% of the (supplier, part) pairs, else 1,
+        shape (n_suppliers, n_parts)
+    """
+    if seed is None:
+        seed = seed_value
+    rng = np.random.default_rng(seed)
+
+    start = rng.integers(int(min_price), int(max_price), n_parts)
+    # float32 holds every integer price exactly and halves the work
+    steps = rng.standard_normal((n_suppliers, n_parts, n_years), dtype=np.float32)
+    steps *= 0.2e3
+    np.rint(steps, out=steps)
+    np.cumsum(steps, axis=2, out=steps)
+    steps += start[:, None].astype(np.float32)
+    price = np.abs(steps, out=steps).astype(np.int64)
+
+    start = rng.integers(min_demand, max_demand, n_parts)
+    steps = rng.normal(0, 10, (n_parts, n_years))
+    demand = np.abs(start[:, None] + np.cumsum(np.rint(steps), axis=1))
+    demand = demand.astype(np.int64)
+
+    minimum_units = np.rint(demand * 0.1).astype(np.int64)
+    minimum_units = np.broadcast_to(minimum_units, (n_suppliers, n_parts, n_years))
+
+    capacity = rng.integers(int(n_parts * 0.5), n_parts, (n_suppliers, n_years))
+
+    share = rng.choice([30, 60, 100], (n_suppliers, n_parts), p=[0.2, 0.5, 0.3])
+
+    trust = (rng.random((n_suppliers, n_parts)) < 0.8).astype(np.int64)
+
+    supplier_transfer_limit = rng.integers(int(n_parts * 0.5), n_parts, n_suppliers)
 
     if print_data:
         print(f"number of suppliers: {n_suppliers}")
         print(f"number of parts: {n_parts}")
-        print(f"price: {price}")
-        print(f"demand: {demand}")
-        print(f"minimum units: {minimum_units}")
-        print(f"capacity: {capacity}")
-        print(f"share: {share}")
-        print(f"supplier transfer limit: {supplier_transfer_limit}")
-        print(f"Trust: {trust}")
+        # printed as nested lists, in full
+        print(f"price: {price.tolist()}")
+        print(f"demand: {demand.tolist()}")
+        print(f"minimum units: {minimum_units.tolist()}")
+        print(f"capacity: {capacity.tolist()}")
+        print(f"share: {share.tolist()}")
+        print(f"supplier transfer limit: {supplier_transfer_limit.tolist()}")
+        print(f"Trust: {trust.tolist()}")
 
     return price, demand, capacity, share, supplier_transfer_limit, minimum_units, trust
 
 
 def compute_reduced_price(price, supplier, reduction):
+    if isinstance(price, np.ndarray):
+        # a copy, also of read-only memory-mapped prices
+        new_price = np.array(price)
+        new_price[supplier] = np.rint(new_price[supplier] * (1 - reduction))
+        return new_price
     new_price = copy.deepcopy(price)
     for part in range(len(price[0])):
         for year in range(len(price[0][0])):
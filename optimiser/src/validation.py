@@ -0,0 +1,250 @@
+import numpy as np
+
+
+class InputError(ValueError):
+    """
+    Invalid SupplierSelectionModel inputs
+
+    Attributes
+    ----------
+    errors : list
+        One dict per failed check: check (the check name), input (the
+        input it was found in), count (number of offending entries),
+        indices (ndarray of shape (count, ndim), the index of every
+        offending entry) and message, which describes the first one
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(
+            "\n".join(
+                "{} ({} entries)".format(error["message"], error["count"])
+                if error["count"] > 1
+                else error["message"]
+                for error in errors
+            )
+        )
+
+
+def error(check, name, offending, message):
+    """
+    A failed check from the boolean array of offending entries. The
+    message is formatted with the index of the first one
+    """
+    indices = np.argwhere(offending)
+    return {
+        "check": check,
+        "input": name,
+        "count": len(indices),
+        "indices": indices,
+        "message": message.format(*indices[0].tolist()),
+    }
+
+
+def shape_error(name, message):
+    """
+    An error about the shape of a whole input, which has no offending
+    entries
+    """
+    return {
+        "check": "shape",
+        "input": name,
+        "count": 1,
+        "indices": np.zeros((1, 0), dtype=np.int64),
+        "message": message,
+    }
+
+
+def as_array(name, data):
+    """
+    Convert optional input data (nested lists or arrays) to a numpy array,
+    raising an InputError for ragged nested lists
+    """
+    if data is None:
+        return None
+    try:
+        array = np.asarray(data)
+    except ValueError:
+        array = None
+    if array is None or (array.dtype == object and array.ndim > 0):
+        raise InputError([shape_error(name, "{} is a ragged nested list".format(name))])
+    return array
+
+
+def check_shapes(inputs, n_suppliers, n_parts, n_years):
+    """
+    Shape and range errors of the inputs, a dict of arrays (or None)
+    keyed by SupplierSelectionModel argument
+
+    Returns
+    -------
+    errors : list
+        See InputError. Range checks are skipped for inputs of the wrong
+        shape
+    """
+    shapes = {
+        "demand": (n_parts, n_years),
+        "capacity": (n_suppliers, n_years),
+        "supplier_transfer_limit": (n_suppliers,),
+        "global_transfer_limit": (),
+        "share": (n_suppliers, n_parts),
+        "minimum_units": (n_suppliers, n_parts, n_years),
+        "trust": (n_suppliers, n_parts),
+        "previous_assigned": (n_suppliers, n_parts),
+    }
+    # smallest and largest valid value
+    ranges = {
+        "demand": (0, None),
+        "capacity": (0, None),
+        "supplier_transfer_limit": (0, None),
+        "global_transfer_limit": (0, None),
+        "share": (0, 100),
+        "minimum_units": (0, None),
+    }
+    errors = []
+    for name, shape in shapes.items():
+        array = inputs[name]
+        if array is None:
+            continue
+        if array.shape != shape:
+            errors.append(
+                shape_error(
+                    name,
+                    "{} has shape {}, expected {}".format(name, array.shape, shape),
+                )
+            )
+            continue
+        if name not in ranges:
+            continue
+        low, high = ranges[name]
+        offending = array < low
+        if high is not None:
+            offending |= array > high
+        if np.any(offending):
+            indices = np.argwhere(np.atleast_1d(offending))
+            if high is None:
+                message = "{} must be at least {}".format(name, low)
+            else:
+                message = "{} must be in [{}, {}]".format(name, low, high)
+            if array.ndim:
+                message += ", first at index {}".format(tuple(indices[0].tolist()))
+            errors.append(
+                {
+                    "check": "range",
+                    "input": name,
+                    "count": len(indices),
+                    "indices": indices,
+                    "message": message,
+                }
+            )
+    return errors
+
+
+def check_feasibility(scenario):
+    """
+    Necessary conditions for a feasible model, as array reductions on the
+    inputs of a SupplierSelectionModel whose inputs and eligible cells are
+    set (see SupplierSelectionModel._set_inputs)
+
+    - eligibility: a part with demand has no eligible (bid and trusted)
+      supplier in a year
+    - share: the share limits of the eligible suppliers of a part cannot
+      cover its demand
+    - minimum_units: they can, but not once the suppliers whose minimum
+      units are above their share-limited volume are left out
+    - capacity: the parts a supplier alone can deliver exceed its
+      capacity, or the fewest assignments that can cover the demand of
+      every part exceed the total capacity of a year
+
+    The checks stop at the first one that fails, as the later ones assume
+    the earlier hold
+
+    Returns
+    -------
+    errors : list
+        See InputError. Empty if every check passed, which does not make
+        the model feasible
+    """
+    shape = (scenario.n_suppliers, scenario.n_parts, scenario.n_years)
+    demand = scenario.demand
+
+    no_supplier = (demand > 0) & ~scenario.eligible.any(axis=0)[:, None]
+    if no_supplier.any():
+        return [
+            error(
+                "eligibility",
+                "trust",
+                no_supplier,
+                "part {} has demand in year {} but no eligible supplier",
+            )
+        ]
+
+    upper_bound = np.zeros(shape, dtype=np.int64)
+    upper_bound[
+        scenario.cell_supplier, scenario.cell_part
+    ] = scenario._volume_upper_bound()
+    # untrusted cells kept by keep_untrusted_bids are fixed to 0
+    upper_bound[~scenario.eligible] = 0
+    short = upper_bound.sum(axis=0) < demand
+    if short.any():
+        return [
+            error(
+                "share",
+                "share",
+                short,
+                "the share limits of part {} cannot cover its demand in year {}",
+            )
+        ]
+
+    if scenario.minimum_units is not None:
+        usable = upper_bound >= scenario.minimum_units
+        upper_bound = np.where(usable, upper_bound, 0)
+        short = upper_bound.sum(axis=0) < demand
+        if short.any():
+            return [
+                error(
+                    "minimum_units",
+                    "minimum_units",
+                    short,
+                    "minimum units above the share limits leave part {} short "
+                    "of its demand in year {}",
+                )
+            ]
+
+    if scenario.capacity is None:
+        return []
+
+    # parts that a single supplier can deliver must be assigned to it
+    can_deliver = upper_bound > 0
+    forced = (can_deliver.sum(axis=0) == 1) & (demand > 0)
+    forced_supplier = np.argmax(can_deliver, axis=0)
+    n_forced = np.zeros((scenario.n_suppliers, scenario.n_years), dtype=np.int64)
+    year = np.broadcast_to(np.arange(scenario.n_years), forced.shape)
+    np.add.at(n_forced, (forced_supplier[forced], year[forced]), 1)
+    over = n_forced > scenario.capacity
+    if over.any():
+        return [
+            error(
+                "capacity",
+                "capacity",
+                over,
+                "supplier {} is the only one able to deliver more parts than "
+                "its capacity in year {}",
+            )
+        ]
+
+    # fewest suppliers covering every part, the largest limits first
+    covered = np.cumsum(-np.sort(-upper_bound, axis=0), axis=0)
+    needed = np.where(demand > 0, (covered < demand).sum(axis=0) + 1, 0)
+    over = needed.sum(axis=0) > scenario.capacity.sum(axis=0)
+    if over.any():
+        return [
+            error(
+                "capacity",
+                "capacity",
+                over,
+                "the demand of year {} needs more assignments than the total "
+                "capacity",
+            )
+        ]
+    return []
@@ -10,10 +10,11 @@ def timeit(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         start = time.perf_counter()
-        func(*args, **kwargs)
+        result = func(*args, **kwargs)
         end = time.perf_counter()
         total = end - start
         print("Execution time: {:.5f} seconds".format(total))
+        return result
 
     return wrapper
 